@@ -0,0 +1,189 @@
+"""
+API HTTP/JSON tanpa antarmuka Streamlit untuk pencarian naskah.
+
+Memakai inti pencarian yang sama dengan app.py (search_text, pengelompokan hasil,
+highlight) dan satu korpus bersama di memori: DataFrame, indeks, cache pencarian
+dan lock-nya dipakai oleh semua permintaan yang berjalan bersamaan. Pencarian
+dijalankan di thread pool agar event loop tetap melayani permintaan lain.
+
+Endpoint:
+    GET  /health                              status dan versi korpus
+    GET  /metrics                             metrik format Prometheus (durasi per tahap, cache)
+    GET  /search?q=punika&type=all&mode=word  satu query
+    POST /search                              beberapa query sekaligus:
+         {"queries": ["punika", {"q": "ꦲꦶꦁ", "mode": "prefix"}], "type": "all", "highlight": true}
+
+Pada korpus gabungan (AKSARA_DATA_SOURCES), parameter sources=pupuh,serat membatasi
+pencarian pada naskah tertentu.
+
+Contoh:
+    python api_server.py --port 8502
+    AKSARA_DATA_SOURCE=csv python api_server.py --host 0.0.0.0
+"""
+import argparse
+import contextlib
+import os
+import time
+
+import streamlit.logger
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+# app.py diimpor tanpa server Streamlit (bare mode); sembunyikan peringatan runtime
+streamlit.logger.set_log_level("error")
+
+import app  # noqa: E402
+from query_patterns import MATCH_MODES  # noqa: E402
+from search_index import INDEXED_FIELDS  # noqa: E402
+
+SEARCH_TYPES = ("all",) + tuple(INDEXED_FIELDS)
+
+# Jumlah query maksimum dalam satu permintaan batch
+MAX_BATCH_QUERIES = int(os.environ.get("AKSARA_API_MAX_BATCH", "100"))
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+
+TRUE_VALUES = ("1", "true", "yes", "ya")
+
+
+class SearchRequestError(ValueError):
+    """Parameter pencarian tidak valid; dikembalikan sebagai error 400"""
+
+
+def get_corpus_store():
+    """Korpus bersama (sama dengan yang dipakai app.py), dimuat sekali per proses"""
+    return app.load_corpus_store(app.DATA_SOURCE_CONFIG["source"], app.DATA_SOURCE_CONFIG["location"])
+
+
+def parse_flag(value, default=False):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_search_params(params, defaults=None):
+    """Normalisasi satu query dari parameter URL atau item batch (string atau objek)"""
+    defaults = defaults or {}
+    if isinstance(params, str):
+        params = {"q": params}
+    if not isinstance(params, dict):
+        raise SearchRequestError("Setiap query harus berupa teks atau objek dengan kunci 'q'")
+
+    query = params.get("q", "")
+    if not isinstance(query, str) or not query.strip():
+        raise SearchRequestError("Parameter 'q' wajib diisi")
+    search_type = params.get("type", defaults.get("type", "all"))
+    if search_type not in SEARCH_TYPES:
+        raise SearchRequestError(f"Jenis pencarian tidak dikenal: {search_type} (pilihan: {', '.join(SEARCH_TYPES)})")
+    match_mode = params.get("mode", defaults.get("mode", "word"))
+    if match_mode not in MATCH_MODES:
+        raise SearchRequestError(f"Mode pencocokan tidak dikenal: {match_mode} (pilihan: {', '.join(MATCH_MODES)})")
+
+    sources = params.get("sources", defaults.get("sources"))
+    if isinstance(sources, str):
+        sources = [name.strip() for name in sources.split(",") if name.strip()]
+    if sources is not None and not isinstance(sources, list):
+        raise SearchRequestError("Parameter 'sources' harus berupa daftar nama naskah")
+
+    return {
+        "query": query,
+        "search_type": search_type,
+        "match_mode": match_mode,
+        # Naskah yang dicari pada korpus gabungan; kosong berarti semua naskah
+        "sources": tuple(sources) if sources else None,
+        "cross_script": parse_flag(params.get("cross_script"), parse_flag(defaults.get("cross_script"), True)),
+        "highlight": parse_flag(params.get("highlight"), parse_flag(defaults.get("highlight"))),
+    }
+
+
+def run_search(corpus_store, params):
+    """Jalankan satu query lewat cache pencarian bersama; error query dikembalikan per item"""
+    started = time.perf_counter()
+    record = app.batch_search_record(
+        corpus_store, params["query"], params["search_type"], params["match_mode"], params["cross_script"],
+        params["highlight"], params["sources"]
+    )
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return record
+
+
+def run_batch(corpus_store, batch):
+    """Semua query batch dijalankan dalam satu tugas thread pool"""
+    return [run_search(corpus_store, params) for params in batch]
+
+
+async def health(request):
+    corpus_store = await run_in_threadpool(get_corpus_store)
+    return JSONResponse({
+        "status": "ok",
+        "corpus_version": corpus_store["corpus_version"],
+        "rows": len(corpus_store["df"]),
+    })
+
+
+async def metrics(request):
+    corpus_store = await run_in_threadpool(get_corpus_store)
+    return PlainTextResponse(
+        await run_in_threadpool(app.render_metrics, corpus_store),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+async def search(request):
+    try:
+        if request.method == "GET":
+            batch = [parse_search_params(dict(request.query_params))]
+        else:
+            try:
+                body = await request.json()
+            except ValueError:
+                raise SearchRequestError("Badan permintaan harus berupa JSON")
+            if not isinstance(body, dict) or not isinstance(body.get("queries"), list) or not body["queries"]:
+                raise SearchRequestError("Badan permintaan harus berisi daftar 'queries'")
+            if len(body["queries"]) > MAX_BATCH_QUERIES:
+                raise SearchRequestError(f"Paling banyak {MAX_BATCH_QUERIES} query per permintaan")
+            batch = [parse_search_params(item, body) for item in body["queries"]]
+    except SearchRequestError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    corpus_store = await run_in_threadpool(get_corpus_store)
+    results = await run_in_threadpool(run_batch, corpus_store, batch)
+    if request.method == "GET":
+        status_code = 400 if "error" in results[0] else 200
+        return JSONResponse(dict(results[0], corpus_version=corpus_store["corpus_version"]), status_code=status_code)
+    return JSONResponse({"corpus_version": corpus_store["corpus_version"], "results": results})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(api):
+    # Korpus dan indeks dibangun sebelum permintaan pertama dilayani
+    await run_in_threadpool(get_corpus_store)
+    yield
+
+
+api = Starlette(
+    routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/search", search, methods=["GET", "POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP/JSON pencarian naskah Jawa")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    uvicorn.run(api, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
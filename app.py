@@ -1,8 +1,36 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import re
+import time
+import threading
+from collections import Counter
 from pathlib import Path
-from SPARQLWrapper import SPARQLWrapper, JSON
+from data_sources import (
+    get_data_source_config, get_source_fingerprint, load_corpus, describe_data_source, parse_source_list,
+    PagedLoadError, SOURCE_TAG_COLUMN
+)
+from search_index import (
+    build_search_index, build_suffix_arrays, build_fuzzy_index, update_fuzzy_index, build_positional_index, lookup_candidates,
+    copy_index, add_rows_to_index, remove_rows_from_index, add_rows_to_positional_index, remove_rows_from_positional_index,
+    lookup_partial_candidates, lookup_fuzzy_candidates, suggest_completions, collect_javanese_chars, LATIN_SPLIT_RE, JAVANESE_SPLIT_RE
+)
+from corpus_snapshot import (
+    read_manifest, is_snapshot_fresh, make_corpus_version, save_snapshot,
+    load_snapshot_corpus, load_snapshot_index, load_snapshot_chars, load_snapshot_structures
+)
+from corpus_sync import compute_subject_hashes, sync_corpus
+from query_patterns import compile_query, compile_terms_query, compile_cross_script_query, is_javanese_text, MATCH_MODES
+from transliteration import build_transliteration_table, update_transliteration_table, transliterate_query
+from ranking import build_ranking_stats, update_ranking_stats, bm25_scores, top_k_groups, RESULT_TOP_K
+from query_language import parse_boolean_query, execute_boolean_query, QuerySyntaxError
+from concordance import build_concordance, update_concordance, concordance_lines, DEFAULT_CONTEXT_WIDTH
+from keyboard_model import build_keyboard_model, count_chars, update_char_counts
+from batch_search import read_query_list, search_record, iter_batch_results, BatchWriter, BATCH_FORMATS
+from query_cache import new_query_cache, make_query_key, query_cache_get, query_cache_put, query_cache_stats
+from perf_metrics import timed, record_query, profile_query, span_summary, recent_queries, recent_profiles, render_prometheus, PROFILE_MODE
+from sparql_search import (
+    get_query_runner, fetch_pushdown_rows, PushdownError, SEARCH_BACKEND, PUSHDOWN_LIMIT, PUSHDOWN_MATCH_MODES
+)
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -21,63 +49,423 @@ def load_css():
     else:
         st.warning("File styles.css tidak ditemukan. Pastikan file CSS ada di direktori yang sama.")
 
-# Load data from GraphDB
-@st.cache_data # Cache data untuk performa
-def load_data_from_graphdb():
-    # URL endpoint GraphDB
-    sparql_endpoint = "https://81ac-180-244-161-63.ngrok-free.app/repositories/AksaraJawa"
-    sparql = SPARQLWrapper(sparql_endpoint)
-
-    # SPARQL query untuk mengambil semua data Paragraf dan Kata
-    # Memastikan semua properti yang relevan diambil
-    query = """
-    PREFIX ex: <http://example.org/pupuh#>
-    SELECT ?s ?type ?isiLatin ?isiAksaraJawa ?arti ?munculDalamParagraf
-    WHERE {
-        {
-            ?s a ex:Paragraf .
-            OPTIONAL { ?s ex:isiLatin ?isiLatin . }
-            OPTIONAL { ?s ex:isiAksaraJawa ?isiAksaraJawa . }
-            OPTIONAL { ?s ex:arti ?arti . }
-            BIND("Paragraf" AS ?type)
-        } UNION {
-            ?s a ex:Kata .
-            OPTIONAL { ?s ex:latin ?isiLatin . }
-            OPTIONAL { ?s ex:aksaraJawa ?isiAksaraJawa . }
-            OPTIONAL { ?s ex:arti ?arti . }
-            OPTIONAL { ?s ex:munculDalamParagraf ?munculDalamParagrafUri .
-                       BIND(STRAFTER(STR(?munculDalamParagrafUri), "http://example.org/pupuh#") AS ?munculDalamParagraf) }
-            BIND("Kata" AS ?type)
-        }
+# Konfigurasi sumber data (GraphDB atau file lokal), lihat data_sources.py
+DATA_SOURCE_CONFIG = get_data_source_config()
+
+# Halaman GraphDB yang sudah berhasil dimuat sebelum terjadi error, agar
+# percobaan berikutnya melanjutkan dari halaman yang gagal
+PARTIAL_LOADS = {}
+
+# Load data dari sumber data yang dikonfigurasi, dengan progress bar dan resume
+def load_corpus_data(source, location):
+    progress_bar = st.progress(0.0, text="🔄 Memuat korpus...")
+
+    def report_progress(loaded_rows, total_rows):
+        if total_rows:
+            progress_bar.progress(min(loaded_rows / total_rows, 1.0), text=f"🔄 Memuat {loaded_rows}/{total_rows} baris...")
+        else:
+            progress_bar.progress(0.0, text=f"🔄 Memuat {loaded_rows} baris...")
+
+    options = {"progress_callback": report_progress}
+    if (source, location) in PARTIAL_LOADS:
+        options["resume_state"] = PARTIAL_LOADS.pop((source, location))
+
+    try:
+        return load_corpus(source, location, **options)
+    except PagedLoadError as e:
+        PARTIAL_LOADS[(source, location)] = e.state
+        raise
+    finally:
+        progress_bar.empty()
+
+# Struktur turunan yang ikut disimpan di snapshot korpus, agar proses baru tidak membangunnya ulang;
+# struktur kecil disimpan langsung di manifest
+SNAPSHOT_STRUCTURES = ("positional_index", "transliteration_table")
+SNAPSHOT_SUMMARIES = ("ranking_stats", "char_counts")
+
+# structures: struktur turunan yang sudah ada (dari snapshot); yang tidak ada dibangun dari df
+def new_corpus_store(df, search_index, javanese_chars, corpus_version, fingerprint, structures=None):
+    structures = structures or {}
+    char_counts = Counter(structures["char_counts"]) if "char_counts" in structures else count_chars(corpus_texts(df))
+    return {
+        "df": df,
+        "search_index": search_index,
+        "javanese_chars": javanese_chars,
+        # Jumlah kemunculan setiap karakter aksara Jawa, diperbarui dengan selisih saat sinkronisasi
+        "char_counts": char_counts,
+        # Karakter keyboard per kategori beserta frekuensinya, dihitung sekali per versi korpus
+        "keyboard_model": build_keyboard_model(javanese_chars, char_counts),
+        # Suffix array kosakata untuk pencarian awalan/substring, dibangun dari indeks;
+        # dibangun ulang saat dipakai jika kosakata berubah karena sinkronisasi (lihat search_view)
+        "suffix_arrays": build_suffix_arrays(search_index),
+        # Indeks n-gram kosakata tanpa diakritik untuk pencarian mirip
+        "fuzzy_index": build_fuzzy_index(search_index),
+        # Indeks posisi token teks Paragraf untuk kueri boolean, frasa dan NEAR
+        "positional_index": structures["positional_index"] if "positional_index" in structures else build_positional_index(df),
+        # Keterhubungan Kata <-> Paragraf dengan offset token untuk konkordansi (KWIC),
+        # dibangun saat tampilan KWIC pertama kali dipakai (lihat corpus_structure)
+        "concordance": None,
+        # Tabel transliterasi Latin <-> aksara Jawa dari pasangan kata korpus
+        "transliteration_table": (
+            structures["transliteration_table"] if "transliteration_table" in structures else build_transliteration_table(df)
+        ),
+        # Statistik panjang teks per kolom untuk skor relevansi BM25
+        "ranking_stats": structures["ranking_stats"] if "ranking_stats" in structures else build_ranking_stats(df),
+        "corpus_version": corpus_version,
+        "fingerprint": fingerprint,
+        "subject_hashes": None, # Dihitung saat sinkronisasi pertama
+        "last_sync": None,
+        # Hanya dipegang saat membaca atau mengganti referensi struktur (lihat corpus_view);
+        # pencarian berjalan di luar lock atas struktur yang tidak pernah diubah di tempat
+        "lock": threading.RLock(),
+        # Sinkronisasi dijalankan satu per satu, begitu pula pembangunan struktur lazy
+        "sync_lock": threading.Lock(),
+        "build_lock": threading.Lock(),
     }
-    """
 
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
+# Salinan dangkal korpus bersama yang konsisten (DataFrame, indeks dan versi dari saat yang sama).
+# Sinkronisasi mengganti struktur dengan yang baru, sehingga view tetap utuh selama dipakai
+def corpus_view(corpus_store):
+    with corpus_store["lock"]:
+        return dict(corpus_store)
+
+# Korpus bersama untuk semua sesi: DataFrame, indeks terbalik, inventaris karakter dan versi.
+# Proses baru mulai dari snapshot di disk jika fingerprint sumber belum berubah.
+# Error tidak di-cache sehingga rerun berikutnya akan mencoba memuat lagi
+@st.cache_resource # Cache data untuk performa
+def load_corpus_store(source, location):
+    fingerprint = get_source_fingerprint(source, location)
+
+    manifest = read_manifest(source, location)
+    if is_snapshot_fresh(manifest, fingerprint):
+        try:
+            return new_corpus_store(
+                load_snapshot_corpus(source, location),
+                load_snapshot_index(source, location),
+                load_snapshot_chars(source, location),
+                manifest["corpus_version"],
+                manifest["fingerprint"],
+                load_snapshot_structures(source, location, manifest)
+            )
+        except Exception:
+            pass # Snapshot rusak, muat ulang dari sumber data
 
+    df = load_corpus_data(source, location)
+    corpus_version = make_corpus_version(fingerprint, len(df), time.time())
+    store = new_corpus_store(
+        df, build_search_index(df), get_unique_javanese_chars(df), corpus_version, fingerprint
+    )
+    if not df.empty:
+        save_corpus_snapshot(source, location, store)
+    return store
+
+def save_corpus_snapshot(source, location, store):
     try:
-        results = sparql.query().convert()
-        data = []
-        for result in results["results"]["bindings"]:
-            row = {
-                "s": result["s"]["value"], # URI dari entitas
-                "type": result["type"]["value"],
-                "isiLatin": result["isiLatin"]["value"] if "isiLatin" in result else None,
-                "isiAksaraJawa": result["isiAksaraJawa"]["value"] if "isiAksaraJawa" in result else None,
-                "arti": result["arti"]["value"] if "arti" in result else None,
-                "munculDalamParagraf": result["munculDalamParagraf"]["value"] if "munculDalamParagraf" in result else None
-            }
-            data.append(row)
-        
-        df = pd.DataFrame(data)
-        return df
-    except Exception as e:
-        st.error(f"Error loading data from GraphDB: {str(e)}")
-        st.info("Pastikan GraphDB berjalan dan dapat diakses dari aplikasi ini.")
-        return pd.DataFrame()
+        save_snapshot(
+            source, location, store["df"], store["search_index"], store["javanese_chars"],
+            store["fingerprint"], store["corpus_version"], {name: store[name] for name in SNAPSHOT_STRUCTURES},
+            {name: store[name] for name in SNAPSHOT_SUMMARIES}
+        )
+    except OSError as e:
+        st.warning(f"Snapshot korpus tidak dapat disimpan: {e}")
+
+# Struktur yang dibangun saat pertama kali dipakai: nama -> fungsi(view korpus)
+LAZY_STRUCTURES = {
+    "concordance": lambda corpus: build_concordance(corpus["df"]),
+    "suffix_arrays": lambda corpus: build_suffix_arrays(corpus["search_index"]),
+}
+
+# Struktur lazy dari view korpus. Dibangun sekali lalu disimpan di korpus bersama,
+# kecuali korpus sudah disinkronkan ke versi lain selama pembangunan
+def corpus_structure(corpus_store, corpus, name):
+    if corpus[name] is not None:
+        return corpus[name]
+    with corpus_store["build_lock"]:
+        with corpus_store["lock"]:
+            if corpus_store["corpus_version"] == corpus["corpus_version"] and corpus_store[name] is not None:
+                corpus[name] = corpus_store[name]
+                return corpus[name]
+        structure = LAZY_STRUCTURES[name](corpus)
+        with corpus_store["lock"]:
+            if corpus_store["corpus_version"] == corpus["corpus_version"]:
+                corpus_store[name] = structure
+    corpus[name] = structure
+    return structure
+
+# Struktur korpus baru dari selisih sinkronisasi: baris lama dikeluarkan dan baris baru
+# dimasukkan ke salinan struktur (copy-on-write), tanpa membangun ulang seluruh korpus.
+# Struktur lazy yang belum dibangun tetap kosong sampai dipakai
+def apply_corpus_delta(corpus, changes):
+    removed_rows, added_rows = changes["removed_rows"], changes["added_rows"]
+    search_index = copy_index(corpus["search_index"])
+    dropped_tokens = remove_rows_from_index(search_index, removed_rows)
+    new_tokens = add_rows_to_index(search_index, added_rows)
+    # Selisih kosakata: token yang hilang lalu muncul lagi tidak mengubah apa pun
+    removed_tokens = {field: tokens - new_tokens[field] for field, tokens in dropped_tokens.items()}
+    added_tokens = {field: tokens - dropped_tokens[field] for field, tokens in new_tokens.items()}
+    vocabulary_changed = any(removed_tokens.values()) or any(added_tokens.values())
+
+    positional_index = copy_index(corpus["positional_index"])
+    remove_rows_from_positional_index(positional_index, removed_rows)
+    add_rows_to_positional_index(positional_index, added_rows)
+
+    concordance = corpus["concordance"]
+    if concordance is not None:
+        concordance = update_concordance(concordance, corpus["df"], changes["df"], removed_rows, added_rows)
+    return {
+        "search_index": search_index,
+        # Suffix array hanya bergantung pada kosakata; jika berubah, dibangun ulang saat dipakai
+        "suffix_arrays": None if vocabulary_changed else corpus["suffix_arrays"],
+        "fuzzy_index": update_fuzzy_index(corpus["fuzzy_index"], removed_tokens, added_tokens),
+        "positional_index": positional_index,
+        "concordance": concordance,
+        "transliteration_table": update_transliteration_table(corpus["transliteration_table"], removed_rows, added_rows),
+        "ranking_stats": update_ranking_stats(corpus["ranking_stats"], removed_rows, added_rows),
+        "char_counts": update_char_counts(corpus["char_counts"], corpus_texts(removed_rows), corpus_texts(added_rows)),
+    }
+
+# Sinkronisasi inkremental dengan GraphDB: hanya subjek yang berubah yang diambil ulang.
+# Struktur baru dibangun di luar lock (pencarian tetap berjalan atas struktur lama),
+# lalu semuanya diganti sekaligus (copy-on-write) dan snapshot korpus disimpan
+def sync_corpus_store(source, location, store):
+    with store["sync_lock"]:
+        view = corpus_view(store)
+        if view["subject_hashes"] is None:
+            subject_hashes = compute_subject_hashes(view["df"])
+        else:
+            subject_hashes = dict(view["subject_hashes"])
+
+        changes = sync_corpus(view["df"], subject_hashes, location)
+        changed, removed = changes["changed"], changes["removed"]
+        updates = {"subject_hashes": subject_hashes, "last_sync": time.time()}
+        if changed or removed:
+            df = changes["df"]
+            updates.update(apply_corpus_delta(view, changes))
+            # Inventaris karakter dari jumlah karakter, tanpa memindai ulang seluruh teks korpus
+            javanese_chars = sorted(updates["char_counts"]) or get_unique_javanese_chars(df)
+            fingerprint = get_source_fingerprint(source, location)
+            updates.update({
+                "df": df,
+                "javanese_chars": javanese_chars,
+                "keyboard_model": build_keyboard_model(javanese_chars, updates["char_counts"]),
+                "fingerprint": fingerprint,
+                "corpus_version": make_corpus_version(fingerprint, len(df), updates["last_sync"]),
+            })
+        with store["lock"]:
+            store.update(updates)
+        if changed or removed:
+            save_corpus_snapshot(source, location, corpus_view(store))
+    return changed, removed
+
+# Cache hasil pencarian bersama untuk semua sesi (LRU dengan TTL)
+@st.cache_resource
+def get_query_cache():
+    return new_query_cache()
+
+# View korpus untuk pencarian: suffix array yang ditandai usang oleh sinkronisasi dibangun dulu
+def search_view(corpus_store):
+    corpus = corpus_view(corpus_store)
+    corpus_structure(corpus_store, corpus, "suffix_arrays")
+    return corpus
+
+# search_text atas satu view korpus bersama (lihat search_view)
+def search_corpus(corpus, query, search_type, match_mode="word", cross_script=False, sources=None):
+    return search_text(
+        corpus["df"], query, search_type, corpus["search_index"],
+        match_mode, corpus["suffix_arrays"], corpus["fuzzy_index"],
+        corpus["transliteration_table"] if cross_script else None,
+        corpus["ranking_stats"], RESULT_TOP_K, corpus["positional_index"], sources
+    )
 
-# Fungsi untuk mendapatkan karakter aksara Jawa unik dari dataset
-@st.cache_data
+# Pencarian lewat cache: kunci (query, jenis pencarian, mode, lintas aksara, naskah) berlaku untuk satu versi korpus.
+# use_cache=False melewati cache bersama (batch), agar ribuan query sekali pakai tidak menggeser query populer
+def cached_search_text(corpus_store, query, search_type, match_mode="word", cross_script=False, sources=None,
+                       use_cache=True):
+    query_cache = get_query_cache()
+    key = make_query_key(query, search_type, match_mode, cross_script, sources)
+    start_time = time.perf_counter()
+    corpus = search_view(corpus_store)
+    if use_cache:
+        cached = query_cache_get(query_cache, key, corpus["corpus_version"])
+        if cached is not None:
+            record_query(query, search_type, match_mode, time.perf_counter() - start_time, len(cached[0]), cached=True)
+            return cached
+    with profile_query(f"{query.strip()} ({search_type}, {match_mode})"):
+        result = search_corpus(corpus, query, search_type, match_mode, cross_script, sources)
+    if use_cache:
+        query_cache_put(query_cache, key, corpus["corpus_version"], result)
+    record_query(query, search_type, match_mode, time.perf_counter() - start_time, len(result[0]))
+    return result
+
+# Pencarian di sisi endpoint SPARQL (AKSARA_SEARCH_BACKEND=sparql): korpus tidak dimuat ke proses web
+# Fungsi query dibuat sekali per proses (graph rdflib untuk sumber ttl)
+@st.cache_resource
+def load_sparql_query_runner(source, location):
+    return get_query_runner(source, location)
+
+# Tanpa korpus tidak ada tabel transliterasi dari pasangan kata; hanya aturan aksara yang dipakai
+RULE_TRANSLITERATION_TABLE = build_transliteration_table(pd.DataFrame())
+
+# Hanya subjek yang mungkin cocok yang diambil dari endpoint, lalu search_text memverifikasi
+# dan mengelompokkannya sehingga struktur hasil sama dengan pencarian di memori. Tanpa
+# statistik korpus lengkap, hasil tidak diberi peringkat BM25. Elemen ketiga hasil
+# bernilai True jika kandidat terpotong oleh PUSHDOWN_LIMIT (hasil tidak lengkap).
+def pushdown_search_text(run_query, query, search_type="all", match_mode="word", cross_script=False):
+    transliteration_table = RULE_TRANSLITERATION_TABLE if cross_script else None
+    cross_query = transliterate_query(transliteration_table, query, match_mode) if cross_script else None
+    df, truncated = fetch_pushdown_rows(run_query, query.strip(), search_type, match_mode, cross_query)
+    if df.empty and query.strip():
+        # Tidak ada kandidat: hasil kosong dengan struktur yang sama seperti pencarian di memori
+        compiled_query = compile_search_query(query.strip(), match_mode, cross_query)
+        return group_search_results(df, query.strip(), compiled_query, cross_query) + (truncated,)
+    return search_text(df, query, search_type, None, match_mode, transliteration_table=transliteration_table) + (truncated,)
+
+# Pencarian endpoint lewat cache pencarian bersama; versi "korpus" adalah lokasi endpoint
+# (beserta batas kandidat yang menentukan hasil), sehingga perubahan data di endpoint
+# terlihat setelah TTL cache habis
+def cached_pushdown_search_text(run_query, location, query, search_type, match_mode="word", cross_script=False):
+    query_cache = get_query_cache()
+    key = make_query_key(query, search_type, match_mode, cross_script)
+    corpus_version = f"sparql:{location}:{PUSHDOWN_LIMIT}"
+    start_time = time.perf_counter()
+    cached = query_cache_get(query_cache, key, corpus_version)
+    if cached is not None:
+        record_query(query, search_type, match_mode, time.perf_counter() - start_time, len(cached[0]), cached=True)
+        return cached
+    with profile_query(f"{query.strip()} ({search_type}, {match_mode}, sparql)"):
+        result = pushdown_search_text(run_query, query, search_type, match_mode, cross_script)
+    query_cache_put(query_cache, key, corpus_version, result)
+    record_query(query, search_type, match_mode, time.perf_counter() - start_time, len(result[0]))
+    return result
+
+# Pencarian langsung (search-as-you-type)
+LIVE_DEBOUNCE_MS = 300
+LIVE_SUGGESTION_LIMIT = 8
+
+# Kotak pencarian yang mengirim teks setelah pengguna berhenti mengetik (lihat components/)
+live_search_input = components.declare_component(
+    "live_search_input", path=str(Path(__file__).resolve().parent / "components" / "live_search_input")
+)
+
+# Jeda setelah tombol keyboard aksara Jawa terakhir sebelum teks dikirim ke Python
+KEYBOARD_DEBOUNCE_MS = 800
+
+# Keyboard aksara Jawa yang menyusun teks di browser (lihat components/)
+javanese_keyboard = components.declare_component(
+    "javanese_keyboard", path=str(Path(__file__).resolve().parent / "components" / "javanese_keyboard")
+)
+
+# Hasil sebelumnya boleh dipersempit jika query baru hanya menambah karakter di belakang.
+# Berlaku untuk mode awalan/substring: setiap baris yang cocok dengan query yang lebih
+# panjang pasti juga cocok dengan query sebelumnya. Pada pencarian lintas aksara
+# transliterasinya juga harus hanya bertambah di belakang.
+def can_narrow_results(previous, query, search_type, match_mode, compiled_query, corpus_version, sources=None):
+    if previous is None or match_mode not in ("prefix", "substring"):
+        return False
+    if (previous["search_type"], previous["match_mode"], previous["corpus_version"]) != (search_type, match_mode, corpus_version):
+        return False
+    if previous["is_javanese"] != compiled_query["is_javanese"]:
+        return False
+    if previous["cross_script"] != compiled_query["cross_script"]:
+        return False
+    if previous["sources"] != sources:
+        return False
+    if compiled_query["cross_script"]:
+        return (compiled_query["latin_query"].lower().startswith(previous["latin_query"].lower())
+                and compiled_query["javanese_query"].startswith(previous["javanese_query"]))
+    if compiled_query["is_javanese"]:
+        return query.startswith(previous["query"])
+    return query.lower().startswith(previous["query"].lower())
+
+# Pencarian untuk mode langsung: mempersempit kandidat dari ketikan sebelumnya bila bisa.
+# Hasil tidak dimasukkan ke cache pencarian agar query setengah jadi tidak menggeser
+# query populer dari cache. Mengembalikan (row_ids, final_grouped_results, state).
+def live_search_text(corpus_store, query, search_type, match_mode, previous=None, cross_script=False, sources=None):
+    query = query.strip()
+    if not query:
+        return NO_ROW_IDS, {}, None
+    corpus = search_view(corpus_store)
+    if match_mode in ("fuzzy", "boolean"):
+        # Pencarian mirip dan kueri boolean sudah dijawab dari indeks, tanpa penyempitan
+        row_ids, final_grouped_results = search_corpus(corpus, query, search_type, match_mode, cross_script, sources)
+        return row_ids, final_grouped_results, None
+    transliteration_table = corpus["transliteration_table"] if cross_script else None
+    cross_query = transliterate_query(transliteration_table, query, match_mode) if cross_script else None
+    compiled_query = compile_search_query(query, match_mode, cross_query)
+
+    df = corpus["df"]
+    search_index = corpus["search_index"]
+    corpus_version = corpus["corpus_version"]
+    narrowed = can_narrow_results(previous, query, search_type, match_mode, compiled_query, corpus_version, sources)
+    candidate_ids = None
+    if narrowed:
+        # Cukup periksa ulang baris kandidat sebelumnya dengan regex
+        candidate_ids = previous["row_ids"]
+        search_index = None
+    field_matches = find_matching_rows(
+        df, query, compiled_query, search_type, search_index, match_mode, corpus["suffix_arrays"],
+        candidate_ids
+    )
+    row_ids = filter_sources(df, union_row_ids(field_matches), sources)
+    matches = take_result_rows(df, row_ids)
+    row_scores = score_matching_rows(
+        matches, compiled_query, search_type, corpus["search_index"],
+        corpus["ranking_stats"], corpus["suffix_arrays"]
+    )
+
+    result_ids, final_grouped_results = group_search_results(
+        matches, query, compiled_query, cross_query, row_scores, RESULT_TOP_K,
+        found_in_bitmaps(matches.index, field_matches)
+    )
+    state = {
+        "query": query,
+        "search_type": search_type,
+        "match_mode": match_mode,
+        "is_javanese": compiled_query["is_javanese"],
+        "cross_script": compiled_query["cross_script"],
+        "latin_query": compiled_query["latin_query"],
+        "javanese_query": compiled_query["javanese_query"],
+        "sources": sources,
+        "corpus_version": corpus_version,
+        "narrowed": narrowed,
+        # Label baris sebelum duplikat URI dihapus, agar penyempitan berikutnya tetap lengkap
+        "row_ids": sorted(row_ids.tolist()),
+    }
+    return result_ids, final_grouped_results, state
+
+# Saran kata dari indeks untuk kata terakhir yang sedang diketik
+def get_live_suggestions(corpus_store, query, search_type, limit=LIVE_SUGGESTION_LIMIT):
+    query = query.lstrip()
+    if not query.strip():
+        return []
+    if is_javanese_text(query):
+        fields, split_re = ["javanese"], JAVANESE_SPLIT_RE
+    elif search_type in ["latin", "translation"]:
+        fields, split_re = [search_type], LATIN_SPLIT_RE
+    elif search_type == "all":
+        fields, split_re = ["latin", "translation"], LATIN_SPLIT_RE
+    else:
+        return []
+
+    # Kata terakhir dilengkapi, bagian query sebelumnya dipertahankan apa adanya
+    last_word = split_re.split(query)[-1]
+    if not last_word:
+        return []
+    head = query[:len(query) - len(last_word)]
+    corpus = search_view(corpus_store)
+    completions = suggest_completions(corpus["search_index"], corpus["suffix_arrays"], fields, last_word, limit + 1)
+    normalized_word = last_word if fields == ["javanese"] else last_word.lower()
+    return [head + completion for completion in completions if completion != normalized_word][:limit]
+
+# Callback saran kata: salin saran yang dipilih ke query lalu kosongkan pilihan
+def apply_live_suggestion():
+    suggestion = st.session_state.get("live_suggestion")
+    if suggestion:
+        st.session_state.search_query = suggestion
+    st.session_state.live_suggestion = None
+
+# Fungsi untuk mendapatkan karakter aksara Jawa unik dari dataset.
+# Tidak memakai st.cache_data: hasilnya disimpan di korpus bersama per versi korpus
 def get_unique_javanese_chars(df):
     """Ekstrak karakter aksara Jawa unik dari dataset"""
     if df.empty or 'isiAksaraJawa' not in df.columns:
@@ -94,158 +482,423 @@ def get_unique_javanese_chars(df):
         return sorted(list(all_chars))
     
     # Kumpulkan semua karakter dari kolom aksara Jawa
-    all_chars = set()
-    for text in df['isiAksaraJawa'].dropna():
-        for char in str(text):
-            # Filter hanya karakter aksara Jawa (Unicode range: U+A980-U+A9DF)
-            if '\ua980' <= char <= '\ua9df':
-                all_chars.add(char)
-    
-    # Urutkan karakter
-    sorted_chars = sorted(list(all_chars))
-    return sorted_chars
+    return collect_javanese_chars(df['isiAksaraJawa'].dropna())
 
-# Fungsi pencarian dengan presisi tinggi dan word boundary yang tepat
-def search_text(df, query, search_type="all"):
-    if df.empty or not query.strip():
-        return pd.DataFrame(), {}
-    
-    query = query.strip()
-    results = pd.DataFrame()
+# Teks aksara Jawa korpus untuk menghitung frekuensi karakter keyboard
+def corpus_texts(df):
+    if df.empty or 'isiAksaraJawa' not in df.columns:
+        return []
+    return df['isiAksaraJawa'].dropna()
+
+# Cari id baris (pd.Index, urut label baris) yang cocok pada satu kolom, memakai indeks
+# terbalik jika tersedia. Mode awalan/substring memakai suffix array kosakata jika tersedia.
+# candidate_ids membatasi pemeriksaan regex pada baris tersebut. Hanya kolom yang dicari
+# yang dibaca dari DataFrame; baris korpus tidak disalin.
+def find_field_matches(df, search_index, field, column, query, pattern, match_mode="word", suffix_arrays=None,
+                       candidate_ids=None):
+    if search_index is not None and (match_mode == "word" or suffix_arrays is not None):
+        if match_mode == "word":
+            row_ids, exact = lookup_candidates(search_index, field, query)
+        else:
+            row_ids, exact = lookup_partial_candidates(search_index, suffix_arrays, field, query, match_mode)
+        if row_ids is not None:
+            # Urutkan id agar urutan hasil sama dengan urutan DataFrame
+            row_ids = pd.Index(sorted(row_ids), dtype="int64")
+            if exact:
+                return row_ids
+            # Query berupa frasa: verifikasi kandidat dengan regex
+            texts = df[column].loc[row_ids]
+            return row_ids[texts.astype(str).str.contains(pattern, na=False).to_numpy()]
+
+    texts = df[column] if candidate_ids is None else df[column].loc[candidate_ids]
+    return texts.index[texts.astype(str).str.contains(pattern, na=False).to_numpy()]
+
+# Id baris yang cocok pada setiap kolom yang dicari: {field: pd.Index id baris}, berurutan
+# Latin, terjemahan, lalu aksara Jawa. Dipakai untuk gabungan hasil dan bitmap "ditemukan dalam".
+def find_matching_rows(df, query, compiled_query, search_type="all", search_index=None,
+                       match_mode="word", suffix_arrays=None, candidate_ids=None):
+    field_matches = {}
     
     # Cek apakah query adalah aksara Jawa
-    is_javanese_query = any('\ua980' <= char <= '\ua9df' for char in query)
+    is_javanese_query = compiled_query['is_javanese']
+    # Query lintas aksara dicari di semua kolom, dengan bentuk query sesuai aksara kolomnya
+    cross_script = compiled_query['cross_script']
+    latin_query = compiled_query['latin_query']
+    javanese_query = compiled_query['javanese_query']
     
     if search_type in ["all", "latin"]:
         # Pencarian presisi dalam kolom isiLatin dengan word boundary ketat
-        if is_javanese_query:
+        if is_javanese_query and not cross_script:
             # Jika query aksara Jawa, skip pencarian latin
             pass
         else:
-            # Gunakan word boundary yang ketat untuk Latin
-            # \b untuk word boundary standar, ditambah pengecekan spasi dan tanda baca
-            pattern = rf'(?:^|[\s\-.,;:!?()[\]{{}}"\'/\\]){re.escape(query.lower())}(?=[\s\-.,;:!?()[\]{{}}"\'/\\]|$)'
-            latin_matches = df[df['isiLatin'].astype(str).str.contains(pattern, case=False, na=False, regex=True)]
-            results = pd.concat([results, latin_matches], ignore_index=True)
+            # Gunakan word boundary yang ketat untuk Latin (spasi dan tanda baca)
+            pattern = compiled_query['latin_ignorecase']
+            field_matches['latin'] = find_field_matches(
+                df, search_index, 'latin', 'isiLatin', latin_query, pattern, match_mode, suffix_arrays, candidate_ids
+            )
     
     if search_type in ["all", "translation"]:
         # Pencarian presisi dalam kolom arti dengan word boundary ketat
-        if is_javanese_query:
+        if is_javanese_query and not cross_script:
             # Jika query aksara Jawa, skip pencarian terjemahan
             pass
         else:
-            pattern = rf'(?:^|[\s\-.,;:!?()[\]{{}}"\'/\\]){re.escape(query.lower())}(?=[\s\-.,;:!?()[\]{{}}"\'/\\]|$)'
-            translation_matches = df[df['arti'].astype(str).str.contains(pattern, case=False, na=False, regex=True)]
-            results = pd.concat([results, translation_matches], ignore_index=True)
+            pattern = compiled_query['latin_ignorecase']
+            field_matches['translation'] = find_field_matches(
+                df, search_index, 'translation', 'arti', latin_query, pattern, match_mode, suffix_arrays, candidate_ids
+            )
     
     if search_type in ["all", "javanese"]:
         # Pencarian dalam kolom isiAksaraJawa dengan exact matching yang lebih presisi
-        if is_javanese_query:
+        if is_javanese_query or cross_script:
             # Untuk aksara Jawa, gunakan exact match dengan word boundary aksara Jawa
             # Aksara Jawa memiliki pemisah kata yang berbeda (spasi, tanda baca Jawa)
-            javanese_separators = r'[\s\u00A0\u2000-\u200F\u2028\u2029\uA9C1-\uA9CD\uA9CF-\uA9D9\uA9DE\uA9DF]'
-            pattern = rf'(?:^|{javanese_separators}){re.escape(query)}(?={javanese_separators}|$)'
-            exact_matches = df[df['isiAksaraJawa'].astype(str).str.contains(pattern, na=False, regex=True)]
-            results = pd.concat([results, exact_matches], ignore_index=True)
+            pattern = compiled_query['javanese']
+            field_matches['javanese'] = find_field_matches(
+                df, search_index, 'javanese', 'isiAksaraJawa', javanese_query, pattern, match_mode, suffix_arrays,
+                candidate_ids
+            )
         else:
             # Jika query bukan aksara Jawa, skip pencarian aksara Jawa atau cari transliterasi
             pass
     
-    # Hapus duplikat berdasarkan URI unik
-    results = results.drop_duplicates(subset=['s']).reset_index(drop=True)
+    return field_matches
+
+# Gabungan id baris semua kolom tanpa duplikat, dengan urutan kemunculan pertama
+def union_row_ids(field_matches):
+    if not field_matches:
+        return NO_ROW_IDS
+    row_ids = list(field_matches.values())
+    return row_ids[0].append(row_ids[1:]).drop_duplicates()
+
+# Bitmap "ditemukan dalam" untuk setiap kolom yang dicari, sejajar dengan id baris hasil
+def found_in_bitmaps(row_ids, field_matches):
+    return {field: row_ids.isin(field_ids) for field, field_ids in field_matches.items()}
+
+# Ambil baris hasil dari korpus sekali saja, satu baris per URI unik (per naskah pada
+# korpus gabungan) dengan urutan kemunculan pertama
+def take_result_rows(df, row_ids):
+    matches = df.loc[row_ids]
+    duplicated = matches.duplicated(subset=[SOURCE_TAG_COLUMN, 's'] if SOURCE_TAG_COLUMN in df.columns else ['s'])
+    if duplicated.any():
+        matches = matches[~duplicated]
+    return matches
+
+# Pencarian mirip: kata tanpa diakritik dan dengan toleransi salah ketik, dijawab dari
+# indeks n-gram kosakata. Baris diurutkan dari total jarak edit terkecil.
+# Mengembalikan (id baris yang cocok, token kosakata yang cocok).
+def find_fuzzy_rows(df, query, search_type, search_index, fuzzy_index, cross_query=None):
+    # Query per kolom; transliterasi (jika ada) dicari pada kolom aksara lainnya
+    if is_javanese_text(query):
+        latin_query, javanese_query = cross_query, query
+    else:
+        latin_query, javanese_query = query, cross_query
+    field_queries = {}
+    if latin_query is not None:
+        for field in ['latin', 'translation']:
+            if search_type in ["all", field]:
+                field_queries[field] = latin_query
+    if javanese_query is not None and search_type in ["all", "javanese"]:
+        field_queries['javanese'] = javanese_query
+
+    row_distances = {}
+    matched_terms = set()
+    for field, field_query in field_queries.items():
+        field_distances, field_terms = lookup_fuzzy_candidates(search_index, fuzzy_index, field, field_query)
+        matched_terms.update(field_terms)
+        for row_id, distance in field_distances.items():
+            row_distances[row_id] = min(distance, row_distances.get(row_id, distance))
+
+    ranked_ids = sorted(row_distances, key=lambda row_id: (row_distances[row_id], row_id))
+    return pd.Index(ranked_ids, dtype="int64"), matched_terms
+
+# Id baris hasil untuk query kosong
+NO_ROW_IDS = pd.Index([], dtype="int64")
+
+# Fungsi pencarian dengan presisi tinggi dan word boundary yang tepat
+# Mengembalikan (id baris hasil tanpa duplikat, final_grouped_results).
+# transliteration_table: jika diberikan, query juga dicari dalam aksara lainnya
+# (Latin -> aksara Jawa atau sebaliknya).
+# ranking_stats: jika diberikan, hasil diurutkan dengan skor BM25 dan hanya top_k grup
+# Kata/Paragraf terbaik yang dibentuk (selain mode mirip yang diurutkan menurut jarak edit).
+# sources: jika diberikan, hanya hasil dari naskah (nilai kolom sumber) tersebut yang dikembalikan.
+# Mode boolean menghasilkan QuerySyntaxError jika kueri tidak dapat diurai.
+@timed("search_text")
+def search_text(df, query, search_type="all", search_index=None, match_mode="word", suffix_arrays=None,
+                fuzzy_index=None, transliteration_table=None, ranking_stats=None, top_k=None,
+                positional_index=None, sources=None):
+    if df.empty or not query.strip():
+        return NO_ROW_IDS, {}
+    
+    query = query.strip()
+    if match_mode == "boolean":
+        return search_boolean_query(
+            df, query, search_type, search_index, transliteration_table, ranking_stats, top_k, positional_index,
+            sources
+        )
+    cross_query = None
+    if transliteration_table is not None:
+        cross_query = transliterate_query(
+            transliteration_table, query, "word" if match_mode == "fuzzy" else match_mode
+        )
+    
+    if match_mode == "fuzzy":
+        if search_index is None:
+            search_index = build_search_index(df)
+        if fuzzy_index is None:
+            fuzzy_index = build_fuzzy_index(search_index)
+        row_ids, matched_terms = find_fuzzy_rows(df, query, search_type, search_index, fuzzy_index, cross_query)
+        matches = take_result_rows(df, filter_sources(df, row_ids, sources))
+        matched_terms = tuple(sorted(matched_terms))
+        row_ids, final_grouped_results = group_search_results(
+            matches, query, compile_terms_query(query, matched_terms, cross_query), cross_query
+        )
+        # Token yang cocok disimpan untuk highlight saat hasil ditampilkan
+        for group_data in final_grouped_results.values():
+            group_data["matched_terms"] = matched_terms
+        return row_ids, final_grouped_results
+    
+    # Kompilasi semua pola untuk query ini sekali saja
+    compiled_query = compile_search_query(query, match_mode, cross_query)
+    
+    # Id baris per kolom digabung dan disaring dulu; baris korpus diambil sekali saja
+    field_matches = find_matching_rows(df, query, compiled_query, search_type, search_index, match_mode, suffix_arrays)
+    matches = take_result_rows(df, filter_sources(df, union_row_ids(field_matches), sources))
+    row_scores = None
+    if ranking_stats is not None:
+        if search_index is None:
+            search_index = build_search_index(df)
+        row_scores = score_matching_rows(
+            matches, compiled_query, search_type, search_index, ranking_stats, suffix_arrays
+        )
+    return group_search_results(
+        matches, query, compiled_query, cross_query, row_scores, top_k, found_in_bitmaps(matches.index, field_matches)
+    )
+
+# Id baris dari naskah yang dipilih saja (korpus gabungan beberapa sumber); None berarti semua naskah.
+# Indeks dibangun untuk seluruh korpus, sehingga pilihan naskah cukup menyaring hasil.
+def filter_sources(df, row_ids, sources):
+    if sources is None or SOURCE_TAG_COLUMN not in df.columns:
+        return row_ids
+    return row_ids[df[SOURCE_TAG_COLUMN].loc[row_ids].isin(sources).to_numpy()]
+
+# Skor BM25 untuk setiap baris hasil (label index unik), memakai query per kolom yang dicari
+def score_matching_rows(matches, compiled_query, search_type, search_index, ranking_stats, suffix_arrays=None):
+    if matches.empty:
+        return pd.Series(dtype=float)
+    field_queries = {}
+    searches_latin = not compiled_query['is_javanese'] or compiled_query['cross_script']
+    searches_javanese = compiled_query['is_javanese'] or compiled_query['cross_script']
+    if searches_latin:
+        for field in ['latin', 'translation']:
+            if search_type in ["all", field]:
+                field_queries[field] = compiled_query['latin_query']
+    if searches_javanese and search_type in ["all", "javanese"]:
+        field_queries['javanese'] = compiled_query['javanese_query']
+
+    return bm25_scores(
+        matches, search_index, ranking_stats, field_queries, compiled_query['match_mode'], suffix_arrays
+    )
+
+# Kueri boolean (AND/OR/NOT, frasa, awalan field, NEAR) pada teks Paragraf, dijawab dengan
+# irisan posting list dan posisi token dari indeks posisi, bukan dengan regex gabungan
+def search_boolean_query(df, query, search_type="all", search_index=None, transliteration_table=None,
+                         ranking_stats=None, top_k=None, positional_index=None, sources=None):
+    if positional_index is None:
+        positional_index = build_positional_index(df)
+    row_ids, field_terms = execute_boolean_query(
+        parse_boolean_query(query), positional_index, search_type, transliteration_table
+    )
+    matches = take_result_rows(df, filter_sources(df, pd.Index(sorted(row_ids), dtype="int64"), sources))
+
+    row_scores = None
+    if ranking_stats is not None:
+        if search_index is None:
+            search_index = build_search_index(df)
+        field_queries = {field: " ".join(sorted(tokens)) for field, tokens in field_terms.items()}
+        row_scores = bm25_scores(matches, search_index, ranking_stats, field_queries)
+
+    # Token yang dicari (bukan bagian NOT) dipakai untuk konteks dan highlight
+    matched_terms = tuple(sorted(set().union(*field_terms.values())))
+    row_ids, final_grouped_results = group_search_results(
+        matches, query, compile_terms_query(query, matched_terms), None, row_scores, top_k
+    )
+    for group_data in final_grouped_results.values():
+        group_data["matched_terms"] = matched_terms
+    return row_ids, final_grouped_results
+
+# Pola query biasa, atau pola gabungan jika query juga dicari dalam aksara lainnya
+def compile_search_query(query, match_mode="word", cross_query=None):
+    if cross_query is None:
+        return compile_query(query, match_mode)
+    return compile_cross_script_query(query, cross_query, match_mode)
+
+# Kelompokkan baris hasil (tanpa duplikat URI, lihat take_result_rows) untuk ditampilkan.
+# row_scores (skor relevansi per label baris) mengurutkan grup dari yang paling relevan
+# dan membatasi jumlahnya menjadi top_k per jenis. found_in (bitmap per kolom yang dicari)
+# dipakai untuk flag "ditemukan dalam" tanpa menjalankan regex lagi.
+# Mengembalikan (id baris hasil, final_grouped_results); id baris adalah label baris korpus
+# (pd.Index), sehingga cache hasil tidak menyimpan salinan DataFrame.
+def group_search_results(matches, query, compiled_query, cross_query=None, row_scores=None, top_k=None,
+                         found_in=None):
+    row_ids = matches.index
+    if row_scores is not None:
+        row_scores = row_scores.reset_index(drop=True)
+    results = matches.reset_index(drop=True)
     
     # Hail dari Grup (e.g., all "pada" words together)
-    grouped_by_content = group_results_by_content(results, query)
+    grouped_by_content = group_results_by_content(results, query, compiled_query, row_scores, top_k, found_in)
 
     final_grouped_results = restructure_results_for_display(grouped_by_content, query)
+    if row_scores is not None and not results.empty:
+        for group_type, group_data in final_grouped_results.items():
+            # Jumlah kemunculan tetap dihitung dari semua hasil, termasuk grup di luar top_k
+            group_data["shown_occurrences"] = group_data["total_occurrences"]
+            group_data["total_occurrences"] = int((results['type'] == group_type).sum())
+            group_data["ranked"] = True
+    if cross_query is not None:
+        # Transliterasi query disimpan untuk highlight dan keterangan saat hasil ditampilkan
+        for group_data in final_grouped_results.values():
+            group_data["cross_query"] = cross_query
     
-    return results, final_grouped_results
+    return row_ids, final_grouped_results
 
 # New: Function to group results by content for 'Kata' and by context for 'Paragraf'
-def group_results_by_content(df, query):
+@timed("group_results_by_content")
+def group_results_by_content(df, query, compiled_query=None, row_scores=None, top_k=None, found_in=None):
     if df.empty:
         return {}
     
     grouped = {}
-    query_lower = query.lower()
-    is_javanese_query = any('\ua980' <= char <= '\ua9df' for char in query)
-
-    def is_exact_word_match(text, query_term, is_javanese=False):
-        if pd.isna(text) or not text.strip():
-            return False
-        text_str = str(text)
-        if is_javanese:
-            javanese_separators = r'[\s\u00A0\u2000-\u200F\u2028\u2029\uA9C1-\uA9CD\uA9CF-\uA9D9\uA9DE\uA9DF]'
-            pattern = rf'(?:^|{javanese_separators}){re.escape(query_term)}(?={javanese_separators}|$)'
-            return bool(re.search(pattern, text_str))
-        else:
-            pattern = rf'(?:^|[\s\-.,;:!?()[\]{{}}"\'/\\]){re.escape(query_term.lower())}(?=[\s\-.,;:!?()[\]{{}}"\'/\\]|$)'
-            return bool(re.search(pattern, text_str.lower()))
-
-    for idx, row in df.iterrows():
-        s_uri = row['s']
-        isi_latin = row['isiLatin'] if pd.notna(row['isiLatin']) else ''
-        arti = row['arti'] if pd.notna(row['arti']) else ''
-        isi_aksara_jawa = row['isiAksaraJawa'] if pd.notna(row['isiAksaraJawa']) else ''
-        
-        is_latin_exact_match = is_exact_word_match(isi_latin, query, False) if not is_javanese_query else False
-        is_javanese_exact_match = is_exact_word_match(isi_aksara_jawa, query, True) if is_javanese_query else False
-        
-        # Determine the key for this level of grouping
-        current_group_key = ""
-        
-        if row['type'] == 'Kata' and (is_latin_exact_match or is_javanese_exact_match):
-            current_group_key = f"Kata: '{query}'"
-            main_word = query
-            if current_group_key not in grouped:
-                main_javanese = isi_aksara_jawa if pd.notna(isi_aksara_jawa) else ""
-                main_translation = arti if pd.notna(arti) else ""
-            else:
-                main_javanese = grouped[current_group_key]['main_javanese']
-                main_translation = grouped[current_group_key]['main_translation']
+    if compiled_query is None:
+        compiled_query = compile_query(query)
+    is_javanese_query = compiled_query['is_javanese']
+
+    # Kolom teks dengan nilai kosong diganti string kosong
+    isi_latin = df['isiLatin'].fillna('').astype(str)
+    arti = df['arti'].fillna('').astype(str)
+    isi_aksara_jawa = df['isiAksaraJawa'].fillna('').astype(str)
+    types = df['type']
+
+    # Flag kecocokan kata utuh per kolom, dihitung sekaligus untuk semua baris. Kolom yang
+    # sudah dicari memakai bitmap found_in; kolom lain diperiksa dengan regex.
+    def field_found(field, texts, pattern):
+        if found_in is not None and field in found_in:
+            return pd.Series(found_in[field], index=df.index)
+        return texts().str.contains(pattern, na=False)
+
+    no_match = pd.Series(False, index=df.index)
+    if compiled_query['cross_script'] or not is_javanese_query:
+        latin_found = field_found('latin', lambda: isi_latin.str.lower(), compiled_query['latin'])
+        translation_found = field_found('translation', lambda: arti.str.lower(), compiled_query['latin'])
+    else:
+        latin_found = no_match
+        translation_found = no_match
+    if compiled_query['cross_script'] or is_javanese_query:
+        javanese_found = field_found('javanese', lambda: isi_aksara_jawa, compiled_query['javanese'])
+    else:
+        javanese_found = no_match
 
-        elif row['type'] == 'Paragraf':
-            paragraph_id = s_uri.split('#')[-1] if pd.notna(s_uri) else 'Unknown_Paragraf'
-            current_group_key = f"Paragraf: {paragraph_id} - Mengandung '{query}'"
+    # Tentukan kunci grup untuk setiap baris:
+    # - Kata yang cocok persis dengan query -> satu grup "Kata: 'query'"
+    # - Paragraf -> satu grup per paragraf
+    # - Kata lain (cocok lewat terjemahan) -> satu grup per kata
+    is_kata = types == 'Kata'
+    is_paragraf = types == 'Paragraf'
+    is_query_kata = is_kata & (latin_found | javanese_found)
+    if compiled_query['match_mode'] != 'word':
+        # Pada mode awalan/substring kata yang cocok sebagian tetap dikelompokkan per kata
+        is_query_kata &= ((isi_latin.str.lower() == compiled_query['latin_query'].lower())
+                          | (isi_aksara_jawa == compiled_query['javanese_query']))
+    paragraph_ids = df['s'].str.split('#').str[-1].fillna('Unknown_Paragraf')
+    if SOURCE_TAG_COLUMN in df.columns:
+        # Nomor paragraf hanya unik di dalam satu naskah
+        paragraph_ids = df[SOURCE_TAG_COLUMN].astype(str) + "/" + paragraph_ids
+
+    group_keys = "Kata: '" + isi_latin + "' (" + isi_aksara_jawa + f") - Mengandung '{query}'"
+    group_keys = group_keys.where(~is_paragraf, "Paragraf: " + paragraph_ids + f" - Mengandung '{query}'")
+    group_keys = group_keys.where(~is_query_kata, f"Kata: '{query}'")
+    group_keys = group_keys[is_kata | is_paragraf]
+
+    # Kolom yang dibutuhkan untuk detail kemunculan, diambil sekali sebagai list
+    s_uris = df['s'].tolist()
+    type_values = types.tolist()
+    latin_values = isi_latin.tolist()
+    translation_values = arti.tolist()
+    javanese_values = isi_aksara_jawa.tolist()
+    references = get_paragraph_references(df).tolist()
+    latin_flags = latin_found.tolist()
+    translation_flags = translation_found.tolist()
+    javanese_flags = javanese_found.tolist()
+    query_kata_flags = is_query_kata.tolist()
+
+    positions = pd.Series(range(len(df)), index=df.index)[group_keys.index]
+    position_groups = positions.groupby(group_keys, sort=False)
+    if row_scores is None:
+        ordered_groups = ((group_key, group_positions.tolist()) for group_key, group_positions in position_groups)
+        score_values = None
+    else:
+        # Skor grup = skor kemunculan terbaiknya; hanya top_k grup per jenis yang dibentuk
+        score_values = row_scores.tolist()
+        group_scores = row_scores[group_keys.index].groupby(group_keys, sort=False).max()
+        group_types = types[group_keys.index].groupby(group_keys, sort=False).first()
+        group_members = {group_key: group_positions.tolist() for group_key, group_positions in position_groups}
+        ordered_groups = (
+            (group_key, sorted(group_members[group_key], key=lambda pos: -score_values[pos]))
+            for group_key in top_k_groups(group_scores.to_dict(), group_types.to_dict(), top_k)
+        )
+
+    for group_key, group_positions in ordered_groups:
+        first = group_positions[0]
+        row_type = type_values[first]
+
+        # Informasi utama grup diambil dari kemunculan pertama
+        if row_type == 'Paragraf':
             main_word = f"Mencari: {query}"
-            main_javanese = extract_javanese_context(isi_aksara_jawa, query, 100)
-            main_translation = extract_translation_context(arti, query, 100)
-
-        elif row['type'] == 'Kata':
-            current_group_key = f"Kata: '{isi_latin}' ({isi_aksara_jawa}) - Mengandung '{query}'"
-            main_word = isi_latin
-            main_javanese = isi_aksara_jawa
-            main_translation = arti
-        
-        if current_group_key not in grouped:
-            grouped[current_group_key] = {
-                'main_word': main_word,
-                'main_javanese': main_javanese,
-                'main_translation': main_translation,
-                'occurrences': [],
-                'total_count': 0,
-                'type': row['type'] # Keep track of original type for restructuring
-            }
-        
-        occurrence_detail = {
-            's_uri': s_uri, # Keep URI for uniqueness within occurrence list if needed later
-            'type': row['type'],
-            'javanese': isi_aksara_jawa,
-            'latin': isi_latin,
-            'translation': arti,
-            'paragraph_reference': get_paragraph_reference(row),
-            'found_in': {
-                'latin': is_latin_exact_match, # still refer to exact word match
-                'translation': is_exact_word_match(arti, query, False) if not is_javanese_query else False,
-                'javanese': is_javanese_exact_match
+            main_javanese = extract_javanese_context(javanese_values[first], compiled_query['javanese_query'], 100)
+            main_translation = extract_translation_context(translation_values[first], query, 100, compiled_query)
+        elif query_kata_flags[first]:
+            main_word = query
+            main_javanese = javanese_values[first]
+            main_translation = translation_values[first]
+        else:
+            main_word = latin_values[first]
+            main_javanese = javanese_values[first]
+            main_translation = translation_values[first]
+
+        occurrences = [
+            {
+                's_uri': s_uris[pos], # Keep URI for uniqueness within occurrence list if needed later
+                'type': type_values[pos],
+                'javanese': javanese_values[pos],
+                'latin': latin_values[pos],
+                'translation': translation_values[pos],
+                'paragraph_reference': references[pos],
+                'found_in': {
+                    'latin': latin_flags[pos], # still refer to exact word match
+                    'translation': translation_flags[pos],
+                    'javanese': javanese_flags[pos]
+                }
             }
+            for pos in group_positions
+        ]
+
+        grouped[group_key] = {
+            'main_word': main_word,
+            'main_javanese': main_javanese,
+            'main_translation': main_translation,
+            'occurrences': occurrences,
+            'total_count': len(occurrences),
+            'type': row_type # Keep track of original type for restructuring
         }
-        grouped[current_group_key]['occurrences'].append(occurrence_detail)
-        grouped[current_group_key]['total_count'] += 1
+        if score_values is not None:
+            grouped[group_key]['score'] = score_values[first]
     
     return grouped
 
 # New: Function to restructure results for top-level Kata and Paragraf groups
+@timed("restructure_results_for_display")
 def restructure_results_for_display(grouped_by_content, query):
     final_grouped_results = {
         "Kata": {
@@ -289,17 +942,27 @@ def get_paragraph_reference(row):
     
     return " | ".join(reference_parts) if reference_parts else "Referensi tidak tersedia"
 
+# Versi kolumnar dari get_paragraph_reference untuk seluruh DataFrame sekaligus
+def get_paragraph_references(df):
+    paragraph_ids = df['s'].str.split('#').str[-1]
+    references = pd.Series("Referensi tidak tersedia", index=df.index)
+    is_own_paragraph = (df['type'] == 'Paragraf') & df['s'].notna()
+    references = references.where(~is_own_paragraph, "Paragraf: " + paragraph_ids)
+    has_parent = df['munculDalamParagraf'].notna()
+    references = references.where(~has_parent, "Paragraf: " + df['munculDalamParagraf'].astype(str))
+    if SOURCE_TAG_COLUMN in df.columns:
+        references = "Naskah: " + df[SOURCE_TAG_COLUMN].astype(str) + " | " + references
+    return references
+
 # Helper functions for context extraction
 def extract_javanese_context(text, query, context_length=50):
     if not text or not query:
         return text
     
-    # Untuk aksara Jawa, ambil konteks di sekitar query
+    # Untuk aksara Jawa, ambil konteks di sekitar query (pencarian substring biasa)
     try:
-        pattern = rf'{re.escape(query)}'
-        match = re.search(pattern, text)
-        if match:
-            start_idx = match.start()
+        start_idx = text.find(query)
+        if start_idx != -1:
             start = max(0, start_idx - context_length)
             end = min(len(text), start_idx + len(query) + context_length)
             context = text[start:end]
@@ -313,14 +976,15 @@ def extract_javanese_context(text, query, context_length=50):
         pass
     return text
 
-def extract_translation_context(text, query, context_length=100):
+def extract_translation_context(text, query, context_length=100, compiled_query=None):
     if not text or not query:
         return text
     
     try:
         # Gunakan pattern yang sama dengan pencarian utama
-        pattern = rf'(?:^|[\s\-.,;:!?()[\]{{}}"\'/\\]){re.escape(query.lower())}(?=[\s\-.,;:!?()[\]{{}}"\'/\\]|$)'
-        match = re.search(pattern, text.lower())
+        if compiled_query is None:
+            compiled_query = compile_query(query)
+        match = compiled_query['latin'].search(text.lower())
         if match:
             start_idx = match.start()
             start = max(0, start_idx - context_length)
@@ -339,7 +1003,8 @@ def extract_translation_context(text, query, context_length=100):
     return text
 
 # Fungsi untuk highlight text dengan word boundary yang presisi
-def highlight_text(text, query):
+@timed("highlight_text")
+def highlight_text(text, query, compiled_query=None):
     if not text or not query:
         return text
     
@@ -349,18 +1014,10 @@ def highlight_text(text, query):
     query_escaped = html.escape(str(query))
     
     try:
-        # Cek apakah query adalah Aksara Jawa (berisi karakter Unicode Javanese)
-        is_javanese_query = any('\ua980' <= char <= '\ua9df' for char in query)
-
-        if is_javanese_query:
-            # Untuk Aksara Jawa, gunakan word boundary aksara Jawa
-            javanese_separators = r'[\s\u00A0\u2000-\u200F\u2028\u2029\uA9C1-\uA9CD\uA9CF-\uA9D9\uA9DE\uA9DF]'
-            pattern = rf'(?:^|({javanese_separators}))({re.escape(query)})(?=({javanese_separators})|$)'
-            highlighted = re.sub(pattern, r'\1<span class="highlighted-text">\2</span>\3', text_escaped)
-        else:
-            # Untuk Latin/Terjemahan, gunakan word boundary yang ketat
-            pattern = rf'(?:^|([\s\-.,;:!?()[\]{{}}"\'/\\]))({re.escape(query)})(?=([\s\-.,;:!?()[\]{{}}"\'/\\])|$)'
-            highlighted = re.sub(pattern, r'\1<span class="highlighted-text">\2</span>\3', text_escaped, flags=re.IGNORECASE)
+        # Pola highlight (word boundary aksara Jawa atau Latin) sudah dikompilasi per query
+        if compiled_query is None:
+            compiled_query = compile_query(query)
+        highlighted = compiled_query['highlight'].sub(r'\1<span class="highlighted-text">\2</span>\3', text_escaped)
         
         return highlighted
     except Exception as e:
@@ -368,14 +1025,12 @@ def highlight_text(text, query):
         st.warning(f"Highlighting error: {e}. Falling back to simple replace.")
         return text_escaped.replace(query_escaped, f'<span class="highlighted-text">{query_escaped}</span>')
 
-# Keyboard aksara Jawa berdasarkan dataset
-def create_javanese_keyboard(df):
-    """Membuat keyboard aksara Jawa dengan layout profesional seperti foto"""
-    
-    # Dapatkan karakter aksara Jawa unik dari dataset
-    javanese_chars = get_unique_javanese_chars(df)
-    
-    if not javanese_chars:
+# Keyboard aksara Jawa berdasarkan dataset. Tombol ditangani di browser (lihat
+# components/javanese_keyboard), sehingga menekan tombol tidak memicu rerun; teks
+# baru dikirim ke Python setelah pengguna berhenti menekan tombol atau menekan "Gunakan"
+def create_javanese_keyboard(keyboard_model, corpus_version):
+    """Membuat keyboard aksara Jawa dari model keyboard korpus (lihat keyboard_model.py)"""
+    if not keyboard_model["categories"]:
         st.info("Tidak ada karakter aksara Jawa ditemukan dalam dataset.")
         return
     
@@ -385,161 +1040,129 @@ def create_javanese_keyboard(df):
         <h3 class="keyboard-header-title">⌨ Keyboard Aksara Jawa</h3>
         <p class="keyboard-header-subtitle">Tersedia {0} karakter unik dari dataset</p>
     </div>
-    """.format(len(javanese_chars)), unsafe_allow_html=True)
-    
-    # Kelompokkan karakter berdasarkan fungsi dengan definisi yang lebih spesifik
-    consonants = []
-    vowel_marks = []
-    punctuation = []
-    others = []
-    
-    # Definisi range yang lebih tepat berdasarkan Unicode Javanese block
-    for char in javanese_chars:
-        char_code = ord(char)
-        # Aksara dasar (Ha, Na, Ca, Ra, Ka, dst)
-        if 0xA980 <= char_code <= 0xA9B2:
-            consonants.append(char)
-        # Sandhangan vokal (wulu, suku, taling, dst)
-        elif 0xA9B3 <= char_code <= 0xA9C0:
-            vowel_marks.append(char)
-        # Tanda baca dan simbol
-        elif char_code >= 0xA9C1:
-            punctuation.append(char)
-        else:
-            others.append(char)
-    
-    # 1. Section Aksara Dasar (bagian paling besar)
-    if consonants:
-        st.markdown("""
-        <div class="keyboard-section-card">
-            <h4 class="keyboard-section-heading">Aksara Dasar</h4>
-        """, unsafe_allow_html=True)
-        
-        # Grid untuk aksara dasar dengan spacing yang konsisten
-        chars_per_row = 10
-        rows = [consonants[i:i + chars_per_row] for i in range(0, len(consonants), chars_per_row)]
-        
-        for row_idx, char_row in enumerate(rows):
-            cols = st.columns(len(char_row))
-            for col_idx, char in enumerate(char_row):
-                with cols[col_idx]:
-                    if st.button(
-                        char, 
-                        key=f"cons_{row_idx}_{col_idx}",
-                        help=f"Tambahkan {char} (U+{ord(char):04X})",
-                        use_container_width=True
-                    ):
-                        if 'search_query' not in st.session_state:
-                            st.session_state.search_query = ""
-                        st.session_state.search_query += char
-                        st.rerun()
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Layout 2x2 untuk section lainnya
-    col1, col2 = st.columns(2, gap="large")
-    
-    # 2. Section Sandhangan Vokal
-    with col1:
-        if vowel_marks:
-            st.markdown("""
-            <div class="keyboard-section-card">
-                <h4 class="keyboard-section-heading">Sandhangan Vokal</h4>
-            """, unsafe_allow_html=True)
-            
-            chars_per_row = 5
-            rows = [vowel_marks[i:i + chars_per_row] for i in range(0, len(vowel_marks), chars_per_row)]
-            
-            for row_idx, char_row in enumerate(rows):
-                cols_inner = st.columns(len(char_row))
-                for col_idx, char in enumerate(char_row):
-                    with cols_inner[col_idx]:
-                        if st.button(
-                            char, 
-                            key=f"vowel_{row_idx}_{col_idx}",
-                            help=f"Tambahkan {char} (U+{ord(char):04X})",
-                            use_container_width=True
-                        ):
-                            if 'search_query' not in st.session_state:
-                                st.session_state.search_query = ""
-                            st.session_state.search_query += char
-                            st.rerun()
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    # 3. Section Tanda Baca & Simbol
-    with col2:
-        if punctuation:
-            st.markdown("""
-            <div class="keyboard-section-card">
-                <h4 class="keyboard-section-heading">Tanda Baca & Simbol</h4>
-            """, unsafe_allow_html=True)
-            
-            chars_per_row = 5
-            rows = [punctuation[i:i + chars_per_row] for i in range(0, len(punctuation), chars_per_row)]
-            
-            for row_idx, char_row in enumerate(rows):
-                cols_inner = st.columns(len(char_row))
-                for col_idx, char in enumerate(char_row):
-                    with cols_inner[col_idx]:
-                        if st.button(
-                            char, 
-                            key=f"punct_{row_idx}_{col_idx}",
-                            help=f"Tambahkan {char} (U+{ord(char):04X})",
-                            use_container_width=True
-                        ):
-                            if 'search_query' not in st.session_state:
-                                st.session_state.search_query = ""
-                            st.session_state.search_query += char
-                            st.rerun()
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+    """.format(keyboard_model["total_chars"]), unsafe_allow_html=True)
     
-    # 4. Section Karakter Lainnya (jika ada)
-    if others:
-        st.markdown("""
-        <div class="keyboard-section-card">
-            <h4 class="keyboard-section-heading">Karakter Lainnya</h4>
-        """, unsafe_allow_html=True)
-        
-        chars_per_row = 8
-        rows = [others[i:i + chars_per_row] for i in range(0, len(others), chars_per_row)]
-        
-        for row_idx, char_row in enumerate(rows):
-            cols = st.columns(len(char_row))
-            for col_idx, char in enumerate(char_row):
-                with cols[col_idx]:
-                    if st.button(
-                        char, 
-                        key=f"other_{row_idx}_{col_idx}",
-                        help=f"Tambahkan {char} (U+{ord(char):04X})",
-                        use_container_width=True
-                    ):
-                        if 'search_query' not in st.session_state:
-                            st.session_state.search_query = ""
-                        st.session_state.search_query += char
-                        st.rerun()
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Kontrol keyboard (Hanya tombol Hapus Karakter Terakhir)
-    st.markdown("""
-    <div class="keyboard-controls-container">
-    """, unsafe_allow_html=True)
-    
-    # Hanya satu kolom untuk tombol "Hapus Karakter Terakhir"
-    col1, col2, col3 = st.columns([1,2,1]) # Menggunakan 3 kolom untuk centering
-    
-    with col2: # Menempatkan tombol di kolom tengah
-        if st.button("⌫ Hapus Karakter Terakhir", help="Hapus satu karakter terakhir", use_container_width=True, key="keyboard_delete_button"):
-            if 'search_query' in st.session_state and st.session_state.search_query:
-                st.session_state.search_query = st.session_state.search_query[:-1]
-                st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Model keyboard hanya dikirim ke browser sekali per versi korpus; pada rerun lain
+    # komponen memakai model yang sudah dirender
+    send_model = st.session_state.get("keyboard_model_version") != corpus_version
+    keyboard_value = javanese_keyboard(
+        value=st.session_state.get("search_query", ""),
+        model=keyboard_model if send_model else None,
+        model_version=corpus_version,
+        debounce_ms=KEYBOARD_DEBOUNCE_MS,
+        key="javanese_keyboard",
+        default=None
+    )
+    st.session_state.keyboard_model_version = corpus_version
+    # Hanya nilai yang baru dikirim komponen yang menggantikan query
+    if keyboard_value is not None and keyboard_value != st.session_state.get("keyboard_input_value"):
+        st.session_state.keyboard_input_value = keyboard_value
+        if keyboard_value.get("need_model"):
+            # Komponen dibuat ulang di browser tanpa model: kirim ulang model pada rerun berikutnya
+            st.session_state.keyboard_model_version = None
+            st.rerun()
+        elif keyboard_value["text"] != st.session_state.get("search_query"):
+            st.session_state.search_query = keyboard_value["text"]
+            st.rerun()
+
+# Pilihan jumlah item per halaman pada hasil pencarian
+PAGE_SIZE_OPTIONS = [5, 10, 25, 50]
+DEFAULT_PAGE_SIZE = 10
+
+# Bangun HTML satu kartu kemunculan (tanpa memanggil Streamlit)
+def build_occurrence_html(occurrence, query, compiled_query):
+    type_tag_class = "type-tag-kata" if occurrence['type'] == 'Kata' else "type-tag-paragraf"
+    parts = [
+        '<div class="occurrence-card">',
+        '<div class="occurrence-header">',
+        f'<span class="type-tag-base {type_tag_class}">{occurrence["type"]}</span>',
+        f'<span class="occurrence-reference">{occurrence["paragraph_reference"]}</span>',
+        '</div>',
+    ]
+
+    text_blocks = [
+        ('javanese', 'Aksara Jawa', 'javanese-content'),
+        ('latin', 'Latin', 'latin-content'),
+        ('translation', 'Terjemahan', 'translation-content'),
+    ]
+    for field, label, css_class in text_blocks:
+        if occurrence[field]:
+            highlighted = highlight_text(occurrence[field], query, compiled_query)
+            parts.append(
+                '<div class="occurrence-text-block">'
+                f'<strong class="occurrence-text-label">{label}:</strong><br>'
+                f'<span class="{css_class}">{highlighted}</span>'
+                '</div>'
+            )
+
+    found_in_indicators = []
+    if occurrence['found_in']['javanese']:
+        found_in_indicators.append("🔸 Aksara Jawa")
+    if occurrence['found_in']['latin']:
+        found_in_indicators.append("🔹 Latin")
+    if occurrence['found_in']['translation']:
+        found_in_indicators.append("🔺 Terjemahan")
+
+    if found_in_indicators:
+        parts.append(
+            '<div class="found-in-footer"><small class="found-in-text">'
+            f'<strong>Ditemukan dalam:</strong> {" | ".join(found_in_indicators)}'
+            '</small></div>'
+        )
+
+    parts.append('</div>')
+    return "".join(parts)
+
+# Bangun satu blok HTML untuk satu halaman kemunculan
+def build_occurrences_html(occurrences, query, compiled_query):
+    return "\n".join(build_occurrence_html(occurrence, query, compiled_query) for occurrence in occurrences)
+
+# Pemilih halaman: tampilkan kontrol jika item lebih dari satu halaman, kembalikan rentang item
+def select_page(total_items, page_size, key):
+    total_pages = max(1, -(-total_items // page_size))
+    if total_pages == 1:
+        return 0, total_items
+
+    page = st.number_input(
+        f"Halaman (dari {total_pages})",
+        min_value=1,
+        max_value=total_pages,
+        value=1,
+        step=1,
+        key=key
+    )
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_items)
+    st.caption(f"Menampilkan {start + 1}–{end} dari {total_items}")
+    return start, end
+
+# Pola highlight untuk hasil search_text: token yang cocok (mode mirip/boolean),
+# pola gabungan lintas aksara, atau pola query biasa
+def compile_highlight_query(final_grouped_results, query, match_mode="word"):
+    cross_query = final_grouped_results["Kata"].get("cross_query")
+    if match_mode in ("fuzzy", "boolean"):
+        return compile_terms_query(query.strip(), final_grouped_results["Kata"]["matched_terms"], cross_query)
+    return compile_search_query(query.strip() if cross_query else query, match_mode, cross_query)
+
+# Hasil satu query dalam bentuk record JSON (untuk batch dan API); kueri boolean yang
+# tidak valid menjadi record dengan kunci 'error'
+def batch_search_record(corpus_store, query, search_type, match_mode="word", cross_script=False, highlight=False,
+                        sources=None, use_cache=True):
+    try:
+        _, final_grouped_results = cached_search_text(
+            corpus_store, query, search_type, match_mode, cross_script, sources, use_cache
+        )
+    except QuerySyntaxError as e:
+        return {"query": query, "error": str(e)}
+    highlighter = None
+    if highlight and final_grouped_results:
+        compiled_query = compile_highlight_query(final_grouped_results, query, match_mode)
+        highlighter = lambda text: highlight_text(text, query, compiled_query)
+    return search_record(query, search_type, match_mode, cross_script, final_grouped_results, highlighter)
 
 # Fungsi untuk menampilkan hasil pencarian dengan format yang lebih baik
-def display_search_results(final_grouped_results, query):
+@timed("display_search_results")
+def display_search_results(final_grouped_results, query, page_size=DEFAULT_PAGE_SIZE, match_mode="word"):
     total_results_found = False
     for group_type, data in final_grouped_results.items():
         if data["total_occurrences"] > 0:
@@ -550,6 +1173,11 @@ def display_search_results(final_grouped_results, query):
         st.info("🔍 Tidak ada hasil ditemukan untuk pencarian tersebut.")
         return
     
+    # Kompilasi pola highlight sekali untuk seluruh halaman hasil
+    cross_query = final_grouped_results["Kata"].get("cross_query")
+    compiled_query = compile_highlight_query(final_grouped_results, query, match_mode)
+    matched_terms = final_grouped_results["Kata"].get("matched_terms")
+    
     # Header hasil
     total_kata_occurrences = final_grouped_results["Kata"]["total_occurrences"]
     total_paragraf_occurrences = final_grouped_results["Paragraf"]["total_occurrences"]
@@ -562,6 +1190,10 @@ def display_search_results(final_grouped_results, query):
         </p>
     </div>
     """, unsafe_allow_html=True)
+    if cross_query:
+        st.caption(f"🔁 Dicari juga dalam aksara lain sebagai: {cross_query}")
+    if match_mode == "fuzzy":
+        st.caption(f"≈ Kata mirip yang ditemukan: {', '.join(matched_terms)}")
     
     # Tampilkan top-level groups (Kata and Paragraf)
     for group_type, group_data in final_grouped_results.items():
@@ -569,9 +1201,22 @@ def display_search_results(final_grouped_results, query):
             with st.expander(f"📑 {group_data['label']} ({group_data['total_occurrences']} kemunculan)", expanded=True):
                 
                 # Sort sub_groups alphabetically by key for consistent display
-                sorted_sub_groups = sorted(group_data['sub_groups'].items())
+                # (hasil berperingkat dan mode mirip: tetap urut dari hasil yang paling relevan)
+                if match_mode == "fuzzy" or group_data.get("ranked"):
+                    sorted_sub_group_keys = list(group_data['sub_groups'])
+                else:
+                    sorted_sub_group_keys = sorted(group_data['sub_groups'])
+                if group_data.get("ranked") and group_data["shown_occurrences"] < group_data["total_occurrences"]:
+                    st.caption(
+                        f"🏆 Menampilkan {len(sorted_sub_group_keys)} grup paling relevan "
+                        f"({group_data['shown_occurrences']} dari {group_data['total_occurrences']} kemunculan)"
+                    )
+
+                # Hanya sub-grup pada halaman aktif yang dirender
+                start, end = select_page(len(sorted_sub_group_keys), page_size, key=f"page_{match_mode}_{query}_{group_type}")
 
-                for sub_group_key, sub_group_data in sorted_sub_groups:
+                for sub_group_key in sorted_sub_group_keys[start:end]:
+                    sub_group_data = group_data['sub_groups'][sub_group_key]
                     st.markdown(f"#### {sub_group_key} (Total: {sub_group_data['total_count']})")
                     
                     # Information about the main matched item for this sub-group
@@ -588,77 +1233,303 @@ def display_search_results(final_grouped_results, query):
                     with col2:
                         st.metric("Kemunculan Sub-Grup", sub_group_data['total_count'])
 
-                    st.markdown("##### 💾 Detail Setiap Kemunculan:")
-                    
-                    # Display individual occurrences within the sub-group
-                    for occ_idx, occurrence in enumerate(sub_group_data['occurrences'], 1):
-                        type_tag_class = "type-tag-kata" if occurrence['type'] == 'Kata' else "type-tag-paragraf"
-                        
-                        st.markdown(f"""
-                        <div class="occurrence-card">
-                            <div class="occurrence-header">
-                                <span class="type-tag-base {type_tag_class}">{occurrence['type']}</span>
-                                <span class="occurrence-reference">{occurrence['paragraph_reference']}</span>
-                            </div>
-                        """, unsafe_allow_html=True)
-                        
-                        if occurrence['javanese']:
-                            highlighted_javanese = highlight_text(occurrence['javanese'], query)
-                            st.markdown(f"""
-                            <div class="occurrence-text-block">
-                                <strong class="occurrence-text-label">Aksara Jawa:</strong><br>
-                                <span class="javanese-content">
-                                    {highlighted_javanese}
-                                </span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        if occurrence['latin']:
-                            highlighted_latin = highlight_text(occurrence['latin'], query)
-                            st.markdown(f"""
-                            <div class="occurrence-text-block">
-                                <strong class="occurrence-text-label">Latin:</strong><br>
-                                <span class="latin-content">
-                                    {highlighted_latin}
-                                </span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        if occurrence['translation']:
-                            highlighted_translation = highlight_text(occurrence['translation'], query)
-                            st.markdown(f"""
-                            <div class="occurrence-text-block">
-                                <strong class="occurrence-text-label">Terjemahan:</strong><br>
-                                <span class="translation-content">
-                                    {highlighted_translation}
-                                </span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        found_in_indicators = []
-                        if occurrence['found_in']['javanese']:
-                            found_in_indicators.append("🔸 Aksara Jawa")
-                        if occurrence['found_in']['latin']:
-                            found_in_indicators.append("🔹 Latin")
-                        if occurrence['found_in']['translation']:
-                            found_in_indicators.append("🔺 Terjemahan")
-                        
-                        if found_in_indicators:
-                            st.markdown(f"""
-                            <div class="found-in-footer">
-                                <small class="found-in-text">
-                                    <strong>Ditemukan dalam:</strong> {' | '.join(found_in_indicators)}
-                                </small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        st.markdown("---") # Separator between occurrences
+                    # Detail kemunculan hanya dirender jika dibuka oleh pengguna
+                    show_details = st.toggle(
+                        f"💾 Detail Setiap Kemunculan ({sub_group_data['total_count']})",
+                        key=f"details_{match_mode}_{query}_{group_type}_{sub_group_key}"
+                    )
+                    if not show_details:
+                        continue
+
+                    occurrences = sub_group_data['occurrences']
+                    occ_start, occ_end = select_page(
+                        len(occurrences), page_size, key=f"page_{match_mode}_{query}_{group_type}_{sub_group_key}"
+                    )
+
+                    # Satu blok HTML per halaman, bukan satu st.markdown per fragmen
+                    st.markdown(
+                        build_occurrences_html(occurrences[occ_start:occ_end], query, compiled_query),
+                        unsafe_allow_html=True
+                    )
     
     if total_results_found:
         st.info(f"💡 Tips: Hasil yang ditampilkan disorot secara otomatis.")
 
 
+# Pencarian daftar kata dari file: setiap query dijalankan paralel pada korpus bersama dan
+# hasilnya ditulis ke JSONL/CSV begitu query selesai, dengan progres per query
+# Jeda minimum (detik) antar pembaruan tabel hasil batch selama query berjalan
+BATCH_PREVIEW_INTERVAL = 0.5
+
+# Ringkasan satu record batch untuk tabel hasil di halaman
+def batch_summary_row(position, record):
+    if "error" in record:
+        status = f"❌ {record['error']}"
+    elif record["total_occurrences"]:
+        status = "✅ ditemukan"
+    else:
+        status = "— tanpa hasil"
+    return {"No": position + 1, "Query": record["query"],
+            "Kemunculan": record.get("total_occurrences", 0), "Status": status}
+
+# Batch dijalankan di thread pool; setiap query yang selesai langsung ditulis ke hasil dan
+# ditampilkan di tabel, sehingga hasil terlihat sebelum seluruh daftar selesai
+def display_batch_search(corpus_store, search_type, match_mode, cross_script, sources=None):
+    uploaded_file = st.file_uploader(
+        "Unggah daftar kata (satu query per baris)",
+        type=["txt", "csv"],
+        key="batch_file",
+        help="Setiap baris dicari dengan jenis pencarian, mode pencocokan dan pilihan lintas aksara di atas"
+    )
+    output_format = st.radio(
+        "Format hasil:", BATCH_FORMATS, horizontal=True, key="batch_format",
+        format_func=lambda x: {"jsonl": "JSON Lines", "csv": "CSV (satu baris per kemunculan)"}[x]
+    )
+    if uploaded_file is None:
+        return
+
+    queries = read_query_list(uploaded_file.getvalue().decode("utf-8-sig").splitlines())
+    st.caption(f"📄 {len(queries)} query dalam {uploaded_file.name}")
+    if queries and st.button("▶️ Jalankan Batch", key="batch_run"):
+        import io
+        output = io.StringIO()
+        writer = BatchWriter(output, output_format)
+        progress_bar = st.progress(0.0, text="🔎 Mencari...")
+        preview = st.empty()
+        start_time = time.perf_counter()
+        search = lambda query: batch_search_record(
+            corpus_store, query, search_type, match_mode, cross_script, sources=sources, use_cache=False
+        )
+        found, failed = 0, 0
+        summary_rows = []
+        last_preview = 0.0
+        for done, (position, record) in enumerate(iter_batch_results(queries, search), start=1):
+            writer.write(position, record)
+            summary_rows.append(batch_summary_row(position, record))
+            if "error" in record:
+                failed += 1
+            elif record["total_occurrences"]:
+                found += 1
+            progress_bar.progress(done / len(queries), text=f"🔎 {done}/{len(queries)} query selesai")
+            if time.perf_counter() - last_preview >= BATCH_PREVIEW_INTERVAL or done == len(queries):
+                # Urutan selesai, yang terbaru di atas
+                preview.dataframe(pd.DataFrame(summary_rows[::-1]), hide_index=True, use_container_width=True)
+                last_preview = time.perf_counter()
+        progress_bar.empty()
+        preview.empty()
+        st.session_state.batch_output = {
+            "data": output.getvalue(),
+            "rows": sorted(summary_rows, key=lambda row: row["No"]),
+            "file_name": f"hasil_{Path(uploaded_file.name).stem}.{output_format}",
+            "summary": (f"✅ {len(queries)} query selesai dalam {time.perf_counter() - start_time:.1f} detik: "
+                        f"{found} ditemukan, {len(queries) - found - failed} tanpa hasil, {failed} tidak valid"),
+        }
+
+    batch_output = st.session_state.get("batch_output")
+    if batch_output:
+        st.success(batch_output["summary"])
+        st.download_button(
+            "💾 Unduh Hasil", batch_output["data"], file_name=batch_output["file_name"], key="batch_download"
+        )
+        st.dataframe(pd.DataFrame(batch_output["rows"]), hide_index=True, use_container_width=True)
+
+# Baris konkordansi per halaman
+KWIC_PAGE_SIZE = 50
+
+# HTML tabel konkordansi: konteks kiri rata kanan sehingga kata kunci sejajar dalam satu kolom
+def build_concordance_html(lines, is_javanese):
+    import html
+    text_class = " javanese-content" if is_javanese else ""
+    rows = [
+        '<tr>'
+        f'<td class="kwic-paragraph">{html.escape(line["paragraph"])}</td>'
+        f'<td class="kwic-left{text_class}">{html.escape(line["left"])}</td>'
+        f'<td class="kwic-keyword{text_class}"><span class="highlighted-text">{html.escape(line["keyword"])}</span></td>'
+        f'<td class="kwic-right{text_class}">{html.escape(line["right"])}</td>'
+        f'<td class="kwic-translation">{html.escape(line["translation"])}</td>'
+        '</tr>'
+        for line in lines
+    ]
+    return (
+        '<table class="kwic-table"><thead><tr><th>Paragraf</th><th>Konteks Kiri</th><th>Kata</th>'
+        '<th>Konteks Kanan</th><th>Arti Kata</th></tr></thead><tbody>' + "".join(rows) + '</tbody></table>'
+    )
+
+# Konkordansi (keyword in context): setiap kemunculan kata di semua paragraf, dilayani
+# langsung dari offset Kata/Paragraf yang sudah dihitung saat korpus dimuat
+def display_concordance(corpus_store, default_word=""):
+    col_word, col_width = st.columns([3, 1])
+    with col_word:
+        word = st.text_input(
+            "🔤 Kata yang ingin dilihat konteksnya:",
+            value=default_word,
+            placeholder="Contoh: ing, punika, ꦲꦶꦁ",
+            key="kwic_word"
+        )
+    with col_width:
+        width = st.slider("Lebar konteks (kata)", 1, 10, DEFAULT_CONTEXT_WIDTH, key="kwic_width")
+
+    if not word.strip():
+        st.info("Masukkan kata Latin atau aksara Jawa untuk melihat semua kemunculannya dalam paragraf.")
+        return
+
+    corpus = corpus_view(corpus_store)
+    with st.spinner("🔄 Menyiapkan konkordansi..."):
+        concordance = corpus_structure(corpus_store, corpus, "concordance")
+    lines = concordance_lines(concordance, corpus["df"], corpus["positional_index"], word, width)
+    if not lines:
+        st.info(f"🔍 Kata '{word.strip()}' tidak ditemukan dalam teks paragraf.")
+        return
+
+    paragraph_count = len({line["paragraph"] for line in lines})
+    st.caption(f"📖 {len(lines)} kemunculan dalam {paragraph_count} paragraf")
+    start, end = select_page(len(lines), KWIC_PAGE_SIZE, key=f"kwic_page_{word.strip()}_{width}")
+    st.markdown(build_concordance_html(lines[start:end], is_javanese_text(word)), unsafe_allow_html=True)
+
+
+# Ukuran cache dan struktur korpus bersama, untuk panel performa dan ekspor metrik
+def corpus_cache_sizes(corpus_store):
+    corpus = corpus_view(corpus_store)
+    df = corpus["df"]
+    return {
+        "query_cache_entries": query_cache_stats(get_query_cache())["entries"],
+        "corpus_rows": len(df),
+        "corpus_bytes": int(df.memory_usage(deep=True).sum()),
+        "vocabulary": {field: len(postings) for field, postings in corpus["search_index"].items()},
+        "transliteration_entries": len(corpus["transliteration_table"]["latin_to_javanese"]),
+    }
+
+# Metrik format Prometheus: histogram span ditambah gauge cache pencarian dan ukuran korpus
+def render_metrics(corpus_store):
+    cache_stats = query_cache_stats(get_query_cache())
+    sizes = corpus_cache_sizes(corpus_store)
+    return render_prometheus([
+        ("query_cache_entries", "Jumlah hasil pencarian di cache", [({}, cache_stats["entries"])]),
+        ("query_cache_hits", "Jumlah hit cache pencarian", [({}, cache_stats["hits"])]),
+        ("query_cache_misses", "Jumlah miss cache pencarian", [({}, cache_stats["misses"])]),
+        ("corpus_rows", "Jumlah baris korpus", [({}, sizes["corpus_rows"])]),
+        ("corpus_bytes", "Memori DataFrame korpus (byte)", [({}, sizes["corpus_bytes"])]),
+        ("index_vocabulary_size", "Jumlah token unik indeks per kolom",
+         [({"field": field}, size) for field, size in sizes["vocabulary"].items()]),
+    ])
+
+# Panel debug pada tab Dataset: durasi per tahap, latensi query terakhir dan ukuran cache
+def display_performance_panel(corpus_store):
+    with st.expander("🩺 Performa", expanded=False):
+        sizes = corpus_cache_sizes(corpus_store)
+        col_cache, col_rows, col_memory, col_translit = st.columns(4)
+        col_cache.metric("Cache Pencarian", sizes["query_cache_entries"])
+        col_rows.metric("Baris Korpus", sizes["corpus_rows"])
+        col_memory.metric("Memori Korpus", f"{sizes['corpus_bytes'] / 2**20:.1f} MiB")
+        col_translit.metric("Tabel Transliterasi", sizes["transliteration_entries"])
+        st.caption("Kosakata indeks: " + ", ".join(f"{field} {size}" for field, size in sizes["vocabulary"].items()))
+
+        spans = span_summary()
+        if spans:
+            st.markdown("**Durasi per tahap**")
+            st.dataframe(pd.DataFrame(spans).round(2), hide_index=True, use_container_width=True)
+
+        queries = recent_queries()
+        if queries:
+            st.markdown("**Query terakhir**")
+            recent = pd.DataFrame(queries)
+            recent["time"] = pd.to_datetime(recent["time"], unit="s").dt.strftime("%H:%M:%S")
+            st.dataframe(recent.round({"elapsed_ms": 2}), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Belum ada pencarian sejak server dimulai.")
+
+        if PROFILE_MODE is not None:
+            for profile in recent_profiles():
+                with st.popover(f"📈 Profil: {profile['label']}"):
+                    st.code(profile["report"], language=None)
+        else:
+            st.caption("Profiling per query nonaktif; aktifkan dengan AKSARA_PROFILE=cprofile atau pyinstrument.")
+
+        st.download_button(
+            "⬇️ Unduh Metrik (Prometheus)",
+            render_metrics(corpus_store),
+            file_name="aksara_metrics.prom",
+            mime="text/plain"
+        )
+
+# Halaman pencarian untuk backend SPARQL: setiap query dijawab endpoint, tanpa memuat korpus.
+# Fitur yang membutuhkan korpus lengkap (keyboard, konkordansi, batch, pencarian langsung) tidak tersedia.
+def display_pushdown_search(source, location, source_label):
+    try:
+        run_query = load_sparql_query_runner(source, location)
+    except (PushdownError, ImportError) as e:
+        st.error(f"❌ {e}")
+        return
+    st.success(f"✅ Pencarian dijalankan langsung di {source_label}; korpus tidak dimuat ke aplikasi")
+
+    if 'search_query' not in st.session_state:
+        st.session_state.search_query = ""
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        search_query = st.text_input(
+            "🔍 Masukkan kata atau frasa yang ingin dicari:",
+            value=st.session_state.search_query,
+            placeholder="Contoh: punika, ꦥꦸꦤꦶꦏ, atau sebuah kata dalam bahasa Indonesia",
+            key="search_input"
+        )
+        st.session_state.search_query = search_query
+    with col2:
+        search_type = st.selectbox(
+            "Cari dalam:",
+            ["all", "latin", "javanese", "translation"],
+            format_func=lambda x: {
+                "all": "🌍 Semua",
+                "latin": "🔤 Latin",
+                "javanese": "✒️ Aksara Jawa",
+                "translation": "🇮🇩 Terjemahan"
+            }[x]
+        )
+    with col3:
+        match_mode = st.selectbox(
+            "Cocokkan:",
+            PUSHDOWN_MATCH_MODES,
+            format_func=lambda x: {
+                "word": "🔠 Kata utuh",
+                "prefix": "▶️ Awalan kata",
+                "substring": "🧩 Bagian kata"
+            }[x]
+        )
+    cross_script = st.checkbox("🔁 Lintas aksara (Latin ⇄ Aksara Jawa)", value=True, key="cross_script")
+
+    if st.button("🔍 Cari", type="primary") and search_query.strip():
+        st.session_state.active_search = {
+            "query": search_query, "search_type": search_type, "match_mode": match_mode, "cross_script": cross_script
+        }
+
+    active_search = st.session_state.get("active_search")
+    if not active_search or active_search != {
+        "query": search_query, "search_type": search_type, "match_mode": match_mode, "cross_script": cross_script
+    }:
+        return
+
+    with st.spinner(f"🔎 Mencari di {source_label}..."):
+        try:
+            _, final_grouped_results, truncated = cached_pushdown_search_text(
+                run_query, location, search_query, search_type, match_mode, cross_script
+            )
+        except Exception as e:
+            st.error(f"❌ Pencarian di {source_label} gagal: {e}")
+            return
+    if truncated:
+        st.warning(
+            f"⚠️ Kandidat dari endpoint dibatasi {PUSHDOWN_LIMIT} subjek, sehingga hasil di bawah tidak lengkap. "
+            "Persempit query atau naikkan AKSARA_PUSHDOWN_LIMIT."
+        )
+
+    page_size = st.selectbox(
+        "Item per halaman:",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+        key="results_page_size"
+    )
+    display_search_results(final_grouped_results, search_query, page_size, match_mode)
+
 # Main application
 def main():
     # Load CSS
@@ -673,10 +1544,36 @@ def main():
     """, unsafe_allow_html=True)
     
     # Load data
-    with st.spinner("🔄 Memuat data dari GraphDB..."):
-        df = load_data_from_graphdb()
+    source = DATA_SOURCE_CONFIG["source"]
+    location = DATA_SOURCE_CONFIG["location"]
+    source_label = describe_data_source(DATA_SOURCE_CONFIG)
+    if SEARCH_BACKEND == "sparql":
+        display_pushdown_search(source, location, source_label)
+        return
+
+    load_error = None
+    with st.spinner(f"🔄 Memuat data dari {source_label}..."):
+        try:
+            corpus_store = load_corpus_store(source, location)
+            corpus = corpus_view(corpus_store)
+            df = corpus["df"]
+            javanese_chars = corpus["javanese_chars"]
+            keyboard_model = corpus["keyboard_model"]
+        except Exception as e:
+            df = pd.DataFrame()
+            load_error = e
     
     if df.empty:
+        if load_error is not None:
+            st.error(f"Error loading data from {source_label}: {str(load_error)}")
+        if (source, location) in PARTIAL_LOADS:
+            loaded_rows = PARTIAL_LOADS[(source, location)]["offset"]
+            st.warning(f"⏸️ {loaded_rows} baris sudah dimuat sebelum error terjadi.")
+            if st.button("🔄 Lanjutkan Memuat", type="primary"):
+                st.rerun()
+        if source != "graphdb":
+            st.error(f"❌ Tidak dapat memuat data dari {source_label}. Pastikan file tersedia.")
+            return
         st.error("❌ Tidak dapat memuat data dari GraphDB. Pastikan GraphDB berjalan dan dapat diakses.")
         st.info("""
         Panduan Troubleshooting:
@@ -684,35 +1581,58 @@ def main():
         2. Pastikan repository 'AksaraJawa' sudah dibuat dan berisi data
         3. Pastikan tidak ada firewall yang memblokir koneksi
         4. Cek apakah SPARQLWrapper terinstal: pip install SPARQLWrapper
+        5. Atau gunakan data lokal: AKSARA_DATA_SOURCE=csv (atau ttl) streamlit run app.py
         """)
         return
     
     # Info dataset
-    st.success(f"✅ Berhasil memuat {len(df)} entri dari GraphDB")
+    st.success(f"✅ Berhasil memuat {len(df)} entri dari {source_label}")
     
     # Tabs untuk organisasi fitur
-    tab1, tab2 = st.tabs(["🔍 Pencarian", "📊 Dataset"]) # Removed Keyboard tab
+    tab1, tab_kwic, tab2 = st.tabs(["🔍 Pencarian", "📖 Konkordansi", "📊 Dataset"]) # Removed Keyboard tab
     
     with tab1:
         # Input pencarian dengan session state
         if 'search_query' not in st.session_state:
             st.session_state.search_query = ""
         
+        # Mode pencarian langsung: hasil diperbarui saat mengetik, tanpa tombol Cari
+        live_mode = st.toggle(
+            "⚡ Pencarian langsung",
+            key="live_mode",
+            help="Hasil dan saran kata diperbarui setiap kali Anda berhenti mengetik atau menekan tombol keyboard aksara Jawa"
+        )
+        
         # Search interface
-        col1, col2 = st.columns([3, 1])
+        col1, col2, col3 = st.columns([3, 1, 1])
         
         with col1:
-            search_query = st.text_input(
-                "🔍 Masukkan kata atau frasa yang ingin dicari:",
-                value=st.session_state.search_query,
-                placeholder="Contoh: punika, ꦥꦸꦤꦶꦏ, atau sebuah kata dalam bahasa Indonesia",
-                help="Gunakan keyboard aksara Jawa di bawah untuk input aksara Jawa",
-                key="search_input"
-            )
-            
-            # Update session state jika input berubah
-            if search_query != st.session_state.search_query:
-                st.session_state.search_query = search_query
+            if live_mode:
+                st.markdown("🔍 Masukkan kata atau frasa yang ingin dicari:")
+                live_value = live_search_input(
+                    value=st.session_state.search_query,
+                    placeholder="Ketik untuk mencari, contoh: pun, ꦥꦸꦤ",
+                    debounce_ms=LIVE_DEBOUNCE_MS,
+                    key="live_search_input",
+                    default=None
+                )
+                # Hanya nilai yang baru dikirim komponen yang menggantikan query
+                if live_value is not None and live_value != st.session_state.get("live_input_value"):
+                    st.session_state.live_input_value = live_value
+                    st.session_state.search_query = live_value["text"]
+                search_query = st.session_state.search_query
+            else:
+                search_query = st.text_input(
+                    "🔍 Masukkan kata atau frasa yang ingin dicari:",
+                    value=st.session_state.search_query,
+                    placeholder="Contoh: punika, ꦥꦸꦤꦶꦏ, atau sebuah kata dalam bahasa Indonesia",
+                    help="Gunakan keyboard aksara Jawa di bawah untuk input aksara Jawa",
+                    key="search_input"
+                )
+                
+                # Update session state jika input berubah
+                if search_query != st.session_state.search_query:
+                    st.session_state.search_query = search_query
         
         with col2:
             search_type = st.selectbox(
@@ -726,6 +1646,42 @@ def main():
                 }[x],
                 help="Pilih jenis teks yang ingin dicari"
             )
+        
+        with col3:
+            match_mode = st.selectbox(
+                "Cocokkan:",
+                MATCH_MODES,
+                format_func=lambda x: {
+                    "word": "🔠 Kata utuh",
+                    "prefix": "▶️ Awalan kata",
+                    "substring": "🧩 Bagian kata",
+                    "fuzzy": "≈ Mirip",
+                    "boolean": "🔣 Kueri boolean"
+                }[x],
+                help="Kata utuh: hanya kata yang sama persis. Awalan/bagian kata: cocok juga di dalam kata, berguna untuk aksara Jawa yang ditulis tanpa spasi. Mirip: abaikan diakritik (diten → ditên) dan toleransi salah ketik. Kueri boolean (pada teks Paragraf): punika AND pukul, sapta OR wolu, ing NOT tanggal, \"tahun nalip\", latin:/jawa:/arti:kata, punika NEAR/3 pukul"
+            )
+
+        # Query Latin juga dicari dalam aksara Jawa dan sebaliknya
+        cross_script = st.checkbox(
+            "🔁 Lintas aksara (Latin ⇄ Aksara Jawa)",
+            value=True,
+            key="cross_script",
+            help="Query ditransliterasi ke aksara lainnya, sehingga 'punika' juga menemukan ꦥꦸꦤꦶꦏ dan sebaliknya"
+        )
+
+        # Korpus gabungan: cari di semua naskah atau hanya naskah yang dipilih
+        sources = None
+        if SOURCE_TAG_COLUMN in df.columns:
+            source_names = list(df[SOURCE_TAG_COLUMN].unique())
+            selected_sources = st.multiselect(
+                "📚 Naskah:",
+                source_names,
+                default=source_names,
+                key="selected_sources",
+                help="Kosongkan atau pilih semua untuk mencari di seluruh naskah"
+            )
+            if selected_sources and len(selected_sources) < len(source_names):
+                sources = tuple(name for name in source_names if name in selected_sources)
 
         # Keyboard can be closed and opened (expand)
         with st.expander("⌨ Tampilkan/Sembunyikan Keyboard Aksara Jawa", expanded=False):
@@ -739,7 +1695,11 @@ def main():
                 """, unsafe_allow_html=True)
             
             # Keyboard (moved from original tab2)
-            create_javanese_keyboard(df)
+            create_javanese_keyboard(keyboard_model, corpus["corpus_version"])
+
+        # Banyak query sekaligus dari file daftar kata
+        with st.expander("📄 Cari Daftar Kata (Batch)", expanded=False):
+            display_batch_search(corpus_store, search_type, match_mode, cross_script, sources)
 
         # Tombol pencarian dan kontrol
         st.markdown("---") # Separator before action buttons
@@ -751,6 +1711,8 @@ def main():
         with col_btn2:
             if st.button("🗑️ Bersihkan", use_container_width=True):
                 st.session_state.search_query = ""
+                st.session_state.pop("active_search", None)
+                st.session_state.pop("live_search_state", None)
                 st.rerun()
         
         with col_btn3:
@@ -761,14 +1723,77 @@ def main():
                 st.session_state.search_query = random.choice(examples)
                 st.rerun()
         
-        # Lakukan pencarian
-        if search_query.strip() and search_button: # Only search when button is clicked
-            with st.spinner("🔎 Mencari..."):
-                results_df, final_grouped_results = search_text(df, search_query, search_type)
+        final_grouped_results = None
+        if live_mode:
+            if search_query.strip():
+                # Saran kata dari indeks untuk kata yang sedang diketik
+                suggestions = get_live_suggestions(corpus_store, search_query, search_type)
+                if suggestions:
+                    st.pills(
+                        "💡 Saran:",
+                        suggestions,
+                        key="live_suggestion",
+                        on_change=apply_live_suggestion
+                    )
+                
+                start_time = time.perf_counter()
+                try:
+                    with profile_query(f"{search_query.strip()} ({search_type}, {match_mode}, langsung)"):
+                        row_ids, final_grouped_results, live_state = live_search_text(
+                            corpus_store, search_query, search_type, match_mode,
+                            st.session_state.get("live_search_state"), cross_script, sources
+                        )
+                except QuerySyntaxError as e:
+                    # Kueri boolean yang belum selesai diketik: tunggu ketikan berikutnya
+                    st.caption(f"⌛ Kueri belum lengkap: {e}")
+                else:
+                    elapsed = time.perf_counter() - start_time
+                    record_query(search_query, search_type, match_mode, elapsed, len(row_ids))
+                    elapsed_ms = elapsed * 1000
+                    st.session_state.live_search_state = live_state
+                    narrowed_note = " (mempersempit hasil sebelumnya)" if live_state and live_state["narrowed"] else ""
+                    st.caption(f"⚡ {len(row_ids)} entri ditemukan dalam {elapsed_ms:.0f} ms{narrowed_note}")
+        else:
+            # Simpan pencarian aktif agar hasil tetap tampil saat berpindah halaman hasil
+            if search_query.strip() and search_button: # Only search when button is clicked
+                st.session_state.active_search = {
+                    "query": search_query, "search_type": search_type, "match_mode": match_mode, "cross_script": cross_script,
+                    "sources": sources
+                }
+            
+            # Lakukan pencarian
+            active_search = st.session_state.get("active_search")
+            if active_search and active_search == {
+                "query": search_query, "search_type": search_type, "match_mode": match_mode, "cross_script": cross_script,
+                "sources": sources
+            }:
+                with st.spinner("🔎 Mencari..."):
+                    try:
+                        _, final_grouped_results = cached_search_text(
+                            corpus_store, search_query, search_type, match_mode, cross_script, sources
+                        )
+                    except QuerySyntaxError as e:
+                        st.error(f"❌ Kueri boolean tidak valid: {e}")
+        
+        if final_grouped_results is not None:
+            page_size = st.selectbox(
+                "Item per halaman:",
+                PAGE_SIZE_OPTIONS,
+                index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+                key="results_page_size"
+            )
             
             # Tampilkan hasil
-            display_search_results(final_grouped_results, search_query)
+            display_search_results(final_grouped_results, search_query, page_size, match_mode)
             
+    with tab_kwic:
+        st.markdown("""
+        <div class="app-main-header-container-2">
+            <h2 class="app-main-header-title-2">📖 Konkordansi - Setiap kemunculan kata beserta konteks kiri dan kanannya</h2>
+        </div>
+        """, unsafe_allow_html=True)
+        display_concordance(corpus_store, st.session_state.search_query)
+
     with tab2: # This is now the "Dataset" tab
         st.markdown("""
         <div class="app-main-header-container-2">
@@ -780,7 +1805,7 @@ def main():
             total_entries = len(df)
             kata_count = len(df[df['type'] == 'Kata'])
             paragraf_count = len(df[df['type'] == 'Paragraf'])
-            unique_javanese_chars = len(get_unique_javanese_chars(df))
+            unique_javanese_chars = len(javanese_chars)
 
             st.markdown(f"""
             <div class="custom-info-box">
@@ -805,18 +1830,71 @@ def main():
             </div>
             """, unsafe_allow_html=True)
     
-            # Info koneksi GraphDB
-            st.markdown("""
+            # Info koneksi sumber data
+            if source == "graphdb":
+                location_html = f'<a href= "{location}" target="_blank">{location}</a>'
+            else:
+                location_html = f"<code>{location}</code>"
+            st.markdown(f"""
             <div class="app-main-header-container-2">
                 <h2 class="app-main-header-title-2">🔗 Informasi Koneksi</h2>
             </div>
             <div class="custom-info-box">
-                <p><strong>Sumber Data:</strong> GraphDB Repository 'AksaraJawa'</p>
-                <p><strong>Endpoint:</strong> <a href= "https://81ac-180-244-161-63.ngrok-free.app/repositories/AksaraJawa" target="_blank">https://81ac-180-244-161-63.ngrok-free.app/repositories/AksaraJawa</a></p>
+                <p><strong>Sumber Data:</strong> {source_label}</p>
+                <p><strong>{"Endpoint" if source == "graphdb" else "Lokasi"}:</strong> {location_html}</p>
                 <p><strong>Status:</strong> ✅ Terhubung dan data berhasil dimuat</p>
+                <p><strong>Versi Korpus:</strong> <code>{corpus_store["corpus_version"]}</code></p>
             </div>
             """, unsafe_allow_html=True)
             
+            # Korpus gabungan: jumlah entri per naskah
+            if source == "multi":
+                source_counts = df[SOURCE_TAG_COLUMN].value_counts()
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Naskah": entry["name"],
+                            "Jenis": entry["source"],
+                            "Lokasi": entry["location"],
+                            "Entri": int(source_counts.get(entry["name"], 0)),
+                        }
+                        for entry in parse_source_list(location)
+                    ]),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+            # Sinkronisasi inkremental hanya untuk sumber GraphDB
+            if source == "graphdb":
+                if st.button("🔄 Sinkronkan Perubahan dari GraphDB", help="Ambil hanya Paragraf/Kata yang baru, berubah, atau terhapus"):
+                    with st.spinner("🔄 Mengecek perubahan di GraphDB..."):
+                        try:
+                            changed, removed = sync_corpus_store(source, location, corpus_store)
+                        except Exception as e:
+                            st.error(f"Sinkronisasi gagal: {str(e)}")
+                        else:
+                            if changed or removed:
+                                st.success(f"✅ {changed} entri baru/berubah dan {removed} entri terhapus telah disinkronkan.")
+                            else:
+                                st.info("Korpus sudah sesuai dengan GraphDB.")
+                if corpus_store["last_sync"]:
+                    st.caption(f"Sinkronisasi terakhir: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(corpus_store['last_sync']))}")
+
+            # Statistik cache hasil pencarian (bersama untuk semua sesi)
+            cache_stats = query_cache_stats(get_query_cache())
+            st.markdown("""
+            <div class="app-main-header-container-2">
+                <h2 class="app-main-header-title-2">⚡ Cache Pencarian</h2>
+            </div>
+            """, unsafe_allow_html=True)
+            col_hit, col_miss, col_rate, col_entries = st.columns(4)
+            col_hit.metric("Hit", cache_stats["hits"])
+            col_miss.metric("Miss", cache_stats["misses"])
+            col_rate.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+            col_entries.metric("Entri Tersimpan", cache_stats["entries"])
+
+            display_performance_panel(corpus_store)
+            
         else:
             st.warning("Tidak ada data untuk ditampilkan. Pastikan koneksi ke GraphDB berhasil.")
 
@@ -0,0 +1,196 @@
+"""
+Pencarian daftar kata sekaligus (batch) dan ekspor hasilnya ke JSONL atau CSV.
+
+Korpus dan indeks dimuat sekali; setiap query dijalankan di thread pool pada korpus
+bersama, dan hasilnya ditulis segera setelah query itu selesai (urutan selesai,
+bukan urutan masukan; kolom "position" menunjukkan baris asal query).
+
+Contoh:
+    python batch_search.py daftar_kata.txt --output hasil.jsonl
+    python batch_search.py daftar_kata.txt --output hasil.csv --mode prefix --workers 8
+    cat daftar_kata.txt | AKSARA_DATA_SOURCE=csv python batch_search.py - > hasil.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from query_patterns import MATCH_MODES
+from search_index import INDEXED_FIELDS
+
+# Jumlah thread pencarian bawaan
+DEFAULT_BATCH_WORKERS = min(8, os.cpu_count() or 1)
+
+BATCH_FORMATS = ("jsonl", "csv")
+
+# Satu baris CSV per kemunculan; query tanpa hasil tetap mendapat satu baris kosong
+CSV_COLUMNS = [
+    "position", "query", "error", "total_occurrences", "group_type", "group", "score",
+    "type", "s_uri", "latin", "javanese", "translation", "paragraph_reference", "found_in",
+]
+
+
+def read_query_list(lines):
+    """Query dari teks satu query per baris; baris kosong dan komentar (#) dilewati"""
+    queries = []
+    for line in lines:
+        query = line.strip()
+        if query and not query.startswith("#"):
+            queries.append(query)
+    return queries
+
+
+def serialize_grouped_results(final_grouped_results, highlight=None):
+    """
+    Hasil terkelompok search_text dalam bentuk JSON: sub-grup menjadi daftar berurutan
+    dengan kunci grup di 'key'. highlight (teks -> HTML) menambahkan teks tersorot
+    ke setiap kemunculan.
+    """
+    groups = {}
+    for group_type, group_data in final_grouped_results.items():
+        sub_groups = []
+        for group_key, sub_group_data in group_data["sub_groups"].items():
+            occurrences = []
+            for occurrence in sub_group_data["occurrences"]:
+                occurrence = dict(occurrence)
+                if highlight is not None:
+                    occurrence["highlighted"] = {
+                        field: highlight(occurrence[field])
+                        for field in ("javanese", "latin", "translation")
+                        if occurrence[field]
+                    }
+                occurrences.append(occurrence)
+            sub_group = {key: value for key, value in sub_group_data.items() if key != "occurrences"}
+            sub_group["key"] = group_key
+            sub_group["occurrences"] = occurrences
+            sub_groups.append(sub_group)
+        group = {key: value for key, value in group_data.items() if key != "sub_groups"}
+        group["sub_groups"] = sub_groups
+        groups[group_type] = group
+    return groups
+
+
+def search_record(query, search_type, match_mode, cross_script, final_grouped_results, highlight=None):
+    """Record hasil satu query (dipakai oleh batch dan API)"""
+    return {
+        "query": query,
+        "search_type": search_type,
+        "match_mode": match_mode,
+        "cross_script": cross_script,
+        "total_occurrences": sum(group["total_occurrences"] for group in final_grouped_results.values()),
+        "groups": serialize_grouped_results(final_grouped_results, highlight),
+    }
+
+
+def iter_batch_results(queries, search, workers=DEFAULT_BATCH_WORKERS):
+    """
+    Jalankan search(query) untuk setiap query di thread pool dan hasilkan
+    (posisi, record) segera setelah masing-masing selesai.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(search, query): position for position, query in enumerate(queries)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def record_csv_rows(position, record):
+    """Baris CSV untuk record satu query"""
+    base = {
+        "position": position,
+        "query": record["query"],
+        "error": record.get("error", ""),
+        "total_occurrences": record.get("total_occurrences", 0),
+    }
+    rows = []
+    for group_type, group in record.get("groups", {}).items():
+        for sub_group in group["sub_groups"]:
+            for occurrence in sub_group["occurrences"]:
+                rows.append(dict(
+                    base,
+                    group_type=group_type,
+                    group=sub_group["key"],
+                    score=sub_group.get("score", ""),
+                    type=occurrence["type"],
+                    s_uri=occurrence["s_uri"],
+                    latin=occurrence["latin"],
+                    javanese=occurrence["javanese"],
+                    translation=occurrence["translation"],
+                    paragraph_reference=occurrence["paragraph_reference"],
+                    found_in="|".join(field for field, found in occurrence["found_in"].items() if found),
+                ))
+    return rows or [base]
+
+
+class BatchWriter:
+    """Penulis hasil batch yang langsung mem-flush setiap record ke file"""
+
+    def __init__(self, file, output_format):
+        if output_format not in BATCH_FORMATS:
+            raise ValueError(f"Format tidak dikenal: {output_format} (pilihan: {', '.join(BATCH_FORMATS)})")
+        self.file = file
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            self.csv_writer.writeheader()
+
+    def write(self, position, record):
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(record_csv_rows(position, record))
+        else:
+            self.file.write(json.dumps(dict(record, position=position), ensure_ascii=False) + "\n")
+        self.file.flush()
+
+
+def infer_format(path, output_format=None):
+    if output_format:
+        return output_format
+    return "csv" if str(path).lower().endswith(".csv") else "jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pencarian banyak query sekaligus dari daftar kata")
+    parser.add_argument("input", help="File teks berisi satu query per baris ('-' untuk stdin)")
+    parser.add_argument("--output", default="-", help="File hasil ('-' untuk stdout)")
+    parser.add_argument("--format", choices=BATCH_FORMATS, help="Format hasil (bawaan: dari ekstensi file, atau jsonl)")
+    parser.add_argument("--type", default="all", choices=("all",) + tuple(INDEXED_FIELDS), help="Jenis pencarian")
+    parser.add_argument("--mode", default="word", choices=MATCH_MODES, help="Mode pencocokan")
+    parser.add_argument("--no-cross-script", action="store_true", help="Jangan cari juga dalam aksara lainnya")
+    parser.add_argument("--sources", help="Nama naskah dipisahkan koma (korpus gabungan); bawaan: semua naskah")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="Jumlah thread pencarian")
+    args = parser.parse_args()
+
+    # app.py diimpor di sini (bare mode) karena app.py sendiri memakai modul ini
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    if args.input == "-":
+        queries = read_query_list(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8-sig") as f:
+            queries = read_query_list(f)
+
+    corpus_store = app.load_corpus_store(app.DATA_SOURCE_CONFIG["source"], app.DATA_SOURCE_CONFIG["location"])
+    sources = tuple(name.strip() for name in args.sources.split(",") if name.strip()) if args.sources else None
+    # Hasil batch tidak dimasukkan ke cache pencarian bersama (sekali pakai)
+    search = lambda query: app.batch_search_record(
+        corpus_store, query, args.type, args.mode, not args.no_cross_script, sources=sources, use_cache=False
+    )
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        writer = BatchWriter(output, infer_format(args.output, args.format))
+        for done, (position, record) in enumerate(iter_batch_results(queries, search, args.workers), start=1):
+            writer.write(position, record)
+            print(f"\r{done}/{len(queries)} query selesai", end="", file=sys.stderr)
+        print(file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
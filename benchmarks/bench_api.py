@@ -0,0 +1,106 @@
+"""
+Generator beban HTTP sederhana untuk api_server.py.
+
+Mengirim query dari kosakata dataset/pupuh.csv secara bersamaan ke server yang
+sudah berjalan, lalu mencetak throughput (permintaan dan query per detik) dan
+latensi p50/p95/p99. Dengan --batch N setiap permintaan berupa POST /search
+berisi N query; tanpa itu setiap permintaan adalah GET /search untuk satu query.
+
+Contoh:
+    AKSARA_DATA_SOURCE=csv python api_server.py --port 8502 &
+    python benchmarks/bench_api.py --concurrency 16 --requests 2000
+    python benchmarks/bench_api.py --batch 20 --mode prefix
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from data_sources import load_data_from_csv  # noqa: E402
+
+DEFAULT_URL = "http://127.0.0.1:8502"
+
+
+def load_queries(count, seed=0):
+    """Kata Latin dan aksara Jawa acak dari baris Kata dataset asli"""
+    df = load_data_from_csv(str(ROOT_DIR / "dataset" / "pupuh.csv"))
+    kata = df[df["type"] == "Kata"].dropna(subset=["isiLatin", "isiAksaraJawa"])
+    words = list(kata["isiLatin"]) + list(kata["isiAksaraJawa"])
+    rng = random.Random(seed)
+    return [rng.choice(words) for _ in range(count)]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def send_request(url, queries, args):
+    """Kirim satu permintaan; kembalikan (latensi detik, berhasil)"""
+    if args.batch:
+        body = json.dumps({
+            "queries": queries, "mode": args.mode, "type": args.type, "highlight": args.highlight
+        }).encode("utf-8")
+        request = urllib.request.Request(
+            f"{url}/search", data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+    else:
+        params = urllib.parse.urlencode({
+            "q": queries[0], "mode": args.mode, "type": args.type, "highlight": str(args.highlight).lower()
+        })
+        request = urllib.request.Request(f"{url}/search?{params}")
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=args.timeout) as response:
+            response.read()
+            ok = response.status == 200
+    except OSError:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban API pencarian")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--requests", type=int, default=1000, help="Jumlah permintaan HTTP")
+    parser.add_argument("--concurrency", type=int, default=8, help="Jumlah permintaan bersamaan")
+    parser.add_argument("--batch", type=int, default=0, help="Jumlah query per permintaan POST (0: GET satu query)")
+    parser.add_argument("--mode", default="word", help="Mode pencocokan")
+    parser.add_argument("--type", default="all", help="Jenis pencarian")
+    parser.add_argument("--highlight", action="store_true", help="Minta teks HTML tersorot")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    per_request = max(1, args.batch)
+    queries = load_queries(args.requests * per_request, seed=args.seed)
+    chunks = [queries[i:i + per_request] for i in range(0, len(queries), per_request)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        samples = list(executor.map(lambda chunk: send_request(args.url, chunk, args), chunks))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, ok in samples if ok]
+    failures = len(samples) - len(latencies)
+    print(f"permintaan: {len(samples)} (gagal {failures}), query per permintaan: {per_request}, "
+          f"bersamaan: {args.concurrency}")
+    print(f"throughput: {len(samples) / elapsed:.1f} permintaan/detik, "
+          f"{len(samples) * per_request / elapsed:.1f} query/detik")
+    if latencies:
+        print(f"latensi ms: p50 {percentile(latencies, 0.50) * 1000:.2f}, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.2f}, p99 {percentile(latencies, 0.99) * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
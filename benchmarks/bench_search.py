@@ -0,0 +1,270 @@
+"""
+Benchmark pipeline pencarian pada korpus sintetis yang diskalakan.
+
+Korpus sintetis dibentuk seperti dataset/pupuh.csv: setiap Paragraf tersusun dari
+Kata yang diambil acak dari kosakata asli (Latin, aksara Jawa dan arti), dan setiap
+Kata tercatat sebagai baris sendiri yang menunjuk ke paragrafnya. Tahap yang diukur:
+search_text (ujung ke ujung, termasuk pengelompokan), group_results_by_content,
+highlight_text dan pembuatan HTML kemunculan
+(build_occurrences_html, bagian HTML dari display_search_results), tanpa server Streamlit.
+
+Contoh:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --scales 1 10 --queries 20 --repeat 3
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# app.py diimpor tanpa server Streamlit (bare mode); sembunyikan peringatan runtime
+os.environ.setdefault("AKSARA_DATA_SOURCE", "csv")
+import streamlit.logger  # noqa: E402
+streamlit.logger.set_log_level("error")
+
+import app  # noqa: E402
+from data_sources import PUPUH_NAMESPACE, compact_corpus, load_data_from_csv  # noqa: E402
+from query_patterns import compile_query  # noqa: E402
+from search_index import build_search_index  # noqa: E402
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+DEFAULT_RESULTS_FILE = ROOT_DIR / "benchmarks" / "results.jsonl"
+
+# Pemisah kata aksara Jawa pada dataset asli (zero-width space)
+JAVANESE_WORD_SEPARATOR = "\u200b"
+
+
+def load_vocabulary():
+    """Kosakata (latin, aksara Jawa, arti) dan panjang paragraf dari dataset asli"""
+    df = load_data_from_csv("dataset/pupuh.csv")
+    kata = df[df["type"] == "Kata"].dropna(subset=["isiLatin", "isiAksaraJawa"])
+    vocabulary = list(zip(kata["isiLatin"], kata["isiAksaraJawa"], kata["arti"].fillna("")))
+    words_per_paragraph = kata.groupby("munculDalamParagraf").size().tolist()
+    paragraph_count = int((df["type"] == "Paragraf").sum())
+    return vocabulary, words_per_paragraph, paragraph_count
+
+
+def generate_corpus(scale, vocabulary, words_per_paragraph, paragraph_count, seed=0):
+    """Bangkitkan DataFrame korpus sintetis sebesar scale kali dataset asli"""
+    rng = random.Random(seed)
+    s, types, latin, javanese, arti, paragraphs = [], [], [], [], [], []
+
+    for p in range(1, paragraph_count * scale + 1):
+        paragraph_id = f"Paragraf_{p}"
+        words = [rng.choice(vocabulary) for _ in range(rng.choice(words_per_paragraph))]
+
+        s.append(PUPUH_NAMESPACE + paragraph_id)
+        types.append("Paragraf")
+        latin.append(" ".join(word[0] for word in words))
+        javanese.append(JAVANESE_WORD_SEPARATOR.join(word[1] for word in words))
+        arti.append(" ".join(word[2] for word in words if word[2]))
+        paragraphs.append(None)
+
+        for k, (word_latin, word_javanese, word_arti) in enumerate(words):
+            s.append(f"{PUPUH_NAMESPACE}Kata_{p}_{k}")
+            types.append("Kata")
+            latin.append(word_latin)
+            javanese.append(word_javanese)
+            arti.append(word_arti or None)
+            paragraphs.append(paragraph_id)
+
+    # Representasi yang sama dengan korpus yang dimuat aplikasi (lihat load_corpus)
+    return compact_corpus(pd.DataFrame({
+        "s": s,
+        "type": types,
+        "isiLatin": latin,
+        "isiAksaraJawa": javanese,
+        "arti": arti,
+        "munculDalamParagraf": paragraphs,
+    }))
+
+
+def pick_queries(vocabulary, count, seed=0):
+    """Query Latin dan aksara Jawa: kata tunggal dan frasa dua kata"""
+    rng = random.Random(seed)
+    queries = {"latin": [], "javanese": []}
+    for i in range(count):
+        first, second = rng.choice(vocabulary), rng.choice(vocabulary)
+        if i % 4 == 3:
+            queries["latin"].append(f"{first[0]} {second[0]}")
+            queries["javanese"].append(f"{first[1]}{JAVANESE_WORD_SEPARATOR}{second[1]}")
+        else:
+            queries["latin"].append(first[0])
+            queries["javanese"].append(first[1])
+    return queries
+
+
+def build_page_html(final_grouped_results, query, compiled_query, page_size):
+    """HTML kemunculan untuk halaman pertama setiap sub-grup, seperti display_search_results"""
+    parts = []
+    for group_data in final_grouped_results.values():
+        for sub_group_data in group_data["sub_groups"].values():
+            occurrences = sub_group_data["occurrences"][:page_size]
+            parts.append(app.build_occurrences_html(occurrences, query, compiled_query))
+    return parts
+
+
+def highlight_page(final_grouped_results, query, compiled_query, page_size):
+    """Highlight teks kemunculan pada halaman pertama setiap sub-grup"""
+    for group_data in final_grouped_results.values():
+        for sub_group_data in group_data["sub_groups"].values():
+            for occurrence in sub_group_data["occurrences"][:page_size]:
+                app.highlight_text(occurrence["latin"], query, compiled_query)
+                app.highlight_text(occurrence["javanese"], query, compiled_query)
+                app.highlight_text(occurrence["translation"], query, compiled_query)
+
+
+def run_stages(df, search_index, query, search_type, page_size, trace_memory=False):
+    """
+    Jalankan setiap tahap sekali. Mengembalikan (durasi detik per tahap, puncak
+    memori byte per tahap, jumlah baris hasil); puncak memori hanya diisi jika
+    trace_memory True dan tracemalloc sedang aktif.
+    """
+    timings = {}
+    peaks = {}
+
+    def measure(stage, func, *args):
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = time.perf_counter() - start
+        if trace_memory:
+            peaks[stage] = tracemalloc.get_traced_memory()[1]
+        return result
+
+    row_ids, final_grouped_results = measure(
+        "search_text", app.search_text, df, query, search_type, search_index
+    )
+    results_df = df.loc[row_ids].reset_index(drop=True)
+    compiled_query = compile_query(query.strip())
+    measure("group_results_by_content", app.group_results_by_content, results_df, query.strip(), compiled_query)
+    measure("highlight_text", highlight_page, final_grouped_results, query, compiled_query, page_size)
+    measure("display_html", build_page_html, final_grouped_results, query, compiled_query, page_size)
+
+    return timings, peaks, len(row_ids)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_peak_memory(df, search_index, queries, search_type, page_size):
+    """Puncak alokasi memori (KiB) per tahap selama satu putaran semua query"""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for query in queries:
+            _, query_peaks, _ = run_stages(df, search_index, query, search_type, page_size, trace_memory=True)
+            for stage, peak in query_peaks.items():
+                peaks[stage] = max(peaks.get(stage, 0), peak)
+    finally:
+        tracemalloc.stop()
+    return {stage: peak / 1024 for stage, peak in peaks.items()}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_scale(scale, vocabulary, words_per_paragraph, paragraph_count, args):
+    """Benchmark satu ukuran korpus; kembalikan daftar record hasil"""
+    df = generate_corpus(scale, vocabulary, words_per_paragraph, paragraph_count, seed=args.seed)
+    corpus_kib = df.memory_usage(deep=True).sum() / 1024
+
+    start = time.perf_counter()
+    search_index = build_search_index(df)
+    index_seconds = time.perf_counter() - start
+
+    queries = pick_queries(vocabulary, args.queries, seed=args.seed)
+    records = []
+    for script, script_queries in queries.items():
+        search_type = "all"
+        samples = {}
+        result_rows = []
+        for _ in range(args.repeat):
+            for query in script_queries:
+                timings, _, rows = run_stages(df, search_index, query, search_type, args.page_size)
+                result_rows.append(rows)
+                for stage, seconds in timings.items():
+                    samples.setdefault(stage, []).append(seconds)
+
+        peaks = {}
+        if not args.no_memory:
+            peaks = measure_peak_memory(df, search_index, script_queries, search_type, args.page_size)
+
+        for stage, values in samples.items():
+            records.append({
+                "scale": scale,
+                "rows": len(df),
+                "script": script,
+                "stage": stage,
+                "samples": len(values),
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "peak_kib": peaks.get(stage),
+                "mean_result_rows": statistics.mean(result_rows),
+                "index_build_s": index_seconds,
+                "corpus_kib": corpus_kib,
+            })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline pencarian pada korpus sintetis")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Kelipatan ukuran dataset asli (default: 1 10 100 1000)")
+    parser.add_argument("--queries", type=int, default=40, help="Jumlah query per aksara")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah putaran setiap query")
+    parser.add_argument("--page-size", type=int, default=app.DEFAULT_PAGE_SIZE,
+                        help="Jumlah kemunculan per halaman untuk highlight dan HTML")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Lewati pengukuran puncak memori")
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS_FILE,
+                        help="File JSON Lines tempat hasil ditambahkan")
+    args = parser.parse_args()
+
+    vocabulary, words_per_paragraph, paragraph_count = load_vocabulary()
+    run = {
+        "run_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    print(f"{'scale':>6} {'rows':>8} {'script':>9} {'stage':>25} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>9}")
+    for scale in args.scales:
+        records = benchmark_scale(scale, vocabulary, words_per_paragraph, paragraph_count, args)
+        with open(args.output, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps({**run, **record}, ensure_ascii=False) + "\n")
+        for record in records:
+            peak = f"{record['peak_kib']:.0f}" if record["peak_kib"] is not None else "-"
+            print(f"{record['scale']:>6} {record['rows']:>8} {record['script']:>9} {record['stage']:>25} "
+                  f"{record['p50_ms']:>9.2f} {record['p95_ms']:>9.2f} {peak:>9}")
+
+    print(f"Hasil ditambahkan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
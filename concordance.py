@@ -0,0 +1,264 @@
+import re
+from bisect import bisect_left, bisect_right
+
+from data_sources import SOURCE_TAG_COLUMN
+from search_index import token_spans, tokenize_field, find_phrase_positions
+from query_patterns import is_javanese_text
+
+# Kolom teks yang diselaraskan antara Kata dan Paragraf
+CONCORDANCE_FIELDS = {'latin': 'isiLatin', 'javanese': 'isiAksaraJawa'}
+
+# Lebar konteks bawaan (jumlah token di kiri dan kanan kata)
+DEFAULT_CONTEXT_WIDTH = 5
+
+KATA_NUMBER_RE = re.compile(r'_(\d+)$')
+
+
+def kata_order(uri):
+    """Nomor urut Kata dalam paragrafnya dari akhiran URI (Kata_<paragraf>_<urutan>)"""
+    match = KATA_NUMBER_RE.search(uri) if isinstance(uri, str) else None
+    return int(match.group(1)) if match else 0
+
+
+def source_names(df):
+    """Nama naskah setiap baris pada korpus gabungan, atau None untuk korpus satu sumber"""
+    if SOURCE_TAG_COLUMN in df.columns:
+        return df[SOURCE_TAG_COLUMN].tolist()
+    return [None] * len(df)
+
+
+def paragraph_key(paragraph_name, source=None):
+    """Nama paragraf, diawali nama naskah pada korpus gabungan (nomor paragraf hanya unik per naskah)"""
+    return paragraph_name if source is None else f"{source}/{paragraph_name}"
+
+
+def build_concordance(df):
+    """
+    Hubungan Kata <-> Paragraf dengan offset, dihitung sekali per versi korpus:
+
+    - paragraph_rows: nama paragraf (Paragraf_1, atau naskah/Paragraf_1) -> id baris Paragraf
+    - paragraph_words: id baris Paragraf -> [id baris Kata] sesuai urutan kata
+    - token_spans: field -> id baris Paragraf -> [(awal, akhir) karakter setiap token]
+    - word_spans: field -> id baris Kata -> (id baris Paragraf, awal, akhir, offset token)
+    - span_words: field -> (id baris Paragraf, awal karakter) -> id baris Kata
+    - text_words: field -> teks Kata (huruf kecil untuk Latin) -> [id baris Kata yang berpasangan]
+
+    Kata diselaraskan berurutan dengan teks paragrafnya (pencarian maju dari
+    posisi kata sebelumnya); kata yang tidak ditemukan tidak memiliki offset.
+    """
+    concordance = {
+        'paragraph_rows': {},
+        'paragraph_words': {},
+        'token_spans': {field: {} for field in CONCORDANCE_FIELDS},
+        'word_spans': {field: {} for field in CONCORDANCE_FIELDS},
+        'span_words': {field: {} for field in CONCORDANCE_FIELDS},
+        'text_words': {field: {} for field in CONCORDANCE_FIELDS},
+    }
+    if df.empty or not {'s', 'type', 'munculDalamParagraf'} <= set(df.columns):
+        return concordance
+
+    paragraphs = df[df['type'] == 'Paragraf']
+    for row_id, uri, source in zip(paragraphs.index, paragraphs['s'], source_names(paragraphs)):
+        if isinstance(uri, str):
+            concordance['paragraph_rows'][paragraph_key(uri.split('#')[-1], source)] = row_id
+    for field, column in CONCORDANCE_FIELDS.items():
+        for row_id, text in zip(paragraphs.index, paragraphs[column]):
+            if isinstance(text, str):
+                concordance['token_spans'][field][row_id] = token_spans(field, text)
+
+    kata = df[(df['type'] == 'Kata') & df['munculDalamParagraf'].notna()]
+    words_by_paragraph = {}
+    for row_id, uri, paragraph_name, source in zip(kata.index, kata['s'], kata['munculDalamParagraf'], source_names(kata)):
+        paragraph_row = concordance['paragraph_rows'].get(paragraph_key(paragraph_name, source))
+        if paragraph_row is not None:
+            words_by_paragraph.setdefault(paragraph_row, []).append((kata_order(uri), row_id))
+
+    # Teks per kolom diambil sekali sebagai dict id baris -> teks (df.at per kata lambat)
+    paragraph_texts = {column: dict(zip(paragraphs.index, paragraphs[column])) for column in CONCORDANCE_FIELDS.values()}
+    word_texts = {column: dict(zip(kata.index, kata[column])) for column in CONCORDANCE_FIELDS.values()}
+
+    for paragraph_row, words in words_by_paragraph.items():
+        word_rows = [row_id for _, row_id in sorted(words)]
+        concordance['paragraph_words'][paragraph_row] = word_rows
+        for field, column in CONCORDANCE_FIELDS.items():
+            paragraph_text = paragraph_texts[column][paragraph_row]
+            if not isinstance(paragraph_text, str):
+                continue
+            if field != 'javanese':
+                paragraph_text = paragraph_text.lower()
+            starts = [start for start, _ in concordance['token_spans'][field].get(paragraph_row, [])]
+            cursor = 0
+            column_words = word_texts[column]
+            for word_row in word_rows:
+                word_text = column_words[word_row]
+                if not isinstance(word_text, str) or not word_text.strip():
+                    continue
+                word_text = word_text.strip() if field == 'javanese' else word_text.strip().lower()
+                start = paragraph_text.find(word_text, cursor)
+                if start == -1:
+                    continue
+                end = start + len(word_text)
+                # Offset token hanya ada jika kata dimulai tepat di awal sebuah token
+                token_index = bisect_left(starts, start)
+                token_offset = token_index if token_index < len(starts) and starts[token_index] == start else None
+                concordance['word_spans'][field][word_row] = (paragraph_row, start, end, token_offset)
+                concordance['span_words'][field][(paragraph_row, start)] = word_row
+                concordance['text_words'][field].setdefault(word_text, []).append(word_row)
+                cursor = end
+
+    return concordance
+
+
+def row_paragraph_key(row_type, uri, paragraph_name, source):
+    """Kunci paragraf sebuah baris: Paragraf itu sendiri, atau paragraf tempat Kata muncul"""
+    if row_type == 'Paragraf' and isinstance(uri, str):
+        return paragraph_key(uri.split('#')[-1], source)
+    if row_type == 'Kata' and isinstance(paragraph_name, str):
+        return paragraph_key(paragraph_name, source)
+    return None
+
+
+def row_paragraph_keys(rows):
+    if rows.empty:
+        return []
+    return [
+        row_paragraph_key(*row)
+        for row in zip(rows['type'], rows['s'], rows['munculDalamParagraf'], source_names(rows))
+    ]
+
+
+def word_text_key(field, text):
+    """Kunci text_words untuk teks Kata, sama dengan build_concordance"""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    return text.strip() if field == 'javanese' else text.strip().lower()
+
+
+def update_concordance(concordance, old_df, new_df, removed_rows, added_rows):
+    """
+    Konkordansi untuk new_df dari konkordansi old_df dan selisih barisnya
+    (lihat corpus_sync.apply_corpus_changes). Hanya paragraf yang Paragraf atau
+    Kata-nya berubah yang diselaraskan ulang; konkordansi lama tidak diubah.
+    """
+    keys = set(row_paragraph_keys(removed_rows) + row_paragraph_keys(added_rows)) - {None}
+    if not keys:
+        return concordance
+
+    updated = {
+        'paragraph_rows': dict(concordance['paragraph_rows']),
+        'paragraph_words': dict(concordance['paragraph_words']),
+    }
+    for name in ('token_spans', 'word_spans', 'span_words', 'text_words'):
+        updated[name] = {field: dict(entries) for field, entries in concordance[name].items()}
+
+    # Keluarkan entri lama paragraf yang terdampak beserta kata-katanya
+    dropped_words = []
+    for key in keys:
+        paragraph_row = updated['paragraph_rows'].pop(key, None)
+        if paragraph_row is None:
+            continue
+        for field in CONCORDANCE_FIELDS:
+            updated['token_spans'][field].pop(paragraph_row, None)
+        dropped_words.extend(updated['paragraph_words'].pop(paragraph_row, []))
+    for field, column in CONCORDANCE_FIELDS.items():
+        word_spans, span_words, text_words = (updated[name][field] for name in ('word_spans', 'span_words', 'text_words'))
+        dropped_by_text = {}
+        for word_row, text in zip(dropped_words, old_df.loc[dropped_words, column]):
+            span = word_spans.pop(word_row, None)
+            if span is None:
+                continue
+            span_words.pop((span[0], span[1]), None)
+            dropped_by_text.setdefault(word_text_key(field, text), set()).add(word_row)
+        for text, word_rows in dropped_by_text.items():
+            remaining = [word_row for word_row in text_words.get(text, []) if word_row not in word_rows]
+            if remaining:
+                text_words[text] = remaining
+            else:
+                text_words.pop(text, None)
+
+    # Selaraskan ulang paragraf terdampak dari new_df: baris Paragraf yang tetap ada
+    # (id baris tidak berubah) atau baru, dan semua Kata yang menunjuk ke paragraf itu
+    paragraph_ids = {concordance['paragraph_rows'][key] for key in keys if key in concordance['paragraph_rows']}
+    paragraph_ids.update(added_rows.index[added_rows['type'] == 'Paragraf'])
+    paragraph_names = [key.split('/')[-1] for key in keys]
+    subset = new_df[
+        (new_df.index.isin(list(paragraph_ids)) & (new_df['type'] == 'Paragraf'))
+        | ((new_df['type'] == 'Kata') & new_df['munculDalamParagraf'].isin(paragraph_names))
+    ]
+    # Pada korpus gabungan nama paragraf yang sama bisa milik naskah lain
+    subset = subset.loc[[key in keys for key in row_paragraph_keys(subset)]]
+    partial = build_concordance(subset)
+
+    updated['paragraph_rows'].update(partial['paragraph_rows'])
+    updated['paragraph_words'].update(partial['paragraph_words'])
+    for field in CONCORDANCE_FIELDS:
+        for name in ('token_spans', 'word_spans', 'span_words'):
+            updated[name][field].update(partial[name][field])
+        text_words = updated['text_words'][field]
+        for text, word_rows in partial['text_words'][field].items():
+            text_words[text] = text_words.get(text, []) + word_rows
+    return updated
+
+
+def context_window(text, spans, start, end, width):
+    """Teks kiri dan kanan sebanyak width token di sekitar rentang karakter (start, end)"""
+    starts = [span_start for span_start, _ in spans]
+    ends = [span_end for _, span_end in spans]
+    left_index = max(0, bisect_right(ends, start) - width)
+    right_index = min(len(spans), bisect_left(starts, end) + width)
+    left_start = spans[left_index][0] if left_index < len(spans) and spans[left_index][0] < start else start
+    right_end = spans[right_index - 1][1] if right_index > 0 and spans[right_index - 1][1] > end else end
+    left = text[left_start:start]
+    right = text[end:right_end]
+    return (
+        ('… ' if left_start > 0 else '') + left,
+        right + (' …' if right_end < len(text) else ''),
+    )
+
+
+def concordance_lines(concordance, df, positional_index, word, width=DEFAULT_CONTEXT_WIDTH):
+    """
+    Semua kemunculan kata dalam teks Paragraf dengan konteks kiri/kanan (KWIC).
+
+    Kemunculan diambil dari offset Kata yang sudah diselaraskan ditambah posisi token
+    di indeks posisi (untuk kemunculan tanpa baris Kata), lalu konteks dipotong langsung
+    dari offset karakter token paragraf. Diurutkan menurut paragraf dan posisi.
+    """
+    word = word.strip()
+    if not word:
+        return []
+    field = 'javanese' if is_javanese_text(word) else 'latin'
+    column = CONCORDANCE_FIELDS[field]
+    normalized_word = word if field == 'javanese' else word.lower()
+
+    # (id baris Paragraf, awal) -> (akhir, id baris Kata atau None)
+    occurrences = {}
+    for word_row in concordance['text_words'][field].get(normalized_word, []):
+        paragraph_row, start, end, _ = concordance['word_spans'][field][word_row]
+        occurrences[(paragraph_row, start)] = (end, word_row)
+
+    tokens = tokenize_field(field, word)
+    for paragraph_row, positions in find_phrase_positions(positional_index[field], tokens).items():
+        spans = concordance['token_spans'][field].get(paragraph_row)
+        if not spans:
+            continue
+        for position in positions:
+            start, end = spans[position][0], spans[position + len(tokens) - 1][1]
+            if (paragraph_row, start) not in occurrences:
+                word_row = concordance['span_words'][field].get((paragraph_row, start))
+                occurrences[(paragraph_row, start)] = (end, word_row)
+
+    paragraph_names = {row_id: name for name, row_id in concordance['paragraph_rows'].items()}
+    lines = []
+    for (paragraph_row, start), (end, word_row) in sorted(occurrences.items()):
+        text = df.at[paragraph_row, column]
+        left, right = context_window(text, concordance['token_spans'][field][paragraph_row], start, end, width)
+        lines.append({
+            'paragraph': paragraph_names.get(paragraph_row, str(paragraph_row)),
+            'left': left,
+            'keyword': text[start:end],
+            'right': right,
+            # Arti dari baris Kata yang diselaraskan dengan kemunculan ini (jika ada)
+            'translation': df.at[word_row, 'arti'] if word_row is not None and isinstance(df.at[word_row, 'arti'], str) else '',
+        })
+    return lines
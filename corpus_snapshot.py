@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from data_sources import BASE_DIR, TEXT_DTYPE, compact_corpus
+
+# Naikkan versi ini jika skema DataFrame, struktur indeks atau isi snapshot berubah
+SNAPSHOT_FORMAT_VERSION = 6
+
+# Lokasi snapshot; kosongkan AKSARA_SNAPSHOT_DIR untuk menonaktifkan snapshot
+SNAPSHOT_ROOT = os.environ.get("AKSARA_SNAPSHOT_DIR", str(BASE_DIR / ".cache" / "snapshots"))
+
+# Umur maksimum snapshot sebelum dibangun ulang walaupun fingerprint sumber sama
+SNAPSHOT_MAX_AGE = float(os.environ.get("AKSARA_SNAPSHOT_MAX_AGE_HOURS", "24")) * 3600
+
+MANIFEST_FILE = "manifest.json"
+CORPUS_FILE = "corpus.arrow"
+INDEX_FILE = "search_index.pickle"
+CHARS_FILE = "javanese_chars.json"
+# Struktur turunan lain (misalnya indeks posisi) disimpan sebagai <nama>.pickle
+STRUCTURE_FILE_SUFFIX = ".pickle"
+
+
+def make_corpus_version(fingerprint, rows, created_at):
+    """Identitas versi korpus, berubah setiap kali korpus dimuat ulang dari sumber"""
+    return hashlib.sha1(f"{fingerprint}|{rows}|{created_at}".encode("utf-8")).hexdigest()[:12]
+
+
+def snapshot_enabled():
+    return bool(SNAPSHOT_ROOT)
+
+
+def snapshot_dir(source, location):
+    """Direktori snapshot untuk satu kombinasi sumber data dan lokasi"""
+    location_hash = hashlib.sha1(location.encode("utf-8")).hexdigest()[:12]
+    return Path(SNAPSHOT_ROOT) / f"{source}-{location_hash}"
+
+
+def read_manifest(source, location):
+    """Baca manifest snapshot; None jika belum ada, rusak, atau versinya berbeda"""
+    if not snapshot_enabled():
+        return None
+    try:
+        with open(snapshot_dir(source, location) / MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def is_snapshot_fresh(manifest, fingerprint, max_age=SNAPSHOT_MAX_AGE):
+    """
+    Snapshot dianggap segar jika fingerprint sumber sama dan umurnya belum melewati
+    max_age. Jika fingerprint tidak bisa diambil (misalnya endpoint mati), snapshot
+    tetap dipakai agar aplikasi bisa mulai tanpa sumber data.
+    """
+    if manifest is None:
+        return False
+    if fingerprint is None:
+        return True
+    if manifest.get("fingerprint") != fingerprint:
+        return False
+    return time.time() - manifest.get("created_at", 0) < max_age
+
+
+def arrow_text_dtype(arrow_type):
+    """Kolom string Arrow langsung menjadi string pandas berbasis Arrow (tanpa melewati object)"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.api.types.pandas_dtype(TEXT_DTYPE)
+    return None
+
+
+def load_snapshot_corpus(source, location):
+    """
+    Baca DataFrame korpus dari file Arrow IPC yang di-memory-map. Kolom teks tetap
+    menunjuk ke buffer file yang di-map (tidak disalin ke heap); hanya kolom kategori
+    (kode dan daftar kategorinya) dan index yang dibangun di memori proses.
+    """
+    path = snapshot_dir(source, location) / CORPUS_FILE
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    # Kolom kategori tersimpan sebagai dictionary Arrow dan kembali menjadi kategori
+    return compact_corpus(table.to_pandas(types_mapper=arrow_text_dtype))
+
+
+def load_snapshot_index(source, location):
+    with open(snapshot_dir(source, location) / INDEX_FILE, "rb") as f:
+        return pickle.load(f)
+
+
+def load_snapshot_chars(source, location):
+    with open(snapshot_dir(source, location) / CHARS_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_snapshot_structures(source, location, manifest):
+    """Struktur turunan yang tercatat di manifest (termasuk ringkasan di manifest itu sendiri): nama -> objek"""
+    structures = dict(manifest.get("summaries", {}))
+    for name in manifest.get("structures", []):
+        with open(snapshot_dir(source, location) / f"{name}{STRUCTURE_FILE_SUFFIX}", "rb") as f:
+            structures[name] = pickle.load(f)
+    return structures
+
+
+def save_snapshot(source, location, df, search_index, javanese_chars, fingerprint, corpus_version,
+                  structures=None, summaries=None):
+    """
+    Tulis snapshot korpus, indeks terbalik, inventaris karakter dan struktur turunan
+    (structures: nama -> objek yang dapat di-pickle) ke disk. summaries berisi
+    struktur kecil yang dapat di-JSON-kan (misalnya statistik BM25) dan disimpan
+    langsung di manifest.
+
+    Snapshot ditulis ke direktori sementara lalu dipindahkan, sehingga proses lain
+    tidak pernah membaca snapshot yang setengah jadi. Mengembalikan manifest.
+    """
+    if not snapshot_enabled():
+        return None
+
+    target = snapshot_dir(source, location)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(str(staging / CORPUS_FILE), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    with open(staging / INDEX_FILE, "wb") as f:
+        pickle.dump(search_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    with open(staging / CHARS_FILE, "w", encoding="utf-8") as f:
+        json.dump(javanese_chars, f, ensure_ascii=False)
+
+    structures = structures or {}
+    for name, structure in structures.items():
+        with open(staging / f"{name}{STRUCTURE_FILE_SUFFIX}", "wb") as f:
+            pickle.dump(structure, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "source": source,
+        "location": location,
+        "fingerprint": fingerprint,
+        "rows": len(df),
+        "created_at": time.time(),
+        "corpus_version": corpus_version,
+        "structures": sorted(structures),
+        "summaries": summaries or {},
+    }
+    with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(staging, target)
+    except OSError:
+        # Proses lain sudah menulis snapshot lebih dulu
+        shutil.rmtree(staging, ignore_errors=True)
+    return manifest
@@ -0,0 +1,133 @@
+import hashlib
+
+import pandas as pd
+from SPARQLWrapper import SPARQLWrapper, JSON
+
+from data_sources import (
+    CORPUS_COLUMNS, CORPUS_WHERE, GRAPHDB_TIMEOUT, bindings_to_dataframe, compact_corpus, subject_rows_query
+)
+
+# Kolom yang ikut dihitung dalam hash konten per subjek (urutan harus sama dengan query)
+HASHED_COLUMNS = ["type", "isiLatin", "isiAksaraJawa", "arti", "munculDalamParagraf"]
+
+# Ekspresi SPARQL yang menggabungkan kolom satu baris dengan pemisah tab
+HASHED_ROW_EXPRESSION = ', "\\t", '.join(f'COALESCE(?{column}, "")' for column in HASHED_COLUMNS)
+
+# Hash MD5 konten setiap subjek, dihitung di sisi endpoint sehingga yang diunduh
+# hanya URI dan 32 karakter hash per subjek, bukan seluruh teks korpus
+SUBJECT_HASH_QUERY = f"""
+PREFIX ex: <http://example.org/pupuh#>
+SELECT ?s (MD5(GROUP_CONCAT(?row; separator="\\n")) AS ?hash)
+WHERE {{
+    {{
+        SELECT ?s ?type ?isiLatin ?isiAksaraJawa ?arti ?munculDalamParagraf
+        WHERE {CORPUS_WHERE}
+    }}
+    BIND(CONCAT({HASHED_ROW_EXPRESSION}) AS ?row)
+}}
+GROUP BY ?s
+"""
+
+# Jumlah subjek per query VALUES saat mengambil baris yang berubah
+SYNC_BATCH_SIZE = 200
+
+
+def compute_subject_hashes(df):
+    """Hitung hash konten per subjek dari DataFrame lokal, sama dengan SUBJECT_HASH_QUERY"""
+    if df.empty:
+        return {}
+
+    # Kolom kategori diubah ke object dulu: fillna("") hanya berlaku untuk nilai kategori yang ada
+    rows = df[HASHED_COLUMNS].astype(object).fillna("").astype(str).agg("\t".join, axis=1)
+    hashes = {}
+    for s_uri, row_texts in rows.groupby(df["s"], sort=False):
+        content = "\n".join(row_texts)
+        hashes[s_uri] = hashlib.md5(content.encode("utf-8")).hexdigest()
+    return hashes
+
+
+def fetch_subject_hashes(endpoint):
+    """Ambil hash konten semua subjek dari endpoint SPARQL"""
+    sparql = SPARQLWrapper(endpoint)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(GRAPHDB_TIMEOUT)
+    sparql.setQuery(SUBJECT_HASH_QUERY)
+    bindings = sparql.query().convert()["results"]["bindings"]
+    return {binding["s"]["value"]: binding["hash"]["value"] for binding in bindings}
+
+
+def detect_changes(local_hashes, remote_hashes):
+    """Bandingkan hash lokal dan remote; kembalikan (subjek baru/berubah, subjek terhapus)"""
+    changed = {
+        s_uri for s_uri, remote_hash in remote_hashes.items()
+        if local_hashes.get(s_uri) != remote_hash
+    }
+    removed = set(local_hashes) - set(remote_hashes)
+    return changed, removed
+
+
+def fetch_subject_rows(endpoint, subject_uris, batch_size=SYNC_BATCH_SIZE):
+    """Ambil baris korpus hanya untuk subjek tertentu, per batch dengan VALUES"""
+    sparql = SPARQLWrapper(endpoint)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(GRAPHDB_TIMEOUT)
+
+    subject_uris = sorted(subject_uris)
+    rows = []
+    for start in range(0, len(subject_uris), batch_size):
+        sparql.setQuery(subject_rows_query(subject_uris[start:start + batch_size]))
+        for binding in sparql.query().convert()["results"]["bindings"]:
+            rows.append({name: value["value"] for name, value in binding.items()})
+    return bindings_to_dataframe(rows)
+
+
+def apply_corpus_changes(df, new_rows, stale_uris):
+    """
+    Gabungkan perubahan ke DataFrame korpus.
+
+    Baris milik stale_uris (subjek yang berubah atau terhapus) dikeluarkan, lalu
+    new_rows ditambahkan di akhir dengan id baris baru sehingga id baris lama tetap
+    valid. DataFrame lama tidak diubah. Mengembalikan (DataFrame baru, baris yang
+    dikeluarkan, baris yang ditambahkan beserta id barunya); kedua baris terakhir
+    adalah selisih yang dipakai untuk memperbarui indeks dan struktur korpus lainnya.
+    """
+    stale_mask = df["s"].isin(stale_uris)
+    removed_rows = df[stale_mask]
+
+    next_row_id = int(df.index.max()) + 1 if len(df) else 0
+    added_rows = new_rows[CORPUS_COLUMNS].set_axis(range(next_row_id, next_row_id + len(new_rows)))
+
+    # Kategori lama dan baris baru digabung sebagai teks, lalu dipadatkan lagi
+    merged = compact_corpus(pd.concat([df[~stale_mask], added_rows]))
+    merged.attrs = dict(df.attrs)
+    return merged, removed_rows, merged.loc[added_rows.index]
+
+
+def sync_corpus(df, local_hashes, endpoint):
+    """
+    Sinkronisasi inkremental dengan endpoint GraphDB.
+
+    Hanya subjek yang hash kontennya berbeda yang diambil ulang. local_hashes
+    diperbarui di tempat; df tidak diubah. Mengembalikan dict berisi DataFrame baru
+    ("df"), selisih barisnya ("removed_rows", "added_rows", lihat apply_corpus_changes)
+    dan jumlah subjek baru/berubah ("changed") serta terhapus ("removed").
+    """
+    remote_hashes = fetch_subject_hashes(endpoint)
+    changed, removed = detect_changes(local_hashes, remote_hashes)
+    if not changed and not removed:
+        return {"df": df, "removed_rows": df.iloc[:0], "added_rows": df.iloc[:0], "changed": 0, "removed": 0}
+
+    new_rows = fetch_subject_rows(endpoint, changed) if changed else pd.DataFrame(columns=CORPUS_COLUMNS)
+    merged, removed_rows, added_rows = apply_corpus_changes(df, new_rows, changed | removed)
+
+    for s_uri in removed:
+        local_hashes.pop(s_uri, None)
+    for s_uri in changed:
+        local_hashes[s_uri] = remote_hashes[s_uri]
+    return {
+        "df": merged,
+        "removed_rows": removed_rows,
+        "added_rows": added_rows,
+        "changed": len(changed),
+        "removed": len(removed),
+    }
@@ -0,0 +1,480 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+from SPARQLWrapper import SPARQLWrapper, JSON
+
+from perf_metrics import timed, timed_span
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PUPUH_NAMESPACE = "http://example.org/pupuh#"
+
+# Skema kolom DataFrame korpus yang dipakai seluruh aplikasi
+CORPUS_COLUMNS = ["s", "type", "isiLatin", "isiAksaraJawa", "arti", "munculDalamParagraf"]
+
+# Pola SPARQL untuk semua data Paragraf dan Kata
+# Memastikan semua properti yang relevan diambil
+CORPUS_WHERE = """{
+    {
+        ?s a ex:Paragraf .
+        OPTIONAL { ?s ex:isiLatin ?isiLatin . }
+        OPTIONAL { ?s ex:isiAksaraJawa ?isiAksaraJawa . }
+        OPTIONAL { ?s ex:arti ?arti . }
+        BIND("Paragraf" AS ?type)
+    } UNION {
+        ?s a ex:Kata .
+        OPTIONAL { ?s ex:latin ?isiLatin . }
+        OPTIONAL { ?s ex:aksaraJawa ?isiAksaraJawa . }
+        OPTIONAL { ?s ex:arti ?arti . }
+        OPTIONAL { ?s ex:munculDalamParagraf ?munculDalamParagrafUri .
+                   BIND(STRAFTER(STR(?munculDalamParagrafUri), "http://example.org/pupuh#") AS ?munculDalamParagraf) }
+        BIND("Kata" AS ?type)
+    }
+}"""
+
+CORPUS_QUERY = f"""
+PREFIX ex: <http://example.org/pupuh#>
+SELECT ?s ?type ?isiLatin ?isiAksaraJawa ?arti ?munculDalamParagraf
+WHERE {CORPUS_WHERE}
+"""
+
+CORPUS_COUNT_QUERY = f"""
+PREFIX ex: <http://example.org/pupuh#>
+SELECT (COUNT(*) AS ?total)
+WHERE {CORPUS_WHERE}
+"""
+
+# Urutan total yang stabil agar LIMIT/OFFSET tidak melewatkan atau menggandakan baris
+CORPUS_PAGE_ORDER = "ORDER BY ?s ?type ?isiLatin ?isiAksaraJawa ?arti ?munculDalamParagraf"
+
+# Urutan baris korpus seperti pada file sumber: semua Paragraf lalu semua Kata, masing-masing
+# menurut nomor di URI (Kata_1_3 sebelum Kata_1_12, bukan urutan string ORDER BY ?s)
+CORPUS_TYPE_ORDER = ("Paragraf", "Kata")
+URI_NUMBER_RE = re.compile(r"(\d+)")
+
+
+def natural_uri_key(s_uri):
+    """Kunci urut URI dengan bagian angka dibandingkan sebagai bilangan"""
+    parts = URI_NUMBER_RE.split(s_uri)
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def sort_corpus_rows(df):
+    """
+    Urutkan baris korpus ke urutan naskah (CORPUS_TYPE_ORDER, lalu nomor di URI) dengan
+    id baris baru 0..n-1. Dipakai untuk hasil query SPARQL yang diurutkan sebagai string.
+    """
+    type_rank = {name: rank for rank, name in enumerate(CORPUS_TYPE_ORDER)}
+    keys = [
+        (type_rank.get(row_type, len(type_rank)), natural_uri_key(s_uri))
+        for row_type, s_uri in zip(df["type"].astype(str), df["s"].astype(str))
+    ]
+    order = sorted(range(len(df)), key=keys.__getitem__)
+    return df.iloc[order].reset_index(drop=True)
+
+
+def subject_rows_query(subject_uris):
+    """Query baris korpus (beserta munculDalamParagraf) hanya untuk subjek tertentu, dengan VALUES"""
+    values = " ".join(f"<{s_uri}>" for s_uri in subject_uris)
+    return f"""
+    PREFIX ex: <http://example.org/pupuh#>
+    SELECT ?s ?type ?isiLatin ?isiAksaraJawa ?arti ?munculDalamParagraf
+    WHERE {{
+        VALUES ?s {{ {values} }}
+        {CORPUS_WHERE}
+    }}
+    """
+
+# Pengaturan pemuatan bertahap dari GraphDB
+GRAPHDB_PAGE_SIZE = int(os.environ.get("AKSARA_GRAPHDB_PAGE_SIZE", "2000"))
+GRAPHDB_MAX_RETRIES = 3
+GRAPHDB_RETRY_DELAY = 1.0  # detik, dilipatgandakan pada setiap percobaan ulang
+GRAPHDB_TIMEOUT = 60  # detik per halaman
+
+# Kolom penanda naskah asal pada korpus gabungan beberapa sumber
+SOURCE_TAG_COLUMN = "sumber"
+
+# Kolom berulang (dua jenis entitas, puluhan paragraf, beberapa naskah) disimpan sebagai
+# kategori: kode integer per baris dengan satu salinan setiap nilai
+CATEGORICAL_COLUMNS = ["type", "munculDalamParagraf", SOURCE_TAG_COLUMN]
+
+# Kolom teks disimpan sebagai string Arrow (satu buffer per kolom, bukan satu objek
+# Python per sel). pandas 3 sudah memakainya untuk dtype "str" bawaan.
+TEXT_COLUMNS = ["s", "isiLatin", "isiAksaraJawa", "arti"]
+TEXT_DTYPE = "str" if int(pd.__version__.split(".")[0]) >= 3 else "string[pyarrow]"
+
+# Jumlah sumber yang dimuat bersamaan pada korpus gabungan
+MULTI_SOURCE_WORKERS = int(os.environ.get("AKSARA_SOURCE_WORKERS", "4"))
+
+# Pemisah entri pada AKSARA_DATA_SOURCES (titik koma atau baris baru)
+SOURCE_LIST_SEPARATOR_RE = re.compile(r"[;\n]")
+SOURCE_NAME_RE = re.compile(r"[^0-9A-Za-z_-]+")
+
+# Lokasi bawaan untuk setiap sumber data
+DEFAULT_LOCATIONS = {
+    "graphdb": "https://81ac-180-244-161-63.ngrok-free.app/repositories/AksaraJawa",
+    "csv": "dataset/pupuh.csv",
+    "ttl": "RDF/pupuh.ttl",
+}
+
+
+def get_data_source_config():
+    """
+    Baca konfigurasi sumber data dari environment variable.
+
+    AKSARA_DATA_SOURCE memilih sumber ("graphdb", "csv" atau "ttl"), sedangkan
+    AKSARA_DATA_LOCATION dapat mengganti endpoint atau path file bawaan.
+    AKSARA_GRAPHDB_PAGE_SIZE mengatur jumlah baris per halaman query GraphDB.
+
+    AKSARA_DATA_SOURCES (jika diisi) menggabungkan beberapa naskah menjadi satu
+    korpus, misalnya "pupuh=csv:dataset/pupuh.csv;serat=graphdb:http://host/repositories/Serat";
+    lihat parse_source_list.
+    """
+    source_list = os.environ.get("AKSARA_DATA_SOURCES", "").strip()
+    if source_list:
+        parse_source_list(source_list) # Validasi lebih awal
+        return {"source": "multi", "location": source_list}
+
+    source = os.environ.get("AKSARA_DATA_SOURCE", "graphdb").strip().lower()
+    if source not in SINGLE_SOURCES:
+        raise ValueError(
+            f"Sumber data '{source}' tidak dikenal. Pilihan: {', '.join(SINGLE_SOURCES)}"
+        )
+    location = os.environ.get("AKSARA_DATA_LOCATION") or DEFAULT_LOCATIONS[source]
+    return {"source": source, "location": location}
+
+
+def resolve_local_path(location):
+    path = Path(location)
+    if not path.is_absolute():
+        path = BASE_DIR / path
+    return path
+
+
+def bindings_to_dataframe(rows):
+    """Ubah baris hasil SPARQL (dict nama variabel -> nilai) menjadi DataFrame korpus"""
+    data = []
+    for row in rows:
+        data.append({column: row.get(column) for column in CORPUS_COLUMNS})
+    return pd.DataFrame(data, columns=CORPUS_COLUMNS)
+
+
+class PagedLoadError(Exception):
+    """
+    Satu halaman gagal dimuat setelah semua percobaan ulang.
+
+    Atribut state menyimpan offset dan buffer kolom yang sudah terisi, sehingga
+    pemanggil dapat melanjutkan pemuatan lewat parameter resume_state.
+    """
+
+    def __init__(self, message, state):
+        super().__init__(message)
+        self.state = state
+
+
+def count_graphdb_rows(sparql):
+    """Hitung jumlah baris hasil query korpus (untuk progres); None jika gagal"""
+    try:
+        sparql.setQuery(CORPUS_COUNT_QUERY)
+        bindings = sparql.query().convert()["results"]["bindings"]
+        return int(bindings[0]["total"]["value"])
+    except Exception:
+        return None
+
+
+def fetch_graphdb_page(sparql, offset, page_size, max_retries):
+    """Ambil satu halaman binding SPARQL, dengan percobaan ulang dan backoff eksponensial"""
+    sparql.setQuery(f"{CORPUS_QUERY}{CORPUS_PAGE_ORDER}\nLIMIT {page_size}\nOFFSET {offset}")
+    for attempt in range(max_retries + 1):
+        try:
+            return sparql.query().convert()["results"]["bindings"]
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(GRAPHDB_RETRY_DELAY * 2 ** attempt)
+
+
+@timed("load_data_from_graphdb")
+def load_data_from_graphdb(endpoint, progress_callback=None, page_size=GRAPHDB_PAGE_SIZE,
+                           max_retries=GRAPHDB_MAX_RETRIES, resume_state=None):
+    """
+    Ambil seluruh Paragraf dan Kata dari endpoint SPARQL GraphDB secara bertahap.
+
+    Query dijalankan per halaman (LIMIT/OFFSET) dan setiap halaman langsung
+    dipindahkan ke buffer kolom, sehingga hanya satu halaman JSON yang ada di
+    memori pada satu waktu. progress_callback(loaded_rows, total_rows) dipanggil
+    setelah setiap halaman; total_rows bernilai None jika tidak dapat dihitung.
+    """
+    sparql = SPARQLWrapper(endpoint)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(GRAPHDB_TIMEOUT)
+
+    total_rows = count_graphdb_rows(sparql)
+    state = resume_state or {"offset": 0, "columns": {column: [] for column in CORPUS_COLUMNS}}
+    columns = state["columns"]
+
+    while True:
+        try:
+            with timed_span("graphdb_fetch_page"):
+                bindings = fetch_graphdb_page(sparql, state["offset"], page_size, max_retries)
+        except Exception as e:
+            raise PagedLoadError(
+                f"Gagal memuat halaman pada offset {state['offset']}: {e}", state
+            ) from e
+
+        for binding in bindings:
+            for column in CORPUS_COLUMNS:
+                value = binding.get(column)
+                columns[column].append(value["value"] if value is not None else None)
+        state["offset"] += len(bindings)
+
+        if progress_callback is not None:
+            progress_callback(state["offset"], total_rows)
+        # Halaman tidak penuh berarti data habis, kecuali server membatasi ukuran hasil
+        reached_total = total_rows is None or state["offset"] >= total_rows
+        if not bindings or (len(bindings) < page_size and reached_total):
+            break
+
+    with timed_span("graphdb_build_dataframe"):
+        return sort_corpus_rows(pd.DataFrame(columns, columns=CORPUS_COLUMNS))
+
+
+def load_data_from_csv(path, progress_callback=None):
+    """Muat korpus dari dataset CSV lokal (dataset/pupuh.csv)"""
+    raw = pd.read_csv(resolve_local_path(path), dtype=str, keep_default_na=False)
+
+    df = pd.DataFrame({
+        "s": PUPUH_NAMESPACE + raw["id"],
+        "type": raw["type"],
+        "isiLatin": raw["isiLatin"],
+        "isiAksaraJawa": raw["isiAksaraJawa"],
+        "arti": raw["arti"],
+        # Samakan dengan hasil STRAFTER pada query SPARQL ("ex:Paragraf_1" -> "Paragraf_1")
+        "munculDalamParagraf": raw["munculDalamParagraf"].str.replace(r"^ex:", "", regex=True),
+    }, columns=CORPUS_COLUMNS)
+    df = df.replace("", None)
+
+    if progress_callback is not None:
+        progress_callback(len(df), len(df))
+    return df
+
+
+def load_data_from_ttl(path, progress_callback=None):
+    """Muat korpus dari file Turtle lokal dengan menjalankan query SPARQL yang sama via rdflib"""
+    try:
+        from rdflib import Graph
+    except ImportError as e:
+        raise ImportError("Sumber data 'ttl' membutuhkan rdflib: pip install rdflib") from e
+
+    graph = Graph()
+    graph.parse(resolve_local_path(path), format="turtle")
+
+    rows = (
+        {name: str(value) for name, value in result.asdict().items()}
+        for result in graph.query(CORPUS_QUERY)
+    )
+    df = bindings_to_dataframe(rows)
+
+    if progress_callback is not None:
+        progress_callback(len(df), len(df))
+    return df
+
+
+def default_source_name(source, location):
+    """Nama naskah bawaan: nama repository GraphDB atau nama file tanpa ekstensi"""
+    if source == "graphdb":
+        name = location.rstrip("/").split("/")[-1]
+    else:
+        name = Path(location).stem
+    return SOURCE_NAME_RE.sub("_", name) or source
+
+
+def parse_source_list(text):
+    """
+    Urai daftar sumber "nama=jenis:lokasi" (nama boleh dihilangkan) yang dipisahkan
+    titik koma atau baris baru. Mengembalikan list dict {name, source, location}.
+    """
+    sources = []
+    for entry in SOURCE_LIST_SEPARATOR_RE.split(text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        # "nama=" hanya dikenali jika sebelum "=" tidak ada ":" (URL boleh berisi "=")
+        head, has_name, spec = entry.partition("=")
+        if has_name and ":" not in head:
+            name = head.strip()
+        else:
+            name, spec = None, entry
+        source, _, location = spec.partition(":")
+        source = source.strip().lower()
+        if source not in SINGLE_SOURCES:
+            raise ValueError(f"Sumber data '{source}' tidak dikenal pada '{entry}'. Pilihan: {', '.join(SINGLE_SOURCES)}")
+        location = location.strip() or DEFAULT_LOCATIONS[source]
+        name = name or default_source_name(source, location)
+        if any(existing["name"] == name for existing in sources):
+            raise ValueError(f"Nama sumber '{name}' dipakai lebih dari sekali")
+        sources.append({"name": name, "source": source, "location": location})
+    if not sources:
+        raise ValueError("AKSARA_DATA_SOURCES tidak berisi sumber data")
+    return sources
+
+
+def load_data_from_sources(source_list, progress_callback=None, resume_state=None,
+                           max_workers=MULTI_SOURCE_WORKERS):
+    """
+    Muat beberapa sumber sekaligus di thread pool lalu gabungkan menjadi satu korpus
+    dengan kolom sumber (nama naskah) untuk setiap baris.
+
+    Progres gabungan semua sumber dilaporkan dari thread pemanggil. Jika ada sumber
+    yang gagal, PagedLoadError membawa DataFrame sumber yang sudah berhasil dan state
+    halaman sumber GraphDB yang gagal, sehingga resume_state hanya memuat ulang sisanya.
+    """
+    sources = parse_source_list(source_list)
+    state = resume_state or {"offset": 0, "frames": {}, "source_states": {}}
+    frames = state["frames"]
+    progress = {source["name"]: (len(frames[source["name"]]), len(frames[source["name"]]))
+                for source in sources if source["name"] in frames}
+
+    def load_one(source):
+        def report(loaded_rows, total_rows):
+            progress[source["name"]] = (loaded_rows, total_rows)
+        options = {"progress_callback": report}
+        if source["name"] in state["source_states"]:
+            options["resume_state"] = state["source_states"].pop(source["name"])
+        return DATA_SOURCES[source["source"]](source["location"], **options)
+
+    def report_progress():
+        if progress_callback is None:
+            return
+        loaded_rows = sum(loaded for loaded, _ in progress.values())
+        totals = [total for _, total in progress.values()]
+        known_total = len(totals) == len(sources) and all(total is not None for total in totals)
+        progress_callback(loaded_rows, sum(totals) if known_total else None)
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(load_one, source): source
+            for source in sources if source["name"] not in frames
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.25)
+            for future in done:
+                source = futures[future]
+                try:
+                    frames[source["name"]] = future.result()
+                except PagedLoadError as e:
+                    state["source_states"][source["name"]] = e.state
+                    errors.append(f"{source['name']}: {e}")
+                except Exception as e:
+                    errors.append(f"{source['name']}: {e}")
+            report_progress()
+
+    state["offset"] = sum(len(frame) for frame in frames.values())
+    if errors:
+        raise PagedLoadError("Gagal memuat sebagian sumber: " + "; ".join(errors), state)
+
+    # Urutan baris mengikuti urutan sumber pada konfigurasi
+    tagged = [frames[source["name"]].assign(**{SOURCE_TAG_COLUMN: source["name"]}) for source in sources]
+    return pd.concat(tagged, ignore_index=True)
+
+
+def fingerprint_graphdb(endpoint):
+    """Fingerprint murah untuk repository GraphDB: jumlah triple dan jumlah baris korpus"""
+    sparql = SPARQLWrapper(endpoint)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(GRAPHDB_TIMEOUT)
+    sparql.setQuery("SELECT (COUNT(*) AS ?triples) WHERE { ?s ?p ?o }")
+    triples = sparql.query().convert()["results"]["bindings"][0]["triples"]["value"]
+    rows = count_graphdb_rows(sparql)
+    return f"triples={triples};rows={rows}"
+
+
+def fingerprint_local_file(path):
+    """Fingerprint file lokal dari ukuran dan waktu modifikasi"""
+    stat = resolve_local_path(path).stat()
+    return f"size={stat.st_size};mtime={stat.st_mtime_ns}"
+
+
+def fingerprint_sources(source_list):
+    """
+    Fingerprint korpus gabungan dari fingerprint setiap sumber. Seperti fingerprint
+    sumber lain, error dari salah satu sumber diteruskan; get_source_fingerprint
+    yang mengubahnya menjadi None.
+    """
+    fingerprints = []
+    for source in parse_source_list(source_list):
+        fingerprint = SOURCE_FINGERPRINTS[source["source"]](source["location"])
+        fingerprints.append(f"{source['name']}[{fingerprint}]")
+    return "|".join(fingerprints)
+
+
+# Sumber data tunggal yang dapat digabungkan lewat AKSARA_DATA_SOURCES
+SINGLE_SOURCES = ("graphdb", "csv", "ttl")
+
+# Registry sumber data: nama -> fungsi loader(location, progress_callback=None, ...)
+DATA_SOURCES = {
+    "graphdb": load_data_from_graphdb,
+    "csv": load_data_from_csv,
+    "ttl": load_data_from_ttl,
+    "multi": load_data_from_sources,
+}
+
+
+# Registry fingerprint sumber data, dipakai untuk mengecek kesegaran snapshot
+SOURCE_FINGERPRINTS = {
+    "graphdb": fingerprint_graphdb,
+    "csv": fingerprint_local_file,
+    "ttl": fingerprint_local_file,
+    "multi": fingerprint_sources,
+}
+
+
+def get_source_fingerprint(source, location):
+    """Fingerprint sumber data saat ini; None jika sumber tidak dapat dihubungi"""
+    try:
+        return SOURCE_FINGERPRINTS[source](location)
+    except Exception:
+        return None
+
+
+def compact_corpus(df):
+    """
+    Representasi hemat memori DataFrame korpus: kolom berulang menjadi kategori dan
+    kolom teks menjadi string Arrow. Label baris (id baris integer) tidak berubah.
+    """
+    columns = {}
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            columns[column] = df[column].astype("category")
+        elif column in TEXT_COLUMNS and df[column].dtype != TEXT_DTYPE:
+            columns[column] = df[column].astype(TEXT_DTYPE)
+    if not columns:
+        return df
+    compact = df.assign(**columns)
+    compact.attrs = dict(df.attrs)
+    return compact
+
+
+def load_corpus(source, location, **options):
+    """Muat DataFrame korpus dari sumber data yang dipilih"""
+    df = DATA_SOURCES[source](location, **options)
+    with timed_span("compact_corpus"):
+        return compact_corpus(df)
+
+
+def describe_data_source(config):
+    """Label singkat sumber data untuk ditampilkan di UI"""
+    if config["source"] == "multi":
+        names = [source["name"] for source in parse_source_list(config["location"])]
+        return f"{len(names)} naskah ({', '.join(names)})"
+    if config["source"] == "graphdb":
+        repository = config["location"].rstrip("/").split("/")[-1]
+        return f"GraphDB Repository '{repository}'"
+    return f"File lokal {config['source'].upper()} ({config['location']})"
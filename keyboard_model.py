@@ -0,0 +1,67 @@
+from collections import Counter
+
+from search_index import is_javanese_char
+
+# Kategori tombol keyboard aksara Jawa: (kunci, label, jumlah tombol per baris)
+KEYBOARD_CATEGORIES = [
+    ("consonants", "Aksara Dasar", 10),
+    ("vowel_marks", "Sandhangan Vokal", 5),
+    ("punctuation", "Tanda Baca & Simbol", 5),
+    ("others", "Karakter Lainnya", 8),
+]
+
+
+def categorize_javanese_char(char):
+    """Kategori keyboard satu karakter menurut rentang Unicode blok aksara Jawa"""
+    char_code = ord(char)
+    # Aksara dasar (Ha, Na, Ca, Ra, Ka, dst)
+    if 0xA980 <= char_code <= 0xA9B2:
+        return "consonants"
+    # Sandhangan vokal (wulu, suku, taling, dst)
+    if 0xA9B3 <= char_code <= 0xA9C0:
+        return "vowel_marks"
+    # Tanda baca dan simbol
+    if char_code >= 0xA9C1:
+        return "punctuation"
+    return "others"
+
+
+def count_chars(texts):
+    """Jumlah kemunculan setiap karakter aksara Jawa dalam texts"""
+    counts = Counter()
+    for text in texts:
+        if isinstance(text, str):
+            counts.update(char for char in text if is_javanese_char(char))
+    return counts
+
+
+def update_char_counts(counts, removed_texts, added_texts):
+    """Jumlah karakter setelah teks lama dikurangi dan teks baru ditambahkan; counts tidak diubah"""
+    updated = Counter(counts)
+    updated.subtract(count_chars(removed_texts))
+    updated.update(count_chars(added_texts))
+    return +updated # Buang karakter yang tidak muncul lagi
+
+
+def build_keyboard_model(javanese_chars, counts):
+    """
+    Model keyboard yang dihitung sekali per versi korpus: karakter inventaris dibagi
+    per kategori (urut kode Unicode) beserta jumlah kemunculannya (counts, lihat count_chars).
+
+    Mengembalikan {"categories": [{key, label, chars_per_row, keys: [{char, code, count}]}],
+    "total_chars": jumlah karakter unik}. Kategori kosong tidak disertakan.
+    """
+    keys_by_category = {key: [] for key, _, _ in KEYBOARD_CATEGORIES}
+    for char in javanese_chars:
+        keys_by_category[categorize_javanese_char(char)].append({
+            "char": char,
+            "code": f"U+{ord(char):04X}",
+            "count": counts.get(char, 0),
+        })
+
+    categories = [
+        {"key": key, "label": label, "chars_per_row": chars_per_row, "keys": keys_by_category[key]}
+        for key, label, chars_per_row in KEYBOARD_CATEGORIES
+        if keys_by_category[key]
+    ]
+    return {"categories": categories, "total_chars": sum(len(category["keys"]) for category in categories)}
@@ -0,0 +1,217 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Batas atas bucket histogram latensi (detik), seperti histogram Prometheus
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Jumlah query terakhir dan hasil profiling terakhir yang disimpan untuk panel debug
+RECENT_QUERY_LIMIT = int(os.environ.get("AKSARA_RECENT_QUERY_LIMIT", "50"))
+RECENT_PROFILE_LIMIT = 5
+
+# Profiling per query (opt-in): kosong (nonaktif), "cprofile" atau "pyinstrument"
+PROFILE_MODES = ("cprofile", "pyinstrument")
+PROFILE_MODE = os.environ.get("AKSARA_PROFILE", "").strip().lower() or None
+PROFILE_TOP_FUNCTIONS = 25
+# Hanya satu profiler yang boleh aktif dalam satu proses; query yang diprofil dijalankan bergantian
+PROFILE_LOCK = threading.Lock()
+
+METRIC_PREFIX = "aksara"
+
+
+def new_metrics(recent_limit=RECENT_QUERY_LIMIT):
+    """Registry metrik: histogram durasi per span, query terakhir dan hasil profiling terakhir"""
+    return {
+        "spans": {}, # nama span -> {"count", "sum", "max", "buckets"}
+        "recent_queries": deque(maxlen=recent_limit),
+        "profiles": deque(maxlen=RECENT_PROFILE_LIMIT),
+        "lock": threading.Lock(),
+    }
+
+
+# Registry bersama untuk seluruh proses (Streamlit, API dan loader data)
+METRICS = new_metrics()
+
+
+def record_span(name, seconds, metrics=None):
+    """Tambahkan satu durasi (detik) ke histogram span"""
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        span = metrics["spans"].get(name)
+        if span is None:
+            span = metrics["spans"][name] = {
+                "count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(LATENCY_BUCKETS)
+            }
+        span["count"] += 1
+        span["sum"] += seconds
+        span["max"] = max(span["max"], seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                span["buckets"][i] += 1
+                break
+
+
+@contextmanager
+def timed_span(name, metrics=None):
+    """Ukur durasi blok kode sebagai span; tetap dicatat jika blok melempar error"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start, metrics)
+
+
+def timed(name):
+    """Dekorator: setiap pemanggilan fungsi dicatat sebagai span bernama name"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_query(query, search_type, match_mode, elapsed, result_count, cached=False, metrics=None):
+    """Catat satu pencarian (durasi dalam detik) untuk daftar latensi query terakhir"""
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        metrics["recent_queries"].append({
+            "time": time.time(),
+            "query": query,
+            "search_type": search_type,
+            "match_mode": match_mode,
+            "elapsed_ms": elapsed * 1000,
+            "results": result_count,
+            "cached": cached,
+        })
+
+
+def recent_queries(metrics=None):
+    """Query terakhir, dari yang paling baru"""
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        return list(reversed(metrics["recent_queries"]))
+
+
+def span_summary(metrics=None):
+    """Ringkasan per span: jumlah panggilan, total, rata-rata dan maksimum (ms)"""
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        return [
+            {
+                "span": name,
+                "count": span["count"],
+                "total_ms": span["sum"] * 1000,
+                "mean_ms": span["sum"] * 1000 / span["count"],
+                "max_ms": span["max"] * 1000,
+            }
+            for name, span in sorted(metrics["spans"].items())
+        ]
+
+
+def recent_profiles(metrics=None):
+    """Hasil profiling terakhir (label dan laporan teks), dari yang paling baru"""
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        return list(reversed(metrics["profiles"]))
+
+
+def start_profiler(mode):
+    """Mulai profiler; mengembalikan fungsi yang menghentikannya dan mengembalikan laporan teks"""
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("Profiling 'pyinstrument' membutuhkan pyinstrument: pip install pyinstrument") from e
+        # async_mode dimatikan: query dijalankan di thread pool API, bukan di event loop
+        profiler = Profiler(async_mode="disabled")
+        profiler.start()
+
+        def stop():
+            profiler.stop()
+            return profiler.output_text(unicode=True)
+        return stop
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def stop():
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return output.getvalue()
+    return stop
+
+
+@contextmanager
+def profile_query(label, mode=PROFILE_MODE, metrics=None):
+    """
+    Profil satu query dengan cProfile atau pyinstrument jika mode diaktifkan
+    (AKSARA_PROFILE); laporan teksnya disimpan di registry. Tanpa mode, blok
+    dijalankan apa adanya tanpa overhead.
+    """
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Mode profiling tidak dikenal: {mode} (pilihan: {', '.join(PROFILE_MODES)})")
+
+    with PROFILE_LOCK:
+        stop = start_profiler(mode)
+        try:
+            yield
+        finally:
+            report = stop()
+
+    metrics = metrics if metrics is not None else METRICS
+    with metrics["lock"]:
+        metrics["profiles"].append({"time": time.time(), "label": label, "mode": mode, "report": report})
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus(gauges=None, metrics=None):
+    """
+    Metrik dalam format teks eksposisi Prometheus: histogram durasi setiap span
+    dan gauge tambahan (misalnya ukuran cache). gauges berisi
+    (nama, bantuan, [(label dict, nilai), ...]).
+    """
+    metrics = metrics if metrics is not None else METRICS
+    name = f"{METRIC_PREFIX}_span_duration_seconds"
+    lines = [
+        f"# HELP {name} Durasi tahap pencarian dan pemuatan data",
+        f"# TYPE {name} histogram",
+    ]
+    with metrics["lock"]:
+        spans = {span_name: dict(span, buckets=list(span["buckets"])) for span_name, span in metrics["spans"].items()}
+    for span_name, span in sorted(spans.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, span["buckets"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels({'span': span_name, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_bucket{format_labels({'span': span_name, 'le': '+Inf'})} {span['count']}")
+        lines.append(f"{name}_sum{format_labels({'span': span_name})} {span['sum']}")
+        lines.append(f"{name}_count{format_labels({'span': span_name})} {span['count']}")
+
+    for gauge_name, help_text, samples in gauges or ():
+        full_name = f"{METRIC_PREFIX}_{gauge_name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} gauge")
+        for labels, value in samples:
+            lines.append(f"{full_name}{format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Jumlah maksimum hasil pencarian yang disimpan dan umur maksimumnya (detik)
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("AKSARA_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_TTL = float(os.environ.get("AKSARA_QUERY_CACHE_TTL_SECONDS", "600"))
+
+
+def new_query_cache(max_entries=QUERY_CACHE_MAX_ENTRIES, ttl=QUERY_CACHE_TTL):
+    """Cache LRU dengan TTL untuk hasil pencarian yang sudah dikelompokkan"""
+    return {
+        "entries": OrderedDict(), # kunci -> (waktu disimpan, hasil), urut dari yang paling lama dipakai
+        "max_entries": max_entries,
+        "ttl": ttl,
+        "corpus_version": None,
+        "hits": 0,
+        "misses": 0,
+        "lock": threading.Lock(),
+    }
+
+
+def make_query_key(query, search_type, match_mode="word", cross_script=False, sources=None):
+    """Kunci cache: query dinormalisasi, jenis pencarian, mode pencocokan, pencarian lintas aksara dan naskah"""
+    # Hanya spasi di awal/akhir yang dibuang, sama seperti search_text; huruf besar/kecil
+    # tetap dibedakan karena query asli dipakai pada label grup dan highlight
+    return (query.strip(), search_type, match_mode, cross_script, tuple(sorted(sources)) if sources is not None else None)
+
+
+def query_cache_get(cache, key, corpus_version):
+    """Ambil hasil dari cache; None jika tidak ada, kedaluwarsa, atau korpus sudah berubah"""
+    with cache["lock"]:
+        if cache["corpus_version"] != corpus_version:
+            # Korpus dimuat ulang atau disinkronkan: semua hasil lama tidak berlaku
+            cache["entries"].clear()
+            cache["corpus_version"] = corpus_version
+
+        entry = cache["entries"].get(key)
+        if entry is not None and time.time() - entry[0] >= cache["ttl"]:
+            del cache["entries"][key]
+            entry = None
+
+        if entry is None:
+            cache["misses"] += 1
+            return None
+
+        cache["entries"].move_to_end(key)
+        cache["hits"] += 1
+        return entry[1]
+
+
+def query_cache_put(cache, key, corpus_version, value):
+    """Simpan hasil ke cache dan buang entri yang paling lama tidak dipakai jika penuh"""
+    with cache["lock"]:
+        if cache["corpus_version"] != corpus_version:
+            return
+        cache["entries"][key] = (time.time(), value)
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > cache["max_entries"]:
+            cache["entries"].popitem(last=False)
+
+
+def query_cache_stats(cache):
+    with cache["lock"]:
+        lookups = cache["hits"] + cache["misses"]
+        return {
+            "hits": cache["hits"],
+            "misses": cache["misses"],
+            "entries": len(cache["entries"]),
+            "hit_rate": cache["hits"] / lookups if lookups else 0.0,
+        }
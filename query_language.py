@@ -0,0 +1,236 @@
+import re
+
+from search_index import tokenize_field, find_phrase_positions
+from query_patterns import is_javanese_text
+from transliteration import transliterate_query
+
+# Awalan field pada kueri -> field indeks
+FIELD_PREFIXES = {'latin': 'latin', 'jawa': 'javanese', 'arti': 'translation'}
+
+# Jarak bawaan operator NEAR: paling banyak sekian kata di antara kedua bagian
+DEFAULT_NEAR_DISTANCE = 5
+
+QUERY_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<lparen>\()|(?P<rparen>\))'
+    r'|(?:(?P<field>' + '|'.join(FIELD_PREFIXES) + r'):)?(?:"(?P<phrase>[^"]*)"|(?P<word>[^\s()"]+))'
+    r'|(?P<quote>"))'
+)
+NEAR_RE = re.compile(r'NEAR(?:/(\d+))?')
+
+
+class QuerySyntaxError(ValueError):
+    """Kueri boolean tidak dapat diurai; pesannya ditampilkan ke pengguna"""
+
+
+def lex_boolean_query(query):
+    """Pecah kueri menjadi token (jenis, nilai, field)"""
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = QUERY_TOKEN_RE.match(query, position)
+        if match is None:
+            raise QuerySyntaxError(f"Karakter tidak dikenal pada posisi {position + 1}")
+        position = match.end()
+        if match.group('lparen'):
+            tokens.append(('(', None, None))
+        elif match.group('rparen'):
+            tokens.append((')', None, None))
+        elif match.group('quote'):
+            raise QuerySyntaxError("Tanda kutip frasa belum ditutup")
+        elif match.group('phrase') is not None:
+            tokens.append(('text', match.group('phrase'), FIELD_PREFIXES.get(match.group('field'))))
+        else:
+            word = match.group('word')
+            near = NEAR_RE.fullmatch(word)
+            if match.group('field') is None and word in ('AND', 'OR', 'NOT'):
+                tokens.append((word, None, None))
+            elif match.group('field') is None and near:
+                tokens.append(('NEAR', int(near.group(1) or DEFAULT_NEAR_DISTANCE), None))
+            else:
+                tokens.append(('text', word, FIELD_PREFIXES.get(match.group('field'))))
+    return tokens
+
+
+def parse_boolean_query(query):
+    """
+    Urai kueri boolean menjadi pohon tuple:
+    ('text', field, teks), ('and', [anak]), ('or', [anak]), ('not', anak),
+    ('near', kiri, kanan, jarak). Urutan prioritas: NOT, NEAR, AND (boleh
+    tanpa kata AND), lalu OR; tanda kurung mengelompokkan.
+    """
+    tokens = lex_boolean_query(query)
+    if not tokens:
+        raise QuerySyntaxError("Kueri kosong")
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        return token
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == 'OR':
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and():
+        children = [parse_not()]
+        while peek() in ('AND', 'NOT', 'text', '('):
+            if peek() == 'AND':
+                take()
+            children.append(parse_not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_not():
+        if peek() == 'NOT':
+            take()
+            return ('not', parse_not())
+        return parse_near()
+
+    def parse_near():
+        node = parse_primary()
+        while peek() == 'NEAR':
+            _, distance, _ = take()
+            right = parse_primary()
+            if node[0] != 'text' or right[0] != 'text':
+                raise QuerySyntaxError("NEAR hanya dapat dipakai di antara dua kata atau frasa")
+            node = ('near', node, right, distance)
+        return node
+
+    def parse_primary():
+        kind = peek()
+        if kind is None:
+            raise QuerySyntaxError("Kueri berakhir sebelum operator dilengkapi")
+        if kind == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise QuerySyntaxError("Tanda kurung belum ditutup")
+            take()
+            return node
+        if kind == 'text':
+            _, text, field = take()
+            return ('text', field, text)
+        raise QuerySyntaxError(f"Operator {kind} tidak diharapkan di sini")
+
+    tree = parse_or()
+    if position < len(tokens):
+        raise QuerySyntaxError(f"Token {tokens[position][1] or tokens[position][0]} tidak diharapkan di sini")
+    return tree
+
+
+def text_field_queries(field, text, search_type="all", transliteration_table=None):
+    """
+    Pasangan (field, teks) yang dicari untuk satu kata/frasa. Tanpa awalan field,
+    kolom mengikuti jenis pencarian dan aksara teks; teks ditransliterasi ke aksara
+    kolom jika tabel transliterasi diberikan.
+    """
+    if field is not None:
+        fields = [field]
+    else:
+        fields = [candidate for candidate in ('latin', 'translation', 'javanese') if search_type in ("all", candidate)]
+
+    text_is_javanese = is_javanese_text(text)
+    queries = []
+    for candidate in fields:
+        if (candidate == 'javanese') == text_is_javanese:
+            queries.append((candidate, text))
+        elif transliteration_table is not None:
+            transliterated = transliterate_query(transliteration_table, text)
+            if transliterated:
+                queries.append((candidate, transliterated))
+    return queries
+
+
+def near_match(left_starts, left_length, right_starts, right_length, distance):
+    """Apakah ada kemunculan kiri dan kanan dengan paling banyak distance kata di antaranya"""
+    for left in left_starts:
+        for right in right_starts:
+            if right >= left:
+                between = right - (left + left_length)
+            else:
+                between = left - (right + right_length)
+            if between <= distance:
+                return True
+    return False
+
+
+def execute_boolean_query(tree, positional_index, search_type="all", transliteration_table=None):
+    """
+    Jalankan pohon kueri pada indeks posisi. Mengembalikan (id baris yang cocok,
+    {field: token yang dicari secara positif}) untuk highlight dan peringkat.
+    """
+    field_terms = {}
+    universe = None
+
+    def all_rows():
+        nonlocal universe
+        if universe is None:
+            universe = set()
+            for postings in positional_index.values():
+                for token_postings in postings.values():
+                    universe.update(token_postings)
+        return universe
+
+    def text_positions(field, text, positive):
+        """{field: (jumlah token, {id baris: [posisi awal]})} untuk satu kata/frasa"""
+        matches = {}
+        for query_field, query_text in text_field_queries(field, text, search_type, transliteration_table):
+            tokens = tokenize_field(query_field, query_text)
+            if not tokens:
+                continue
+            matches[query_field] = (len(tokens), find_phrase_positions(positional_index[query_field], tokens))
+            if positive:
+                field_terms.setdefault(query_field, set()).update(tokens)
+        return matches
+
+    def evaluate(node, positive=True):
+        kind = node[0]
+        if kind == 'text':
+            rows = set()
+            for _, field_rows in text_positions(node[1], node[2], positive).values():
+                rows.update(field_rows)
+            return rows
+        if kind == 'near':
+            _, left, right, distance = node
+            left_matches = text_positions(left[1], left[2], positive)
+            right_matches = text_positions(right[1], right[2], positive)
+            rows = set()
+            # Kedua bagian harus berdekatan di kolom yang sama
+            for field in left_matches.keys() & right_matches.keys():
+                left_length, left_rows = left_matches[field]
+                right_length, right_rows = right_matches[field]
+                for row_id in left_rows.keys() & right_rows.keys():
+                    if near_match(left_rows[row_id], left_length, right_rows[row_id], right_length, distance):
+                        rows.add(row_id)
+            return rows
+        if kind == 'not':
+            return all_rows() - evaluate(node[1], not positive)
+        if kind == 'or':
+            rows = set()
+            for child in node[1]:
+                rows |= evaluate(child, positive)
+            return rows
+
+        # AND: irisan anak positif dikurangi gabungan anak NOT, dimulai dari himpunan terkecil
+        included = [evaluate(child, positive) for child in node[1] if child[0] != 'not']
+        excluded = [evaluate(child[1], not positive) for child in node[1] if child[0] == 'not']
+        if included:
+            included.sort(key=len)
+            rows = set(included[0])
+            for child_rows in included[1:]:
+                rows &= child_rows
+        else:
+            rows = set(all_rows())
+        for child_rows in excluded:
+            rows -= child_rows
+        return rows
+
+    return evaluate(tree), field_terms
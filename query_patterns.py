@@ -0,0 +1,161 @@
+import re
+from functools import lru_cache
+
+from search_index import LATIN_SEPARATORS, JAVANESE_SEPARATORS
+
+
+def is_javanese_text(text):
+    """Cek apakah teks berisi karakter aksara Jawa (Unicode range: U+A980-U+A9DF)"""
+    return any('\ua980' <= char <= '\ua9df' for char in text)
+
+
+# Mode pencocokan: kata utuh, awalan kata, substring di mana saja, mirip
+# (tanpa diakritik dan dengan toleransi salah ketik), atau kueri boolean
+# (AND/OR/NOT, frasa, awalan field dan NEAR, lihat query_language.py)
+MATCH_MODES = ("word", "prefix", "substring", "fuzzy", "boolean")
+
+
+# Pemisah kata Latin atau aksara Jawa, untuk highlight query lintas aksara
+CROSS_SCRIPT_SEPARATORS = f'(?:{LATIN_SEPARATORS}|{JAVANESE_SEPARATORS})'
+
+
+def split_cross_script_query(query, cross_query):
+    """Pasangan (bentuk Latin, bentuk aksara Jawa) dari query dan transliterasinya"""
+    if cross_query is None:
+        return query, query
+    if is_javanese_text(query):
+        return cross_query, query
+    return query, cross_query
+
+
+# Kompilasi semua pola regex untuk satu query sekaligus.
+# Hasilnya di-cache sehingga pencarian, pengelompokan, ekstraksi konteks dan
+# highlighting memakai objek pola yang sama untuk query yang sama.
+@lru_cache(maxsize=256)
+def compile_query(query, match_mode="word"):
+    """Bangun pola word boundary Latin dan aksara Jawa untuk sebuah query"""
+    lower_term = re.escape(query.lower())
+    raw_term = re.escape(query)
+
+    # Batas kiri dan kanan pola sesuai mode pencocokan
+    if match_mode == "substring":
+        latin_start, latin_end, javanese_start, javanese_end = '', '', '', ''
+    else:
+        latin_start = rf'(?:^|{LATIN_SEPARATORS})'
+        javanese_start = rf'(?:^|{JAVANESE_SEPARATORS})'
+        if match_mode == "prefix":
+            latin_end, javanese_end = '', ''
+        else:
+            latin_end = rf'(?={LATIN_SEPARATORS}|$)'
+            javanese_end = rf'(?={JAVANESE_SEPARATORS}|$)'
+    latin_word = rf'{latin_start}{lower_term}{latin_end}'
+    javanese_word = rf'{javanese_start}{raw_term}{javanese_end}'
+
+    is_javanese = is_javanese_text(query)
+    separators = JAVANESE_SEPARATORS if is_javanese else LATIN_SEPARATORS
+    # Grup 1 dan 3 (pemisah di kiri/kanan) selalu ada agar pola substitusi highlight sama
+    if match_mode == "substring":
+        highlight_pattern = rf'()({raw_term})()'
+    elif match_mode == "prefix":
+        highlight_pattern = rf'(?:^|({separators}))({raw_term})()'
+    else:
+        highlight_pattern = rf'(?:^|({separators}))({raw_term})(?=({separators})|$)'
+
+    if is_javanese:
+        # Untuk Aksara Jawa, gunakan word boundary aksara Jawa
+        highlight = re.compile(highlight_pattern)
+    else:
+        # Untuk Latin/Terjemahan, gunakan word boundary yang ketat
+        highlight = re.compile(highlight_pattern, re.IGNORECASE)
+
+    return {
+        'query': query,
+        'match_mode': match_mode,
+        'is_javanese': is_javanese,
+        # Bentuk query yang dicari pada kolom Latin dan kolom aksara Jawa
+        'cross_script': False,
+        'latin_query': query,
+        'javanese_query': query,
+        # Untuk teks yang sudah di-lower (pengelompokan dan ekstraksi konteks)
+        'latin': re.compile(latin_word),
+        # Untuk kolom DataFrame mentah (setara dengan str.contains case=False)
+        'latin_ignorecase': re.compile(latin_word, re.IGNORECASE),
+        'javanese': re.compile(javanese_word),
+        'highlight': highlight,
+    }
+
+
+# Pola untuk mode mirip: kata utuh yang sama dengan salah satu token kosakata yang
+# cocok, sehingga pengelompokan, konteks dan highlight menandai kata yang ditemukan
+@lru_cache(maxsize=256)
+def compile_terms_query(query, terms, cross_query=None):
+    """Bangun pola kata utuh untuk sekumpulan token (tuple) hasil pencarian mirip"""
+    if terms:
+        # Token terpanjang didahulukan agar alternasi tidak berhenti di token yang lebih pendek
+        alternation = '|'.join(re.escape(term) for term in sorted(terms, key=lambda term: (-len(term), term)))
+    else:
+        alternation = '(?!)'
+    lower_term = f'(?:{alternation})'
+    latin_word = rf'(?:^|{LATIN_SEPARATORS}){lower_term}(?={LATIN_SEPARATORS}|$)'
+    javanese_word = rf'(?:^|{JAVANESE_SEPARATORS}){lower_term}(?={JAVANESE_SEPARATORS}|$)'
+
+    is_javanese = is_javanese_text(query)
+    mixed_scripts = len({is_javanese_text(term) for term in terms}) > 1
+    if cross_query is not None or mixed_scripts:
+        # Token yang cocok bisa berasal dari kedua aksara
+        separators = CROSS_SCRIPT_SEPARATORS
+    else:
+        separators = JAVANESE_SEPARATORS if is_javanese else LATIN_SEPARATORS
+    highlight = re.compile(
+        rf'(?:^|({separators}))({lower_term})(?=({separators})|$)',
+        0 if is_javanese and separators == JAVANESE_SEPARATORS else re.IGNORECASE
+    )
+    latin_query, javanese_query = split_cross_script_query(query, cross_query)
+
+    return {
+        'query': query,
+        'match_mode': 'fuzzy',
+        'is_javanese': is_javanese,
+        'cross_script': cross_query is not None,
+        'latin_query': latin_query,
+        'javanese_query': javanese_query,
+        'latin': re.compile(latin_word),
+        'latin_ignorecase': re.compile(latin_word, re.IGNORECASE),
+        'javanese': re.compile(javanese_word),
+        'highlight': highlight,
+    }
+
+
+# Pola untuk query lintas aksara: kolom Latin dicari dengan bentuk Latin query dan
+# kolom aksara Jawa dengan bentuk aksara Jawanya (hasil transliterasi)
+@lru_cache(maxsize=256)
+def compile_cross_script_query(query, cross_query, match_mode="word"):
+    """Gabungkan pola query dan transliterasinya menjadi satu set pola"""
+    latin_query, javanese_query = split_cross_script_query(query, cross_query)
+    latin = compile_query(latin_query, match_mode)
+    javanese = compile_query(javanese_query, match_mode)
+
+    # Highlight menandai kedua bentuk, dengan pemisah kata dari kedua aksara
+    alternation = '|'.join(
+        re.escape(term) for term in sorted({latin_query, javanese_query}, key=lambda term: (-len(term), term))
+    )
+    term = f'(?:{alternation})'
+    if match_mode == "substring":
+        highlight_pattern = rf'()({term})()'
+    elif match_mode == "prefix":
+        highlight_pattern = rf'(?:^|({CROSS_SCRIPT_SEPARATORS}))({term})()'
+    else:
+        highlight_pattern = rf'(?:^|({CROSS_SCRIPT_SEPARATORS}))({term})(?=({CROSS_SCRIPT_SEPARATORS})|$)'
+
+    return {
+        'query': query,
+        'match_mode': match_mode,
+        'is_javanese': is_javanese_text(query),
+        'cross_script': True,
+        'latin_query': latin_query,
+        'javanese_query': javanese_query,
+        'latin': latin['latin'],
+        'latin_ignorecase': latin['latin_ignorecase'],
+        'javanese': javanese['javanese'],
+        'highlight': re.compile(highlight_pattern, re.IGNORECASE),
+    }
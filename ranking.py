@@ -0,0 +1,157 @@
+import heapq
+import math
+import os
+
+import pandas as pd
+
+from search_index import INDEXED_FIELDS, tokenize_field, find_prefix_tokens, find_substring_tokens
+
+# Parameter BM25: saturasi frekuensi term (k1) dan normalisasi panjang teks (b)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Bobot skor setiap kolom, bisa diubah lewat AKSARA_FIELD_WEIGHTS="latin=1,javanese=1,translation=0.5"
+DEFAULT_FIELD_WEIGHTS = {'latin': 1.0, 'javanese': 1.0, 'translation': 0.5}
+
+# Jumlah maksimum grup Kata dan grup Paragraf yang dibentuk dan ditampilkan per pencarian
+RESULT_TOP_K = int(os.environ.get("AKSARA_RESULT_TOP_K", "50"))
+
+
+def parse_field_weights(text):
+    """Baca bobot kolom dari teks "field=bobot,..."; kolom yang tidak disebut memakai bobot bawaan"""
+    weights = dict(DEFAULT_FIELD_WEIGHTS)
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        field, _, weight = item.partition("=")
+        field = field.strip()
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Kolom tidak dikenal pada AKSARA_FIELD_WEIGHTS: {field}")
+        weights[field] = float(weight)
+    return weights
+
+
+FIELD_WEIGHTS = parse_field_weights(os.environ.get("AKSARA_FIELD_WEIGHTS"))
+
+
+def build_ranking_stats(df):
+    """Statistik korpus untuk BM25 per kolom: jumlah baris berteks, total dan rata-rata panjang (token)"""
+    return update_ranking_stats({}, df.iloc[:0], df)
+
+
+def text_lengths(field, texts):
+    """(jumlah teks, total panjang token) dari sekumpulan teks"""
+    lengths = [len(tokenize_field(field, text)) for text in texts if isinstance(text, str)]
+    return len(lengths), sum(lengths)
+
+
+def update_ranking_stats(stats, removed_rows, added_rows):
+    """
+    Statistik BM25 setelah baris lama dikeluarkan dan baris baru dimasukkan. Jumlah
+    baris dan total panjang bersifat aditif, sehingga cukup dihitung dari selisihnya.
+    """
+    updated = {}
+    for field, column in INDEXED_FIELDS.items():
+        doc_count = stats.get(field, {}).get('doc_count', 0)
+        total_length = stats.get(field, {}).get('total_length', 0)
+        for rows, sign in ((removed_rows, -1), (added_rows, 1)):
+            if column in rows.columns:
+                count, length = text_lengths(field, rows[column])
+                doc_count += sign * count
+                total_length += sign * length
+        updated[field] = {
+            'doc_count': doc_count,
+            'total_length': total_length,
+            'avg_length': total_length / doc_count if doc_count else 0.0,
+        }
+    return updated
+
+
+def token_matcher(token, match_mode):
+    """Fungsi pencocokan token baris dengan token query sesuai mode pencocokan"""
+    if match_mode == 'prefix':
+        return lambda row_token: row_token.startswith(token)
+    if match_mode == 'substring':
+        return lambda row_token: token in row_token
+    return lambda row_token: row_token == token
+
+
+def document_frequency(index, suffix_arrays, field, token, match_mode):
+    """Jumlah baris yang memuat token query (atau token yang cocok sebagian dengannya)"""
+    postings = index.get(field, {})
+    if match_mode == 'word':
+        return len(postings.get(token, ()))
+    if suffix_arrays is not None:
+        find_tokens = find_prefix_tokens if match_mode == 'prefix' else find_substring_tokens
+        vocabulary_tokens = find_tokens(suffix_arrays[field], token)
+    else:
+        matches = token_matcher(token, match_mode)
+        vocabulary_tokens = [vocabulary_token for vocabulary_token in postings if matches(vocabulary_token)]
+    rows = set()
+    for vocabulary_token in vocabulary_tokens:
+        rows.update(postings[vocabulary_token])
+    return len(rows)
+
+
+def bm25_scores(df, index, ranking_stats, field_queries, match_mode="word", suffix_arrays=None,
+                weights=None):
+    """
+    Skor BM25 setiap baris df: jumlah skor per kolom dikali bobot kolom.
+
+    field_queries memetakan field ('latin', 'translation', 'javanese') ke query yang
+    dicari pada kolom itu. Frekuensi term dan panjang teks dihitung dari token baris
+    hasil saja; IDF dari indeks terbalik.
+    """
+    weights = FIELD_WEIGHTS if weights is None else weights
+    scores = [0.0] * len(df)
+
+    for field, query in field_queries.items():
+        weight = weights.get(field, 0.0)
+        stats = ranking_stats.get(field)
+        column = INDEXED_FIELDS[field]
+        query_tokens = set(tokenize_field(field, query))
+        if not weight or not stats or not stats['doc_count'] or not query_tokens or column not in df.columns:
+            continue
+
+        doc_count = stats['doc_count']
+        avg_length = stats['avg_length'] or 1.0
+        terms = []
+        for token in query_tokens:
+            frequency = document_frequency(index, suffix_arrays, field, token, match_mode)
+            idf = math.log(1 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+            terms.append((token_matcher(token, match_mode), idf))
+
+        for position, text in enumerate(df[column]):
+            if not isinstance(text, str):
+                continue
+            row_tokens = tokenize_field(field, text)
+            if not row_tokens:
+                continue
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(row_tokens) / avg_length)
+            row_score = 0.0
+            for matches, idf in terms:
+                term_frequency = sum(1 for row_token in row_tokens if matches(row_token))
+                if term_frequency:
+                    row_score += idf * term_frequency * (BM25_K1 + 1) / (term_frequency + length_norm)
+            scores[position] += weight * row_score
+
+    return pd.Series(scores, index=df.index)
+
+
+def top_k_groups(group_scores, group_types, top_k=None):
+    """
+    Kunci grup terurut dari skor tertinggi, paling banyak top_k grup per jenis
+    (Kata, Paragraf). Dipilih dengan heap sehingga grup lain tidak perlu diurutkan.
+    """
+    ranked = []
+    by_type = {}
+    for group_key, score in group_scores.items():
+        by_type.setdefault(group_types[group_key], []).append((group_key, score))
+    for items in by_type.values():
+        # Skor sama diurutkan menurut kunci grup agar urutan hasil stabil
+        rank_key = lambda item: (-item[1], item[0])
+        if top_k is None:
+            ranked.extend(sorted(items, key=rank_key))
+        else:
+            ranked.extend(heapq.nsmallest(top_k, items, key=rank_key))
+    return [group_key for group_key, _ in ranked]
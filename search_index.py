@@ -0,0 +1,527 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+# Spasi Unicode (sama dengan \s pada modul re) ditulis sebagai karakter eksplisit.
+# pandas menjalankan pola tanpa lookahead dengan mesin regex pyarrow (RE2), yang
+# mengartikan \s sebagai spasi ASCII saja dan tidak mengenal escape \uXXXX
+WHITESPACE = ''.join(chr(code) for code in range(0x3001) if chr(code).isspace())
+
+# Kelas karakter pemisah kata, sama persis dengan yang dipakai regex pencarian di app.py
+LATIN_SEPARATORS = '[' + WHITESPACE + r'\-.,;:!?()[\]{}"\'/\\]'
+JAVANESE_SEPARATORS = '[' + WHITESPACE + '\u00A0\u2000-\u200F\u2028\u2029\uA9C1-\uA9CD\uA9CF-\uA9D9\uA9DE\uA9DF]'
+
+LATIN_SPLIT_RE = re.compile(f'{LATIN_SEPARATORS}+')
+JAVANESE_SPLIT_RE = re.compile(f'{JAVANESE_SEPARATORS}+')
+
+# Token = deretan karakter bukan pemisah (komplemen kelas pemisah di atas)
+LATIN_TOKEN_RE = re.compile('[^' + LATIN_SEPARATORS[1:] + '+')
+JAVANESE_TOKEN_RE = re.compile('[^' + JAVANESE_SEPARATORS[1:] + '+')
+
+# Field indeks -> kolom DataFrame yang diindeks
+INDEXED_FIELDS = {
+    'latin': 'isiLatin',
+    'translation': 'arti',
+    'javanese': 'isiAksaraJawa',
+}
+
+
+def tokenize_latin(text):
+    """Pecah teks Latin/terjemahan menjadi token huruf kecil"""
+    if not text:
+        return []
+    return [token for token in LATIN_SPLIT_RE.split(str(text).lower()) if token]
+
+
+def tokenize_javanese(text):
+    """Pecah teks aksara Jawa menjadi token berdasarkan pemisah aksara Jawa"""
+    if not text:
+        return []
+    return [token for token in JAVANESE_SPLIT_RE.split(str(text)) if token]
+
+
+def tokenize_field(field, text):
+    if field == 'javanese':
+        return tokenize_javanese(text)
+    return tokenize_latin(text)
+
+
+def token_spans(field, text):
+    """Posisi karakter (awal, akhir) setiap token teks, sejajar dengan tokenize_field"""
+    if not text:
+        return []
+    token_re = JAVANESE_TOKEN_RE if field == 'javanese' else LATIN_TOKEN_RE
+    return [match.span() for match in token_re.finditer(str(text))]
+
+
+def build_search_index(df):
+    """Bangun indeks terbalik token -> id baris untuk setiap field pencarian"""
+    index = {field: {} for field in INDEXED_FIELDS}
+    add_rows_to_index(index, df)
+    return index
+
+
+def copy_index(index):
+    """Salinan dangkal indeks: dict per field baru, posting list dipakai bersama"""
+    return {field: dict(postings) for field, postings in index.items()}
+
+
+def group_rows_by_token(field, row_ids, texts):
+    """token -> set id baris yang teksnya mengandung token itu"""
+    token_rows = {}
+    for row_id, text in zip(row_ids, texts):
+        if not isinstance(text, str):
+            continue
+        for token in set(tokenize_field(field, text)):
+            token_rows.setdefault(token, set()).add(row_id)
+    return token_rows
+
+
+def add_rows_to_index(index, df):
+    """
+    Tambahkan baris DataFrame ke indeks (id baris = label index DataFrame).
+    Posting list yang berubah diganti set baru (copy-on-write), sehingga indeks
+    lama yang disalin dengan copy_index tetap utuh bagi pencarian yang sedang berjalan.
+    Mengembalikan token baru di kosakata: {field: set(token)}.
+    """
+    new_tokens = {field: set() for field in INDEXED_FIELDS}
+    if df.empty:
+        return new_tokens
+
+    for field, column in INDEXED_FIELDS.items():
+        if column not in df.columns:
+            continue
+        postings = index[field]
+        for token, row_ids in group_rows_by_token(field, df.index, df[column]).items():
+            token_rows = postings.get(token)
+            if token_rows is None:
+                postings[token] = row_ids
+                new_tokens[field].add(token)
+            else:
+                postings[token] = token_rows | row_ids
+    return new_tokens
+
+
+def remove_rows_from_index(index, df):
+    """
+    Hapus baris DataFrame (dengan teks lamanya) dari indeks, copy-on-write seperti
+    add_rows_to_index. Mengembalikan token yang hilang dari kosakata: {field: set(token)}.
+    """
+    removed_tokens = {field: set() for field in INDEXED_FIELDS}
+    if df.empty:
+        return removed_tokens
+
+    for field, column in INDEXED_FIELDS.items():
+        if column not in df.columns:
+            continue
+        postings = index[field]
+        for token, row_ids in group_rows_by_token(field, df.index, df[column]).items():
+            token_rows = postings.get(token)
+            if token_rows is None:
+                continue
+            token_rows = token_rows - row_ids
+            if token_rows:
+                postings[token] = token_rows
+            else:
+                del postings[token]
+                removed_tokens[field].add(token)
+    return removed_tokens
+
+
+def lookup_candidates(index, field, query):
+    """
+    Cari id baris kandidat untuk query pada satu field.
+
+    Mengembalikan (row_ids, exact). Jika exact True, row_ids sudah sama dengan hasil
+    pencocokan kata utuh; jika False, row_ids hanya kandidat yang masih harus dicek
+    dengan regex (misalnya query berupa frasa). Mengembalikan (None, False) jika query
+    tidak bisa dijawab dari indeks sama sekali.
+    """
+    postings = index.get(field, {})
+    tokens = tokenize_field(field, query)
+    if not tokens:
+        return None, False
+
+    normalized_query = query if field == 'javanese' else query.lower()
+    if len(tokens) == 1 and tokens[0] == normalized_query:
+        # Query satu kata tanpa pemisah: cocok persis dengan satu token di indeks
+        return set(postings.get(tokens[0], ())), True
+
+    # Frasa: baris kandidat harus mengandung semua token penyusunnya
+    row_ids = None
+    for token in set(tokens):
+        token_rows = postings.get(token, set())
+        row_ids = set(token_rows) if row_ids is None else row_ids & token_rows
+        if not row_ids:
+            break
+    return row_ids, False
+
+
+def build_suffix_arrays(index):
+    """
+    Bangun suffix array atas kosakata (token unik) setiap field indeks.
+
+    Untuk setiap field disimpan daftar token terurut (untuk pencarian awalan) dan
+    daftar pasangan (posisi token, offset) yang diurutkan menurut sufiksnya (untuk
+    pencarian substring), sehingga keduanya cukup dicari dengan bisect.
+    """
+    suffix_arrays = {}
+    for field in INDEXED_FIELDS:
+        tokens = sorted(index.get(field, {}))
+        suffixes = [(i, start) for i, token in enumerate(tokens) for start in range(len(token))]
+        suffixes.sort(key=lambda entry: tokens[entry[0]][entry[1]:])
+        suffix_arrays[field] = {'tokens': tokens, 'suffixes': suffixes}
+    return suffix_arrays
+
+
+def find_prefix_tokens(suffix_array, prefix):
+    """Token kosakata yang diawali prefix"""
+    tokens = suffix_array['tokens']
+    matched = []
+    for i in range(bisect_left(tokens, prefix), len(tokens)):
+        if not tokens[i].startswith(prefix):
+            break
+        matched.append(tokens[i])
+    return matched
+
+
+def find_substring_tokens(suffix_array, fragment):
+    """Token kosakata yang mengandung fragment, lewat sufiks yang diawali fragment"""
+    tokens = suffix_array['tokens']
+    suffixes = suffix_array['suffixes']
+    # Binary search sufiks pertama yang >= fragment (bisect dengan key butuh Python 3.10)
+    start, end = 0, len(suffixes)
+    while start < end:
+        middle = (start + end) // 2
+        token_position, offset = suffixes[middle]
+        if tokens[token_position][offset:] < fragment:
+            start = middle + 1
+        else:
+            end = middle
+    matched = set()
+    for i in range(start, len(suffixes)):
+        token_position, offset = suffixes[i]
+        if not tokens[token_position].startswith(fragment, offset):
+            break
+        matched.add(tokens[token_position])
+    return matched
+
+
+def lookup_partial_candidates(index, suffix_arrays, field, query, match_mode):
+    """
+    Seperti lookup_candidates, untuk mode pencarian awalan ('prefix') atau
+    substring ('substring'). Query satu kata dijawab langsung dari suffix array
+    (exact True); query yang mengandung pemisah menghasilkan kandidat yang masih
+    harus diverifikasi dengan regex.
+    """
+    postings = index.get(field, {})
+    tokens = tokenize_field(field, query)
+    if not tokens:
+        return None, False
+
+    find_tokens = find_prefix_tokens if match_mode == 'prefix' else find_substring_tokens
+    normalized_query = query if field == 'javanese' else query.lower()
+    exact = len(tokens) == 1 and tokens[0] == normalized_query
+
+    # Setiap bagian query harus cocok sebagian dengan salah satu token baris
+    row_ids = None
+    for token in set(tokens):
+        token_rows = set()
+        for vocabulary_token in find_tokens(suffix_arrays[field], token):
+            token_rows.update(postings[vocabulary_token])
+        row_ids = token_rows if row_ids is None else row_ids & token_rows
+        if not row_ids:
+            break
+    return row_ids, exact
+
+
+def suggest_completions(index, suffix_arrays, fields, prefix, limit=8):
+    """
+    Usulan kata untuk prefix, diurutkan dari yang paling banyak muncul (jumlah baris)
+    di field yang diberikan. Dipakai untuk saran saat mengetik.
+    """
+    counts = {}
+    for field in fields:
+        postings = index.get(field, {})
+        normalized_prefix = prefix if field == 'javanese' else prefix.lower()
+        for token in find_prefix_tokens(suffix_arrays[field], normalized_prefix):
+            counts[token] = counts.get(token, 0) + len(postings[token])
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return [token for token, _ in ranked[:limit]]
+
+
+def build_positional_index(df):
+    """
+    Indeks posisi untuk teks Paragraf: field -> token -> {id baris: (posisi token, ...)}.
+    Dipakai kueri boolean untuk frasa dan operator kedekatan (NEAR).
+    """
+    index = {field: {} for field in INDEXED_FIELDS}
+    add_rows_to_positional_index(index, df)
+    return index
+
+
+def group_positions_by_token(field, row_ids, texts):
+    """token -> {id baris: (posisi token, ...)} untuk sekumpulan teks"""
+    token_positions = {}
+    for row_id, text in zip(row_ids, texts):
+        if not isinstance(text, str):
+            continue
+        positions = {}
+        for position, token in enumerate(tokenize_field(field, text)):
+            positions.setdefault(token, []).append(position)
+        for token, row_positions in positions.items():
+            token_positions.setdefault(token, {})[row_id] = tuple(row_positions)
+    return token_positions
+
+
+def select_paragraphs(df):
+    if df.empty or 'type' not in df.columns:
+        return df.iloc[:0]
+    return df[df['type'] == 'Paragraf']
+
+
+def add_rows_to_positional_index(index, df):
+    """Tambahkan baris Paragraf dari DataFrame ke indeks posisi (copy-on-write seperti add_rows_to_index)"""
+    paragraphs = select_paragraphs(df)
+    for field, column in INDEXED_FIELDS.items():
+        if paragraphs.empty or column not in paragraphs.columns:
+            continue
+        postings = index[field]
+        for token, row_positions in group_positions_by_token(field, paragraphs.index, paragraphs[column]).items():
+            token_postings = postings.get(token)
+            postings[token] = row_positions if token_postings is None else {**token_postings, **row_positions}
+
+
+def remove_rows_from_positional_index(index, df):
+    """Hapus baris Paragraf (dengan teks lamanya) dari indeks posisi, copy-on-write"""
+    paragraphs = select_paragraphs(df)
+    for field, column in INDEXED_FIELDS.items():
+        if paragraphs.empty or column not in paragraphs.columns:
+            continue
+        postings = index[field]
+        for token, row_positions in group_positions_by_token(field, paragraphs.index, paragraphs[column]).items():
+            token_postings = postings.get(token)
+            if token_postings is None:
+                continue
+            token_postings = {
+                row_id: positions for row_id, positions in token_postings.items() if row_id not in row_positions
+            }
+            if token_postings:
+                postings[token] = token_postings
+            else:
+                del postings[token]
+
+
+def find_phrase_positions(positional_field, tokens):
+    """
+    Posisi awal frasa (token berurutan) per baris: {id baris: [posisi, ...]}.
+    Baris kandidat didapat dari irisan posting list, dimulai dari token yang paling jarang.
+    """
+    if not tokens:
+        return {}
+    postings = [positional_field.get(token, {}) for token in tokens]
+    rarest = min(postings, key=len)
+    row_ids = set(rarest)
+    for token_postings in postings:
+        if token_postings is not rarest:
+            row_ids.intersection_update(token_postings)
+        if not row_ids:
+            return {}
+
+    matches = {}
+    for row_id in row_ids:
+        following = [set(token_postings[row_id]) for token_postings in postings[1:]]
+        starts = [
+            start for start in postings[0][row_id]
+            if all(start + offset + 1 in positions for offset, positions in enumerate(following))
+        ]
+        if starts:
+            matches[row_id] = starts
+    return matches
+
+
+# Panjang n-gram karakter untuk indeks pencarian mirip (fuzzy)
+NGRAM_SIZE = 3
+NGRAM_PADDING = '$'
+
+
+def fold_text(text):
+    """Huruf kecil tanpa diakritik: 'ditên' -> 'diten', 'śaśi' -> 'sasi'"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def fold_token(field, token):
+    # Aksara Jawa tidak memiliki diakritik Latin; hanya dinormalisasi
+    if field == 'javanese':
+        return unicodedata.normalize('NFC', token)
+    return fold_text(token)
+
+
+def token_ngrams(token):
+    """n-gram karakter dari token yang diberi pembatas di awal dan akhir"""
+    padded = f'{NGRAM_PADDING}{token}{NGRAM_PADDING}'
+    if len(padded) < NGRAM_SIZE:
+        return {padded}
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def build_fuzzy_index(index):
+    """
+    Bangun indeks pencarian mirip atas kosakata setiap field: token yang sudah
+    di-fold -> token asli di indeks, dan n-gram -> token yang sudah di-fold.
+    """
+    fuzzy_index = {field: {'folded': {}, 'ngrams': {}} for field in INDEXED_FIELDS}
+    return update_fuzzy_index(fuzzy_index, {}, {field: index.get(field, {}) for field in INDEXED_FIELDS})
+
+
+def update_fuzzy_index(fuzzy_index, removed_tokens, added_tokens):
+    """
+    Indeks pencarian mirip setelah kosakata berubah (removed_tokens dan added_tokens:
+    {field: token}, lihat add_rows_to_index). Hanya entri token yang berubah yang
+    disentuh; indeks lama tidak diubah.
+    """
+    updated = {}
+    for field in INDEXED_FIELDS:
+        folded = dict(fuzzy_index[field]['folded'])
+        ngrams = dict(fuzzy_index[field]['ngrams'])
+
+        removed_ngrams = {}
+        for token in removed_tokens.get(field, ()):
+            folded_token = fold_token(field, token)
+            originals = [original for original in folded.get(folded_token, ()) if original != token]
+            if originals:
+                folded[folded_token] = originals
+                continue
+            folded.pop(folded_token, None)
+            for ngram in token_ngrams(folded_token):
+                removed_ngrams.setdefault(ngram, set()).add(folded_token)
+        for ngram, folded_tokens in removed_ngrams.items():
+            remaining = ngrams.get(ngram, set()) - folded_tokens
+            if remaining:
+                ngrams[ngram] = remaining
+            else:
+                ngrams.pop(ngram, None)
+
+        added_folded = {}
+        for token in added_tokens.get(field, ()):
+            added_folded.setdefault(fold_token(field, token), []).append(token)
+        added_ngrams = {}
+        for folded_token, originals in added_folded.items():
+            if folded_token not in folded:
+                for ngram in token_ngrams(folded_token):
+                    added_ngrams.setdefault(ngram, set()).add(folded_token)
+            folded[folded_token] = folded.get(folded_token, []) + originals
+        for ngram, folded_tokens in added_ngrams.items():
+            ngrams[ngram] = ngrams.get(ngram, set()) | folded_tokens
+
+        updated[field] = {'folded': folded, 'ngrams': ngrams}
+    return updated
+
+
+def max_edit_distance(token):
+    """Jumlah salah ketik yang ditoleransi, bertambah dengan panjang kata"""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 7:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """Jarak Levenshtein a dan b, atau None jika lebih dari max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        # Seluruh baris sudah melewati batas: jarak akhir pasti lebih besar
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def find_fuzzy_tokens(fuzzy_field, token, max_distance):
+    """
+    Token kosakata (asli) yang mirip dengan token query beserta jaraknya.
+
+    Kandidat diambil dari indeks n-gram: token dengan jarak edit k paling banyak
+    kehilangan NGRAM_SIZE * k n-gram, sehingga token yang berbagi lebih sedikit
+    n-gram tidak perlu dihitung jaraknya.
+    """
+    folded = fuzzy_field['folded']
+    if max_distance == 0:
+        return {original: 0 for original in folded.get(token, ())}
+
+    query_ngrams = token_ngrams(token)
+    min_shared = len(query_ngrams) - NGRAM_SIZE * max_distance
+    shared_counts = {}
+    for ngram in query_ngrams:
+        for folded_token in fuzzy_field['ngrams'].get(ngram, ()):
+            shared_counts[folded_token] = shared_counts.get(folded_token, 0) + 1
+
+    matched = {}
+    for folded_token, shared in shared_counts.items():
+        if shared < min_shared:
+            continue
+        distance = bounded_edit_distance(token, folded_token, max_distance)
+        if distance is None:
+            continue
+        for original in folded[folded_token]:
+            matched[original] = distance
+    return matched
+
+
+def lookup_fuzzy_candidates(index, fuzzy_index, field, query):
+    """
+    Cari baris yang mirip dengan query pada satu field, tanpa memindai baris.
+
+    Setiap kata query dicocokkan tanpa diakritik dan dengan toleransi salah ketik;
+    baris harus memuat semua kata query. Mengembalikan (row_distances, matched_tokens):
+    total jarak edit per id baris dan token kosakata yang cocok (untuk highlight).
+    """
+    postings = index.get(field, {})
+    query_tokens = {fold_token(field, token) for token in tokenize_field(field, query)}
+    row_distances = None
+    matched_tokens = set()
+    for query_token in query_tokens:
+        token_matches = find_fuzzy_tokens(fuzzy_index[field], query_token, max_edit_distance(query_token))
+        matched_tokens.update(token_matches)
+
+        # Jarak terkecil per baris untuk kata query ini
+        token_rows = {}
+        for token, distance in token_matches.items():
+            for row_id in postings[token]:
+                if distance < token_rows.get(row_id, distance + 1):
+                    token_rows[row_id] = distance
+
+        if row_distances is None:
+            row_distances = token_rows
+        else:
+            row_distances = {
+                row_id: distance + token_rows[row_id]
+                for row_id, distance in row_distances.items() if row_id in token_rows
+            }
+        if not row_distances:
+            return {}, set()
+    return row_distances or {}, matched_tokens
+
+
+def is_javanese_char(char):
+    """Karakter aksara Jawa (Unicode range: U+A980-U+A9DF)"""
+    return '\ua980' <= char <= '\ua9df'
+
+
+def collect_javanese_chars(texts):
+    """Kumpulkan karakter aksara Jawa unik dari sekumpulan teks, terurut"""
+    all_chars = set()
+    for text in texts:
+        all_chars.update(char for char in str(text) if is_javanese_char(char))
+    return sorted(all_chars)
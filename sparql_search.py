@@ -0,0 +1,240 @@
+import os
+import re
+
+import pandas as pd
+from SPARQLWrapper import SPARQLWrapper, JSON
+
+from data_sources import (
+    CORPUS_COLUMNS, CORPUS_PAGE_ORDER, GRAPHDB_TIMEOUT, bindings_to_dataframe, compact_corpus, resolve_local_path,
+    sort_corpus_rows, subject_rows_query
+)
+from perf_metrics import timed, timed_span
+from query_patterns import is_javanese_text
+from search_index import tokenize_javanese, tokenize_latin
+
+# Backend pencarian: "memory" memuat seluruh korpus ke proses web, "sparql" mengirim
+# setiap query ke endpoint dan hanya mengambil subjek yang cocok
+SEARCH_BACKEND = os.environ.get("AKSARA_SEARCH_BACKEND", "memory").strip().lower()
+
+# Sumber data yang dapat menjawab query SPARQL secara langsung
+PUSHDOWN_SOURCES = ("graphdb", "ttl")
+
+# Mode pencocokan yang dapat disaring di endpoint: kata utuh, awalan dan bagian kata
+# semuanya mengandung teks query, sehingga CONTAINS menghasilkan kandidat yang lengkap
+PUSHDOWN_MATCH_MODES = ("word", "prefix", "substring")
+
+# Nama instance konektor Lucene GraphDB; kosong berarti langsung memakai FILTER(CONTAINS)
+LUCENE_CONNECTOR = os.environ.get("AKSARA_LUCENE_CONNECTOR", "").strip() or None
+
+# Batas jumlah subjek yang diambil per query dan jumlah subjek per query VALUES
+PUSHDOWN_LIMIT = int(os.environ.get("AKSARA_PUSHDOWN_LIMIT", "5000"))
+PUSHDOWN_BATCH_SIZE = 200
+
+# Properti teks per field pencarian (Paragraf | Kata)
+FIELD_PROPERTY_PATHS = {
+    "latin": "ex:isiLatin|ex:latin",
+    "translation": "ex:arti",
+    "javanese": "ex:isiAksaraJawa|ex:aksaraJawa",
+}
+
+# Nama field pada konektor Lucene untuk setiap field pencarian
+LUCENE_FIELDS = {
+    "latin": "latin",
+    "translation": "translation",
+    "javanese": "javanese",
+}
+
+LUCENE_SPECIAL_RE = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+
+
+class PushdownError(ValueError):
+    """Query tidak dapat dijawab oleh backend SPARQL (sumber atau mode pencocokan tidak didukung)"""
+
+
+def graphdb_query_runner(endpoint):
+    """Fungsi query(teks SPARQL) -> daftar baris {variabel: nilai} untuk endpoint GraphDB"""
+    sparql = SPARQLWrapper(endpoint)
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(GRAPHDB_TIMEOUT)
+
+    def run_query(query):
+        sparql.setQuery(query)
+        return [
+            {name: value["value"] for name, value in binding.items()}
+            for binding in sparql.query().convert()["results"]["bindings"]
+        ]
+    return run_query
+
+
+def graph_query_runner(graph):
+    """Fungsi query yang sama untuk graph rdflib (misalnya RDF/pupuh.ttl tanpa GraphDB)"""
+    def run_query(query):
+        return [
+            {name: str(value) for name, value in result.asdict().items()}
+            for result in graph.query(query)
+        ]
+    return run_query
+
+
+def get_query_runner(source, location):
+    """Fungsi query SPARQL untuk sumber data; hanya GraphDB dan file Turtle yang didukung"""
+    if source == "graphdb":
+        return graphdb_query_runner(location)
+    if source == "ttl":
+        try:
+            from rdflib import Graph
+        except ImportError as e:
+            raise ImportError("Sumber data 'ttl' membutuhkan rdflib: pip install rdflib") from e
+        graph = Graph()
+        graph.parse(resolve_local_path(location), format="turtle")
+        return graph_query_runner(graph)
+    raise PushdownError(
+        f"Pencarian SPARQL hanya tersedia untuk sumber {' atau '.join(PUSHDOWN_SOURCES)}, bukan '{source}'"
+    )
+
+
+def search_terms(query, cross_query=None):
+    """Token query (dan transliterasinya) yang harus terkandung dalam teks, huruf kecil"""
+    terms = []
+    for text in (query, cross_query):
+        if not text:
+            continue
+        tokens = tokenize_javanese(text) if is_javanese_text(text) else tokenize_latin(text)
+        if tokens:
+            terms.append(tokens)
+    return terms
+
+
+def sparql_string(text):
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    return f'"{escaped}"'
+
+
+def search_fields(search_type):
+    return list(FIELD_PROPERTY_PATHS) if search_type == "all" else [search_type]
+
+
+def filter_subjects_query(terms, search_type, limit=PUSHDOWN_LIMIT):
+    """
+    Query subjek Paragraf/Kata yang salah satu teksnya mengandung semua token query
+    (atau semua token transliterasinya). Hasilnya kandidat; kecocokan kata utuh,
+    awalan atau bagian kata diverifikasi dengan regex setelah baris diambil.
+    """
+    path = "|".join(FIELD_PROPERTY_PATHS[field] for field in search_fields(search_type))
+    condition = " || ".join(
+        "(" + " && ".join(f"CONTAINS(LCASE(STR(?text)), {sparql_string(token)})" for token in tokens) + ")"
+        for tokens in terms
+    )
+    return f"""
+    PREFIX ex: <http://example.org/pupuh#>
+    SELECT DISTINCT ?s
+    WHERE {{
+        VALUES ?class {{ ex:Paragraf ex:Kata }}
+        ?s a ?class ;
+           {path} ?text .
+        FILTER({condition})
+    }}
+    ORDER BY ?s
+    LIMIT {limit}
+    """
+
+
+def lucene_escape(token):
+    return LUCENE_SPECIAL_RE.sub(r"\\\1", token)
+
+
+def lucene_query_string(terms, search_type, match_mode):
+    """Query Lucene: setiap field yang dicari, token digabung AND dan query/transliterasi digabung OR"""
+    clauses = []
+    for tokens in terms:
+        if match_mode == "word":
+            value = '"' + " ".join(token.replace("\\", "\\\\").replace('"', '\\"') for token in tokens) + '"'
+        elif match_mode == "prefix":
+            value = "(" + " AND ".join(
+                lucene_escape(token) + ("*" if position == len(tokens) - 1 else "")
+                for position, token in enumerate(tokens)
+            ) + ")"
+        else:
+            value = "(" + " AND ".join(f"*{lucene_escape(token)}*" for token in tokens) + ")"
+        clauses.extend(f"{LUCENE_FIELDS[field]}:{value}" for field in search_fields(search_type))
+    return " OR ".join(clauses)
+
+
+def lucene_subjects_query(connector, terms, search_type, match_mode, limit=PUSHDOWN_LIMIT):
+    """Query subjek lewat konektor Lucene GraphDB (indeks full-text di sisi endpoint)"""
+    return f"""
+    PREFIX con: <http://www.ontotext.com/connectors/lucene#>
+    PREFIX con-inst: <http://www.ontotext.com/connectors/lucene/instance#>
+    SELECT DISTINCT ?s
+    WHERE {{
+        ?search a con-inst:{connector} ;
+                con:query {sparql_string(lucene_query_string(terms, search_type, match_mode))} ;
+                con:limit "{limit}" ;
+                con:entities ?s .
+    }}
+    """
+
+
+def lucene_supports_terms(terms):
+    """Analyzer Lucene tidak memecah teks aksara Jawa per kata; token aksara Jawa dicari dengan FILTER"""
+    return not any(is_javanese_text("".join(tokens)) for tokens in terms)
+
+
+def find_matching_subjects(run_query, terms, search_type, match_mode, connector=LUCENE_CONNECTOR,
+                           limit=PUSHDOWN_LIMIT):
+    """
+    URI subjek kandidat dari endpoint. Konektor Lucene dipakai jika dikonfigurasi dan
+    semua token query (termasuk transliterasinya) berupa teks Latin; hasil kosong dari
+    Lucene adalah jawaban yang sah. FILTER(CONTAINS) hanya dipakai jika konektor tidak
+    ada, query Lucene gagal, atau query mengandung aksara Jawa.
+
+    Endpoint diminta limit + 1 subjek agar terlihat apakah batasnya terlampaui.
+    Mengembalikan (paling banyak limit URI, True jika kandidat terpotong).
+    """
+    subject_uris = None
+    if connector is not None and lucene_supports_terms(terms):
+        try:
+            with timed_span("sparql_lucene_subjects"):
+                subject_uris = sorted({row["s"] for row in run_query(
+                    lucene_subjects_query(connector, terms, search_type, match_mode, limit + 1)
+                )})
+        except Exception:
+            subject_uris = None # Konektor belum dibuat di repository ini
+    if subject_uris is None:
+        with timed_span("sparql_filter_subjects"):
+            subject_uris = [row["s"] for row in run_query(filter_subjects_query(terms, search_type, limit + 1))]
+    return subject_uris[:limit], len(subject_uris) > limit
+
+
+def fetch_subject_rows(run_query, subject_uris, batch_size=PUSHDOWN_BATCH_SIZE):
+    """Baris korpus (beserta munculDalamParagraf) untuk subjek tertentu, per batch dengan VALUES"""
+    rows = []
+    with timed_span("sparql_fetch_rows"):
+        for start in range(0, len(subject_uris), batch_size):
+            rows.extend(run_query(
+                subject_rows_query(subject_uris[start:start + batch_size]) + CORPUS_PAGE_ORDER
+            ))
+    return bindings_to_dataframe(rows)
+
+
+@timed("fetch_pushdown_rows")
+def fetch_pushdown_rows(run_query, query, search_type="all", match_mode="word", cross_query=None,
+                        connector=LUCENE_CONNECTOR, limit=PUSHDOWN_LIMIT):
+    """
+    Ambil dari endpoint hanya baris yang mungkin cocok dengan query, sebagai DataFrame
+    korpus ringkas (skema sama dengan korpus yang dimuat penuh). Verifikasi dan
+    pengelompokan hasil dilakukan oleh search_text atas DataFrame kecil ini; barisnya
+    diurutkan ke urutan korpus agar urutan kemunculan sama dengan pencarian di memori.
+    Mengembalikan (DataFrame, True jika kandidat terpotong oleh limit).
+    """
+    if match_mode not in PUSHDOWN_MATCH_MODES:
+        raise PushdownError(
+            f"Mode pencocokan '{match_mode}' tidak didukung pencarian SPARQL "
+            f"(pilihan: {', '.join(PUSHDOWN_MATCH_MODES)})"
+        )
+    terms = search_terms(query, cross_query)
+    if not terms:
+        return compact_corpus(pd.DataFrame(columns=CORPUS_COLUMNS)), False
+
+    subject_uris, truncated = find_matching_subjects(run_query, terms, search_type, match_mode, connector, limit)
+    return compact_corpus(sort_corpus_rows(fetch_subject_rows(run_query, subject_uris))), truncated
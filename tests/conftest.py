@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+import streamlit.logger
+
+# Modul aplikasi berada di akar repository, bukan paket terpasang
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# app.py diimpor tanpa server Streamlit (bare mode); sembunyikan peringatan runtime
+streamlit.logger.set_log_level("error")
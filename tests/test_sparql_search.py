@@ -0,0 +1,136 @@
+"""
+Pencarian SPARQL (pushdown) dibandingkan dengan pencarian di memori atas RDF/pupuh.ttl.
+
+File Turtle dijalankan lewat rdflib sebagai pengganti endpoint GraphDB lokal, sehingga
+query subjek, VALUES per batch dan verifikasi hasil diuji tanpa server.
+"""
+import json
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import app
+import sparql_search
+from data_sources import load_corpus
+from conftest import ROOT_DIR
+
+TTL_LOCATION = "RDF/pupuh.ttl"
+
+# (query, jenis pencarian, mode pencocokan): Latin dan aksara Jawa, setiap mode pushdown
+PUSHDOWN_QUERIES = [
+    ("ing", "all", "word"),
+    ("punika", "all", "word"),
+    ("ing kang", "all", "word"),
+    ("sapar", "latin", "word"),
+    ("pada", "translation", "word"),
+    ("pun", "all", "prefix"),
+    ("ika", "all", "substring"),
+    ("ꦲꦶꦁ", "all", "word"),
+    ("ꦥꦸꦤꦶꦏ", "javanese", "word"),
+    ("ꦥꦸ", "all", "prefix"),
+    ("ꦤꦶ", "javanese", "substring"),
+    ("tidakadadikorpus", "all", "word"),
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    df = load_corpus("ttl", str(ROOT_DIR / TTL_LOCATION))
+    return {"df": df, "search_index": app.build_search_index(df)}
+
+
+@pytest.fixture(scope="module")
+def run_query():
+    return sparql_search.get_query_runner("ttl", str(ROOT_DIR / TTL_LOCATION))
+
+
+def ordered(grouped_results):
+    # Perbandingan dict biasa mengabaikan urutan; urutan grup dan kemunculan juga harus sama
+    return json.dumps(grouped_results, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("query, search_type, match_mode", PUSHDOWN_QUERIES)
+def test_pushdown_matches_memory_search(corpus, run_query, query, search_type, match_mode):
+    _, memory_results = app.search_text(corpus["df"], query, search_type, corpus["search_index"], match_mode)
+    _, pushdown_results, truncated = app.pushdown_search_text(run_query, query, search_type, match_mode)
+
+    assert not truncated
+    assert ordered(pushdown_results) == ordered(memory_results)
+
+
+@pytest.mark.parametrize("query", ["punika", "ꦲꦶꦁ"])
+def test_cross_script_pushdown_matches_memory_search(corpus, run_query, query):
+    # Tanpa korpus, pushdown hanya memakai aturan aksara; pencarian di memori diberi tabel yang sama
+    _, memory_results = app.search_text(
+        corpus["df"], query, "all", corpus["search_index"], "word",
+        transliteration_table=app.RULE_TRANSLITERATION_TABLE
+    )
+    _, pushdown_results, _ = app.pushdown_search_text(run_query, query, "all", "word", cross_script=True)
+
+    assert ordered(pushdown_results) == ordered(memory_results)
+
+
+def test_pushdown_rows_follow_corpus_order(corpus, run_query):
+    # ORDER BY ?s mengurutkan Kata_1_12 sebelum Kata_1_3; baris pushdown mengikuti urutan korpus
+    df, _ = sparql_search.fetch_pushdown_rows(run_query, "ing")
+    corpus_order = [s_uri for s_uri in corpus["df"]["s"] if s_uri in set(df["s"])]
+
+    assert list(df["s"]) == corpus_order
+
+
+def test_pushdown_limit_sets_truncation_flag(run_query):
+    df, truncated = sparql_search.fetch_pushdown_rows(run_query, "ing", limit=3)
+    assert truncated
+    assert df["s"].nunique() == 3
+
+    _, truncated = sparql_search.fetch_pushdown_rows(run_query, "ing", limit=10_000)
+    assert not truncated
+
+
+def test_lucene_empty_answer_does_not_fall_back_to_filter(run_query):
+    queries = []
+
+    def lucene_runner(query):
+        queries.append(query)
+        return [] if "con:query" in query else run_query(query)
+
+    subject_uris, truncated = sparql_search.find_matching_subjects(
+        lucene_runner, [["punika"]], "all", "word", connector="aksara"
+    )
+    assert subject_uris == [] and not truncated
+    assert len(queries) == 1
+
+    # Token aksara Jawa tidak dipecah analyzer Lucene, sehingga langsung memakai FILTER
+    queries.clear()
+    subject_uris, _ = sparql_search.find_matching_subjects(
+        lucene_runner, [["ꦲꦶꦁ"]], "all", "word", connector="aksara"
+    )
+    assert subject_uris
+    assert all("con:query" not in query for query in queries)
+
+
+def run_pushdown_page(monkeypatch, pushdown_limit):
+    monkeypatch.setenv("AKSARA_SEARCH_BACKEND", "sparql")
+    monkeypatch.setenv("AKSARA_DATA_SOURCE", "ttl")
+    monkeypatch.setenv("AKSARA_DATA_LOCATION", str(ROOT_DIR / TTL_LOCATION))
+    monkeypatch.setenv("AKSARA_PUSHDOWN_LIMIT", str(pushdown_limit))
+    # SEARCH_BACKEND dan PUSHDOWN_LIMIT dibaca saat impor; skrip aplikasi mengimpor ulang modulnya
+    monkeypatch.delitem(sys.modules, "sparql_search")
+
+    page = AppTest.from_file(str(ROOT_DIR / "app.py"), default_timeout=120).run()
+    page.text_input(key="search_input").input("ing")
+    next(button for button in page.button if "Cari" in button.label).click()
+    page.run()
+    assert not page.exception
+    return page
+
+
+def test_low_pushdown_limit_shows_warning(monkeypatch):
+    page = run_pushdown_page(monkeypatch, 3)
+    assert any("AKSARA_PUSHDOWN_LIMIT" in warning.value for warning in page.warning)
+
+
+def test_default_pushdown_limit_shows_no_warning(monkeypatch):
+    page = run_pushdown_page(monkeypatch, 5000)
+    assert not any("AKSARA_PUSHDOWN_LIMIT" in warning.value for warning in page.warning)
@@ -0,0 +1,311 @@
+import re
+import unicodedata
+from collections import Counter
+
+from search_index import LATIN_SPLIT_RE, JAVANESE_SPLIT_RE, tokenize_latin, tokenize_javanese, fold_text
+from query_patterns import is_javanese_text
+
+# Pemisah kata saat menulis aksara Jawa (seperti pada teks paragraf di korpus)
+JAVANESE_WORD_JOINER = "\u200b"
+
+# Aksara nglegena dan aksara lain yang dipakai korpus (Latin -> aksara Jawa)
+LATIN_CONSONANTS = {
+    "h": "ꦲ", "n": "ꦤ", "c": "ꦕ", "r": "ꦫ", "k": "ꦏ",
+    "d": "ꦢ", "t": "ꦠ", "s": "ꦱ", "w": "ꦮ", "l": "ꦭ",
+    "p": "ꦥ", "dh": "ꦝ", "j": "ꦗ", "y": "ꦪ", "ny": "ꦚ",
+    "m": "ꦩ", "g": "ꦒ", "b": "ꦧ", "th": "ꦛ", "ng": "ꦔ",
+    "ḍ": "ꦣ", "ṭ": "ꦡ", "ś": "ꦯ",
+    "f": "ꦥ꦳", "v": "ꦮ꦳", "z": "ꦗ꦳", "q": "ꦏ", "x": "ꦏ꧀ꦱ",
+}
+
+# Sandhangan swara; "a" adalah vokal bawaan aksara
+LATIN_VOWELS = {
+    "a": "", "i": "ꦶ", "u": "ꦸ", "e": "ꦺ", "é": "ꦺ", "è": "ꦺ",
+    "ê": "ꦼ", "o": "ꦺꦴ",
+}
+
+# Konsonan penutup suku kata yang ditulis dengan sandhangan panyigeg
+LATIN_FINALS = {"ng": "ꦁ", "r": "ꦂ", "h": "ꦃ"}
+
+# Konsonan kedua dalam gugus yang ditulis sebagai sandhangan (cakra, pengkal)
+LATIN_MEDIALS = {"r": "ꦿ", "y": "ꦾ"}
+
+# Suku kata yang memiliki aksara khusus (pa cerek, nga lelet)
+LATIN_SPECIAL_SYLLABLES = {("r", "ê"): "ꦉ", ("l", "ê"): "ꦊ"}
+
+PANGKON = "꧀"
+JAVANESE_VOWEL_CARRIER = "ꦲ"  # ha, dipakai untuk vokal di awal kata
+
+LATIN_PUNCTUATION = {",": "꧈", ".": "꧉"}
+
+# Aksara Jawa -> Latin
+JAVANESE_CONSONANTS = {
+    "ꦲ": "h", "ꦤ": "n", "ꦕ": "c", "ꦫ": "r", "ꦏ": "k",
+    "ꦢ": "d", "ꦠ": "t", "ꦱ": "s", "ꦮ": "w", "ꦭ": "l",
+    "ꦥ": "p", "ꦝ": "dh", "ꦗ": "j", "ꦪ": "y", "ꦚ": "ny",
+    "ꦩ": "m", "ꦒ": "g", "ꦧ": "b", "ꦛ": "th", "ꦔ": "ng",
+    "ꦯ": "ś", "ꦡ": "ṭ", "ꦣ": "ḍ", "ꦑ": "k", "ꦓ": "g",
+    "ꦨ": "b", "ꦦ": "p", "ꦟ": "n", "ꦖ": "c", "ꦰ": "s",
+    "ꦐ": "k", "ꦘ": "j", "ꦙ": "ny", "ꦜ": "th", "ꦞ": "dh",
+    "ꦬ": "r",
+}
+
+# Aksara dengan cecak telu untuk bunyi serapan
+JAVANESE_NUKTA = {"ꦗ": "z", "ꦥ": "f", "ꦮ": "v", "ꦏ": "kh", "ꦢ": "dz", "ꦲ": "kh"}
+CECAK_TELU = "꦳"
+
+JAVANESE_VOWEL_SIGNS = {
+    "ꦶ": "i", "ꦷ": "i", "ꦸ": "u", "ꦹ": "u", "ꦺ": "e",
+    "ꦻ": "ai", "ꦼ": "ê",
+}
+TARUNG = "ꦴ"
+
+JAVANESE_MEDIALS = {"ꦿ": "r", "ꦾ": "y", "ꦽ": "rê"}
+JAVANESE_FINALS = {"ꦁ": "ng", "ꦂ": "r", "ꦃ": "h", "ꦀ": "m"}
+
+JAVANESE_INDEPENDENT = {
+    "ꦄ": "a", "ꦅ": "i", "ꦆ": "i", "ꦇ": "ii", "ꦈ": "u",
+    "ꦉ": "rê", "ꦊ": "lê", "ꦋ": "lêu", "ꦌ": "e",
+    "ꦍ": "ai", "ꦎ": "o",
+}
+
+JAVANESE_PUNCTUATION = {"꧈": ",", "꧉": "."}
+JAVANESE_DIGITS = {chr(0xA9D0 + digit): str(digit) for digit in range(10)}
+
+# Satuan bunyi Latin, konsonan dua huruf didahulukan
+LATIN_UNIT_RE = re.compile(
+    "|".join(re.escape(unit) for unit in sorted(
+        set(LATIN_CONSONANTS) | set(LATIN_VOWELS), key=lambda unit: (-len(unit), unit)
+    )) + "|."
+)
+
+
+def _latin_word_to_javanese(word, partial=False):
+    """Tulis satu kata Latin dengan aksara Jawa berdasarkan aturan suku kata"""
+    units = LATIN_UNIT_RE.findall(word.lower())
+    output = []
+    i = 0
+    while i < len(units):
+        unit = units[i]
+        following = units[i + 1] if i + 1 < len(units) else None
+
+        if unit in LATIN_VOWELS:
+            # Vokal tanpa konsonan di depannya ditulis dengan aksara ha
+            output.append(JAVANESE_VOWEL_CARRIER + LATIN_VOWELS[unit])
+            i += 1
+        elif unit in LATIN_CONSONANTS:
+            if following in LATIN_VOWELS:
+                special = LATIN_SPECIAL_SYLLABLES.get((unit, following))
+                output.append(special or LATIN_CONSONANTS[unit] + LATIN_VOWELS[following])
+                i += 2
+            elif unit in LATIN_FINALS and output:
+                output.append(LATIN_FINALS[unit])
+                i += 1
+            elif (following in LATIN_MEDIALS and i + 2 < len(units) and units[i + 2] in LATIN_VOWELS):
+                output.append(LATIN_CONSONANTS[unit] + LATIN_MEDIALS[following] + LATIN_VOWELS[units[i + 2]])
+                i += 3
+            elif following is None and partial:
+                # Query belum selesai diketik: konsonan terakhir dibiarkan tanpa pangkon
+                output.append(LATIN_CONSONANTS[unit])
+                i += 1
+            else:
+                output.append(LATIN_CONSONANTS[unit] + PANGKON)
+                i += 1
+        else:
+            output.append(LATIN_PUNCTUATION.get(unit, ""))
+            i += 1
+    return "".join(output)
+
+
+def _javanese_word_to_latin(word, partial=False):
+    """Tulis satu kata aksara Jawa dengan huruf Latin berdasarkan aturan aksara"""
+    output = []
+    i = 0
+    length = len(word)
+    while i < length:
+        char = word[i]
+        if char in JAVANESE_CONSONANTS:
+            consonant = JAVANESE_CONSONANTS[char]
+            i += 1
+            if i < length and word[i] == CECAK_TELU:
+                consonant = JAVANESE_NUKTA.get(char, consonant)
+                i += 1
+            if char == JAVANESE_VOWEL_CARRIER and not output:
+                consonant = ""  # ha di awal kata hanya membawa vokal
+            if i < length and word[i] in JAVANESE_MEDIALS:
+                consonant += JAVANESE_MEDIALS[word[i]]
+                i += 1
+
+            vowel = "a"
+            if i < length and word[i] == PANGKON:
+                vowel = ""
+                i += 1
+            elif i < length and word[i] in JAVANESE_VOWEL_SIGNS:
+                vowel = JAVANESE_VOWEL_SIGNS[word[i]]
+                i += 1
+                if vowel == "e" and i < length and word[i] == TARUNG:
+                    vowel = "o"
+                    i += 1
+            elif i < length and word[i] == TARUNG:
+                vowel = "aa"
+                i += 1
+            output.append(consonant + vowel)
+        elif char in JAVANESE_FINALS:
+            output.append(JAVANESE_FINALS[char])
+            i += 1
+        elif char in JAVANESE_INDEPENDENT:
+            output.append(JAVANESE_INDEPENDENT[char])
+            i += 1
+        else:
+            output.append(JAVANESE_PUNCTUATION.get(char) or JAVANESE_DIGITS.get(char, ""))
+            i += 1
+
+    latin = "".join(output)
+    # Wignyan diikuti ha (ꦃꦲ) dibaca satu h
+    latin = latin.replace("hh", "h")
+    if partial and latin.endswith("a") and output and output[-1].endswith("a") and len(output[-1]) > 1:
+        # Query belum selesai diketik: vokal bawaan aksara terakhir belum tentu ada
+        latin = latin[:-1]
+    return latin
+
+
+def transliteration_pairs(df):
+    """
+    Pasangan (latin, aksara Jawa) dari baris Kata: pasangan utuh, ditambah pasangan
+    per token jika jumlah tokennya sama.
+    """
+    pairs = []
+    if df.empty or not {"type", "isiLatin", "isiAksaraJawa"} <= set(df.columns):
+        return pairs
+    kata = df[df["type"] == "Kata"]
+    for latin, javanese in zip(kata["isiLatin"], kata["isiAksaraJawa"]):
+        if not isinstance(latin, str) or not isinstance(javanese, str):
+            continue
+        latin = latin.strip().lower()
+        javanese = javanese.strip()
+        if not latin or not javanese:
+            continue
+        pairs.append((latin, javanese))
+        latin_tokens = tokenize_latin(latin)
+        javanese_tokens = tokenize_javanese(javanese)
+        if len(latin_tokens) > 1 and len(latin_tokens) == len(javanese_tokens):
+            pairs.extend(zip(latin_tokens, javanese_tokens))
+    return pairs
+
+
+def most_frequent(counts):
+    """Bentuk yang paling sering; jika sama seringnya, yang pertama menurut urutan teks"""
+    return min(counts.items(), key=lambda item: (-item[1], item[0]))[0]
+
+
+def build_transliteration_table(df):
+    """
+    Bangun tabel transliterasi dari pasangan latin/aksaraJawa pada baris Kata.
+
+    Pasangan utuh dan pasangan per token (jika jumlah tokennya sama) dihitung, lalu
+    bentuk yang paling sering dipakai menjadi terjemahan kata tersebut. Kata yang
+    tidak ada di tabel ditulis dengan aturan aksara.
+    """
+    return update_transliteration_table(None, df.iloc[:0], df)
+
+
+def update_transliteration_table(table, removed_rows, added_rows):
+    """
+    Tabel transliterasi setelah pasangan dari removed_rows dikurangi dan pasangan dari
+    added_rows ditambahkan. Jumlah pasangan disimpan di tabel, sehingga hanya kata yang
+    pasangannya berubah yang dihitung ulang; tabel lama tidak diubah. table None
+    berarti tabel kosong.
+    """
+    table = table or {
+        "latin_counts": {}, "javanese_counts": {}, "folded_latins": {},
+        "latin_to_javanese": {}, "folded_to_javanese": {}, "javanese_to_latin": {},
+    }
+    updated = {name: dict(mapping) for name, mapping in table.items()}
+    latin_counts, javanese_counts = updated["latin_counts"], updated["javanese_counts"]
+
+    touched_latins, touched_javanese = set(), set()
+
+    def count_pair(counts, touched, key, form, delta):
+        if key not in touched:
+            touched.add(key)
+            counts[key] = Counter(counts.get(key, ()))
+        key_counts = counts[key]
+        key_counts[form] += delta
+        if key_counts[form] <= 0:
+            del key_counts[form]
+
+    for rows, delta in ((removed_rows, -1), (added_rows, 1)):
+        for latin, javanese in transliteration_pairs(rows):
+            count_pair(latin_counts, touched_latins, latin, javanese, delta)
+            count_pair(javanese_counts, touched_javanese, javanese, latin, delta)
+
+    for counts, mapping, touched in (
+        (latin_counts, updated["latin_to_javanese"], touched_latins),
+        (javanese_counts, updated["javanese_to_latin"], touched_javanese),
+    ):
+        for key in touched:
+            if counts[key]:
+                mapping[key] = most_frequent(counts[key])
+            else:
+                del counts[key]
+                mapping.pop(key, None)
+
+    # Kata Latin tanpa diakritik ("diten") tetap menemukan pasangan kata berdiakritik
+    # ("ditên"); jika ada beberapa, dipakai bentuk Latin yang paling sering
+    folded_latins = updated["folded_latins"]
+    touched_folded = {}
+    for latin in touched_latins:
+        touched_folded.setdefault(fold_text(latin), []).append(latin)
+    for folded, latins in touched_folded.items():
+        members = set(folded_latins.get(folded, ()))
+        members.update(latin for latin in latins if latin in latin_counts)
+        members.difference_update(latin for latin in latins if latin not in latin_counts)
+        if members:
+            folded_latins[folded] = members
+            best = most_frequent({latin: sum(latin_counts[latin].values()) for latin in members})
+            updated["folded_to_javanese"][folded] = updated["latin_to_javanese"][best]
+        else:
+            folded_latins.pop(folded, None)
+            updated["folded_to_javanese"].pop(folded, None)
+    return updated
+
+
+def transliterate_word(table, word, to_javanese, partial=False):
+    """Transliterasi satu kata: tabel dari korpus dulu, aturan aksara jika tidak ada"""
+    if to_javanese:
+        key = word.lower()
+        known = table["latin_to_javanese"].get(key) or table["folded_to_javanese"].get(fold_text(key))
+        return known if known is not None else _latin_word_to_javanese(key, partial)
+    key = unicodedata.normalize("NFC", word)
+    known = table["javanese_to_latin"].get(key)
+    return known if known is not None else _javanese_word_to_latin(key, partial)
+
+
+def transliterate_query(table, query, match_mode="word"):
+    """
+    Tulis query dalam aksara lainnya (Latin -> aksara Jawa atau sebaliknya).
+
+    Query utuh dicari dulu di tabel (untuk kata korpus yang mengandung pemisah), lalu
+    per kata. Pada mode awalan/substring kata terakhir dianggap belum selesai diketik.
+    Mengembalikan None jika query tidak menghasilkan teks.
+    """
+    query = query.strip()
+    if not query:
+        return None
+    to_javanese = not is_javanese_text(query)
+    partial = match_mode in ("prefix", "substring")
+
+    whole = (table["latin_to_javanese"].get(query.lower()) if to_javanese
+             else table["javanese_to_latin"].get(unicodedata.normalize("NFC", query)))
+    if whole is not None:
+        return whole
+
+    split_re = LATIN_SPLIT_RE if to_javanese else JAVANESE_SPLIT_RE
+    joiner = JAVANESE_WORD_JOINER if to_javanese else " "
+    words = [word for word in split_re.split(query) if word]
+    converted = [
+        transliterate_word(table, word, to_javanese, partial and position == len(words) - 1)
+        for position, word in enumerate(words)
+    ]
+    result = joiner.join(word for word in converted if word)
+    return result or None